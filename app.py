@@ -1,5 +1,4 @@
 import streamlit as st
-import urllib.parse
 # --- Query param parsing for single-click filters ---
 # At the top of the script, parse st.query_params and set session_state for filters
 qp = st.query_params
@@ -21,26 +20,6 @@ for param, sskey in [
         if sskey not in st.session_state:
             st.session_state[sskey] = None
 
-# Eksik metadata durumunda missing_metadata.csv dosyasına ekleme fonksiyonu
-import csv
-
-
-def overwrite_missing_meta(docs):
-    """missing_metadata.csv'yi Firestore'dan tamamen yeniden yazar."""
-    try:
-        with open("missing_metadata.csv", "w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(["title", "year", "imdb_id", "note"])
-            for doc in docs:
-                item = doc.to_dict()
-                title = item.get("title", "")
-                year = item.get("year", "")
-                imdb_id = item.get("imdb", "") or item.get("imdb_id", "")
-                note = item.get("note", "")
-                writer.writerow([title, year, imdb_id, note])
-    except Exception as e:
-        print(f"overwrite_missing_meta error: {e}")
-
 # Eksik csv dosyalarını garantiye al
 import os
 import pandas as pd
@@ -48,878 +27,23 @@ import pandas as pd
 for file_name in ["seed_meta.csv", "missing_metadata.csv"]:
     if not os.path.exists(file_name):
         pd.DataFrame().to_csv(file_name, index=False)
-@st.cache_data(show_spinner=False)
-def read_seed_meta(imdb_id: str):
-    """
-    seed_meta.csv içinden imdb_id ile eşleşen satırın metadata'sını döndürür.
-    {'directors': [...], 'cast': [...], 'genres': [...]} veya None.
-    """
-    try:
-        iid = (imdb_id or "").strip()
-        if not iid or not SEED_META_PATH.exists():
-            return None
-        with SEED_META_PATH.open(newline="", encoding="utf-8") as f:
-            r = csv.DictReader(f)
-            for row in r:
-                if (row.get("imdb_id") or "").strip() == iid:
-                    return {
-                        "directors": [d.strip() for d in (row.get("directors") or "").split(";") if d.strip()],
-                        "cast": [c.strip() for c in (row.get("cast") or "").split(";") if c.strip()],
-                        "genres": [g.strip() for g in (row.get("genres") or "").split(";") if g.strip()],
-                        "writers": [w.strip() for w in (row.get("writers") or "").split(";") if w.strip()],
-                    }
-    except Exception as e:
-        print("read_seed_meta error:", e)
-    return None
-
-@st.cache_data(show_spinner=False)
-def fetch_metadata(imdb_id, title=None, year=None, is_series=False, existing=None):
-    """
-    OMDb öncelikli, gerekirse TMDB fallback ile metadata getirir.
-    Yalnızca Firestore'daki mevcut (manuel) değerleri BOŞ olan alanları doldurur.
-    `existing`: mevcut Firestore değerleri (dict), varsa.
-    """
-    # Fetch metadata as usual
-    omdb_result = None
-    tmdb_result = None
-    omdb_genres = []
-    omdb_data = None
-    try:
-        omdb_key = os.getenv("OMDB_API_KEY")
-        if omdb_key and imdb_id:
-            url = f"http://www.omdbapi.com/?i={imdb_id}&apikey={omdb_key}&plot=short&r=json"
-            r = requests.get(url, timeout=12)
-            if r.status_code == 200:
-                d = r.json()
-                if d.get("Response") == "True":
-                    omdb_data = d
-                    # Alan bazında kontrol: "N/A" ise sadece o alanı boş bırak
-                    directors = [] if d.get("Director") in (None, "N/A") else [x.strip() for x in (d.get("Director", "")).split(",") if x.strip()]
-                    cast = [] if d.get("Actors") in (None, "N/A") else [x.strip() for x in (d.get("Actors", "")).split(",") if x.strip()]
-                    genres = [] if d.get("Genre") in (None, "N/A") else [x.strip() for x in (d.get("Genre", "")).split(",") if x.strip()]
-                    writers = [] if d.get("Writer") in (None, "N/A") else [x.strip() for x in (d.get("Writer", "")).split(",") if x.strip()]
-                    omdb_genres = genres
-                    if (not directors) and writers:
-                        omdb_result = {
-                            "directors": [],
-                            "cast": cast,
-                            "genres": genres,
-                            "writers": writers,
-                            "debug_log": "Writers from OMDb (no directors)"
-                        }
-                    elif directors or cast or genres or writers:
-                        omdb_result = {
-                            "directors": directors,
-                            "cast": cast,
-                            "genres": genres,
-                            "writers": writers,
-                            "debug_log": "Directors from OMDb"
-                        }
-    except Exception as e:
-        print("fetch_metadata OMDb error:", e)
-
-    try:
-        tmdb_key = os.getenv("TMDB_API_KEY")
-        if tmdb_key and imdb_id:
-            find_url = f"https://api.themoviedb.org/3/find/{imdb_id}"
-            params = {"api_key": tmdb_key, "external_source": "imdb_id"}
-            r = requests.get(find_url, params=params, timeout=12)
-            if r.status_code == 200:
-                j = r.json()
-                results = j.get("movie_results") or j.get("tv_results") or []
-                if results:
-                    tmdb_id = results[0].get("id")
-                    search_type = "movie" if j.get("movie_results") else "tv"
-                    details_url = f"https://api.themoviedb.org/3/{search_type}/{tmdb_id}"
-                    d_resp = requests.get(details_url, params={"api_key": tmdb_key, "append_to_response": "credits"}, timeout=12)
-                    if d_resp.status_code == 200:
-                        det = d_resp.json()
-                        genres = [g.get("name") for g in det.get("genres", []) if g.get("name")]
-                        directors = [c.get("name") for c in det.get("credits", {}).get("crew", []) if c.get("job") == "Director" and c.get("name")]
-                        writers = [c.get("name") for c in det.get("credits", {}).get("crew", []) if c.get("job") == "Writer" and c.get("name")]
-                        creators = []
-                        debug_extra = None
-                        if search_type == "tv":
-                            if "created_by" in det:
-                                if det.get("created_by"):
-                                    creators = [c.get("name") for c in det.get("created_by", []) if c.get("name")]
-                                    if not creators:
-                                        debug_extra = "created_by field present but empty"
-                                    else:
-                                        debug_extra = f"Creators found: {', '.join(creators)}"
-                                else:
-                                    debug_extra = "created_by field present but empty"
-                            else:
-                                debug_extra = "created_by field missing from TMDB response"
-                        if creators:
-                            writers.extend([c for c in creators if c not in writers])
-                        orig_directors = list(directors)
-                        orig_creators = list(creators)
-                        debug_log = ""
-                        if search_type == "tv":
-                            if orig_directors and orig_creators:
-                                debug_log = f"Directors from TMDB crew; Creators from TMDB created_by ({', '.join(orig_creators)})"
-                            elif orig_directors and not orig_creators:
-                                debug_log = "Directors found in TMDB crew"
-                            elif orig_creators and not orig_directors:
-                                debug_log = f"Creators only from TMDB created_by ({', '.join(orig_creators)})"
-                            else:
-                                debug_log = "No directors/creators found in TMDB"
-                        else:
-                            if orig_directors:
-                                debug_log = "Directors found in TMDB crew"
-                            else:
-                                debug_log = "No directors found in TMDB"
-                        if debug_extra:
-                            debug_log = debug_log + " | " + debug_extra if debug_log else debug_extra
-                        cast = [c for c in det.get("credits", {}).get("cast", [])][:8]
-                        if not genres:
-                            genres = ["Unknown"]
-                        tmdb_result = {
-                            "directors": directors if directors else [],
-                            "cast": cast,
-                            "genres": genres,
-                            "writers": writers,
-                            "debug_log": debug_log,
-                            "created_by": det.get("created_by", []),
-                        }
-                        if det.get("created_by"):
-                            for c in det["created_by"]:
-                                n = c.get("name")
-                                if n and n not in tmdb_result["writers"]:
-                                    tmdb_result["writers"].append(n)
-    except Exception as e:
-        print("fetch_metadata TMDB error:", e)
-
-    # --- Unified merge logic for directors, writers, cast, genres ---
-    def is_empty(val):
-        # Returns True if val is None, empty, or "n/a", "none", "unknown" (case-insensitive)
-        if not val:
-            return True
-        if isinstance(val, str):
-            return str(val).strip().lower() in ["n/a", "none", "unknown", ""]
-        if isinstance(val, (list, tuple, set)):
-            # If all items are empty, the whole field is empty
-            return all(is_empty(v) for v in val)
-        if isinstance(val, dict):
-            # If all values are empty, the dict is empty
-            return all(is_empty(v) for v in val.values())
-        return False
-
-    def merge_field(omdb_val, tmdb_val):
-        """
-        Merge fields from OMDb and TMDb for any of: writers, directors, cast, genres.
-        - If OMDb is empty (None, "", "N/A", "unknown", etc), use TMDb.
-        - If TMDb is empty, use OMDb.
-        - If both are present, merge uniquely (preserving order).
-        - Accepts string, list, or list of dicts (with "name").
-        """
-        IGNORE_VALUES = ("n/a", "unknown", "none", "")
-        def normalize(val):
-            # Accepts str, list of str, list of dicts (with "name"), or None
-            if not val:
-                return []
-            # If it's a dict with "name", treat as one item
-            if isinstance(val, dict):
-                n = val.get("name")
-                if n and str(n).strip().lower() not in IGNORE_VALUES:
-                    return [str(n).strip()]
-                return []
-            if isinstance(val, str):
-                # OMDb: comma or semicolon separated string
-                parts = [p.strip() for p in re.split(r"[;,]", val) if p and p.strip().lower() not in IGNORE_VALUES]
-                return parts
-            if isinstance(val, list):
-                cleaned = []
-                for v in val:
-                    if isinstance(v, dict):
-                        n = v.get("name")
-                        if n and str(n).strip().lower() not in IGNORE_VALUES:
-                            cleaned.append(str(n).strip())
-                    elif isinstance(v, str):
-                        if v.strip().lower() not in IGNORE_VALUES:
-                            cleaned.append(v.strip())
-                return cleaned
-            return []
-
-        omdb_is_empty = is_empty(omdb_val)
-        tmdb_is_empty = is_empty(tmdb_val)
-        omdb_list = normalize(omdb_val)
-        tmdb_list = normalize(tmdb_val)
-        # If OMDb is empty, use TMDb
-        if omdb_is_empty and not tmdb_is_empty:
-            return tmdb_list
-        # If TMDb is empty, use OMDb
-        if tmdb_is_empty and not omdb_is_empty:
-            return omdb_list
-        # If both are empty, return []
-        if omdb_is_empty and tmdb_is_empty:
-            return []
-        # Both are present: merge
-        merged = list(dict.fromkeys(omdb_list + tmdb_list))
-        return merged
-
-    # OMDb/TMDb raw data
-    # omdb_data is already set above, never set to None forcibly anymore
-    tmdb_data = tmdb_result if tmdb_result else {}
-
-    meta = {}
-    # Writers: prefer created_by from TMDb if present, else writers field
-    meta["writers"] = merge_field(
-        omdb_data.get("Writer") if omdb_data else None,
-        tmdb_data.get("created_by") if tmdb_data.get("created_by") else tmdb_data.get("writers")
-    )
-    # Directors: If OMDb is missing or "N/A", fall back to TMDb crew (job == "Director") or created_by.
-    omdb_director_val = omdb_data.get("Director") if omdb_data else None
-    tmdb_director_val = tmdb_data.get("directors")
-    # If OMDb is empty, use created_by for TV, else TMDb directors
-    if is_empty(omdb_director_val):
-        # For TV, prefer created_by if present, else directors
-        tmdb_director_val = tmdb_data.get("created_by") if tmdb_data.get("created_by") else tmdb_data.get("directors")
-    meta["directors"] = merge_field(
-        omdb_director_val,
-        tmdb_director_val
-    )
-    # Cast
-    meta["cast"] = merge_field(
-        omdb_data.get("Actors") if omdb_data else None,
-        tmdb_data.get("cast")
-    )
-    # Genres
-    meta["genres"] = merge_field(
-        omdb_data.get("Genre") if omdb_data else None,
-        tmdb_data.get("genres")
-    )
-    # --- Enhanced debug block: print both raw OMDb/TMDb JSON and merged field sources ---
-    print("==== DEBUG METADATA SOURCES ====")
-    print("OMDb raw:", json.dumps(omdb_data, indent=2, ensure_ascii=False) if omdb_data else None)
-    print("TMDb raw:", json.dumps(tmdb_data, indent=2, ensure_ascii=False) if tmdb_data else None)
-    print("Merged Directors:", meta["directors"])
-    print("Merged Writers:", meta["writers"])
-    print("Merged Cast:", meta["cast"])
-    print("Merged Genres:", meta["genres"])
-    print("==== END DEBUG ====")
-    # --- Debug prints for raw/merged values ---
-    print(f"DEBUG directors: OMDb={omdb_data.get('Director') if omdb_data else None}, TMDb={tmdb_data.get('directors')} → {meta['directors']}")
-    print(f"DEBUG writers: OMDb={omdb_data.get('Writer') if omdb_data else None}, TMDb={tmdb_data.get('created_by') or tmdb_data.get('writers')} → {meta['writers']}")
-    print(f"DEBUG cast: OMDb={omdb_data.get('Actors') if omdb_data else None}, TMDb={tmdb_data.get('cast')} → {meta['cast']}")
-    print(f"DEBUG genres: OMDb={omdb_data.get('Genre') if omdb_data else None}, TMDb={tmdb_data.get('genres')} → {meta['genres']}")
-    # Debug log
-    if omdb_result and omdb_result.get("debug_log"):
-        meta["debug_log"] = omdb_result["debug_log"]
-    elif tmdb_result and tmdb_result.get("debug_log"):
-        meta["debug_log"] = tmdb_result["debug_log"]
-    else:
-        meta["debug_log"] = "No directors/creators found (OMDb+TMDB)"
-
-    # --- Only fill empty fields; keep existing manual values if present ---
-    if existing is not None:
-        result = {}
-        for field in ("directors", "cast", "genres", "writers"):
-            existing_val = existing.get(field)
-
-            def _all_invalid(val_list):
-                return all(
-                    (str(x or "").strip().lower() in ("n/a", "unknown", "none", ""))
-                    for x in val_list
-                )
-
-            is_empty = (
-                not existing_val
-                or (isinstance(existing_val, list) and (len(existing_val) == 0 or _all_invalid(existing_val)))
-            )
-
-            if is_empty:
-                result[field] = meta.get(field, [])
-            else:
-                result[field] = existing_val
-        if "debug_log" in meta:
-            result["debug_log"] = meta["debug_log"]
-        return result
-    else:
-        return meta
-
-def backfill_metadata(limit=20):
-    db = get_firestore()
-    # --- Retry from missing_metadata.csv before scanning all docs ---
-    retry_entries = []
-    try:
-        if os.path.exists("missing_metadata.csv"):
-            with open("missing_metadata.csv", newline="", encoding="utf-8") as f:
-                r = csv.DictReader(f)
-                for row in r:
-                    imdb_id = (row.get("imdb_id") or "").strip()
-                    title = (row.get("title") or "").strip()
-                    year = (row.get("year") or "").strip()
-                    if imdb_id and imdb_id != "tt0000000":
-                        retry_entries.append((title, year, imdb_id))
-    except Exception as e:
-        print("retry load missing_metadata error:", e)
-
-    # Try to refetch metadata for all retry_entries
-    cleaned_missing = []
-    for title, year, imdb_id in retry_entries:
-        meta = fetch_metadata(imdb_id, title, year, is_series=True)
-        if meta and (meta.get("directors") or meta.get("cast") or meta.get("genres") or meta.get("writers")):
-            try:
-                update_data = {
-                    "directors": meta.get("directors", []),
-                    "cast":      meta.get("cast", []),
-                    "genres":    meta.get("genres", []),
-                    "writers":   meta.get("writers", []),
-                }
-                # Update Firestore if doc exists
-                matches = list(db.collection("favorites").where("imdb", "==", imdb_id).stream())
-                for d in matches:
-                    db.collection("favorites").document(d.id).update(update_data)
-                append_seed_meta(imdb_id, title, year, meta)
-                print(f"✅ Missing re-fetched successfully: {title} ({year})")
-            except Exception as e:
-                print(f"⚠️ Failed to update retried {title}: {e}")
-                cleaned_missing.append({"title": title, "year": year, "imdb_id": imdb_id, "note": "retry failed"})
-        else:
-            cleaned_missing.append({"title": title, "year": year, "imdb_id": imdb_id, "note": "still missing"})
-
-    # Rewrite missing_metadata.csv only with still-missing entries
-    if cleaned_missing:
-        with open("missing_metadata.csv", "w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(["title", "year", "imdb_id", "note"])
-            for row in cleaned_missing:
-                writer.writerow([row["title"], row["year"], row["imdb_id"], row["note"]])
-    else:
-        # If all recovered, wipe the file clean
-        with open("missing_metadata.csv", "w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(["title", "year", "imdb_id", "note"])
-    # toplamı göstermek için önce topla
-    all_docs = []
-    for type_name, collection in [("movie", "favorites"), ("show", "favorites")]:
-        for d in db.collection(collection).where("type", "==", type_name).stream():
-            all_docs.append((type_name, collection, d))
-
-    total = len(all_docs) or 1
-    progress = st.progress(0)
-    status = st.empty()
-
-    count = 0
-    updated = 0
-    not_updated = []
-
-    docs_to_process = all_docs if limit is None else all_docs[:limit]
-
-    for idx, (type_name, collection, doc) in enumerate(docs_to_process, start=1):
-        item = doc.to_dict()
-        imdb_id = (item.get("imdb") or "").strip()
-        title = item.get("title")
-        year = item.get("year")
-
-        if not imdb_id or imdb_id == "tt0000000":
-            status.write(f"⏭ Skipped (no imdb): {title} ({year}) [{idx}/{total}]")
-            progress.progress(int(idx/total*100))
-            append_missing_meta(title, year, imdb_id, "no imdb id")
-            count += 1
-            continue
-
-        meta = read_seed_meta(imdb_id)
-        meta_source = "seed"
-        # If meta exists but directors, cast, genres, or writers are missing, try to fetch again from OMDb/TMDB
-        if meta and (not meta.get("directors") or not meta.get("cast") or not meta.get("genres") or not meta.get("writers")):
-            new_meta = fetch_metadata(imdb_id, title, year, is_series=(type_name == "show"))
-            if new_meta:
-                if not meta.get("directors"):
-                    meta["directors"] = new_meta.get("directors", [])
-                if not meta.get("cast"):
-                    meta["cast"] = new_meta.get("cast", [])
-                if not meta.get("genres"):
-                    meta["genres"] = new_meta.get("genres", [])
-                if not meta.get("writers"):
-                    meta["writers"] = new_meta.get("writers", [])
-                meta_source = "fetch"
-        if not meta:
-            meta = fetch_metadata(imdb_id, title, year, is_series=(type_name == "show"))
-            meta_source = "fetch"
-            time.sleep(0.5)
-            # If fetch_metadata returns None (should not anymore), set genres to ["Unknown"]
-            if meta is None:
-                meta = {"directors": [], "cast": [], "genres": ["Unknown"], "writers": []}
-
-        if meta and (meta.get("directors") or meta.get("cast") or meta.get("genres")):
-            # Ensure genres is not empty; if so, set to ["Unknown"]
-            if not meta.get("genres"):
-                meta["genres"] = ["Unknown"]
-            try:
-                update_data = {
-                    "directors": meta.get("directors", []),
-                    "cast":      meta.get("cast", []),
-                    "genres":    meta.get("genres", []),
-                    "writers":   meta.get("writers", []),
-                }
-                db.collection(collection).document(item["id"]).update(update_data)
-                append_seed_meta(imdb_id, title, year, meta)   # ✅ CSV’ye de yaz
-                updated += 1
-                status.write(f"✅ Updated: {title} ({year}) [{idx}/{total}] via {meta_source}")
-            except Exception as e:
-                not_updated.append(f"{title} ({year})")
-                status.write(f"⚠️ Failed to update Firestore for {title} ({year}): {e}")
-        else:
-            not_updated.append(f"{title} ({year})")
-            status.write(f"⚠️ No metadata: {title} ({year}) [{idx}/{total}]")
-            # Write to missing_metadata.csv on failure
-            append_missing_meta(title, year, imdb_id, "no meta found")
-
-        count += 1
-        progress.progress(int(idx/total*100))
-
-    progress.progress(100)
-    progress.empty()
-    st.success(f"Done. Scanned: {count}, updated: {updated}, not updated: {len(not_updated)}")
-    if not_updated:
-        st.warning(f"⚠️ Güncellenemeyenler: {len(not_updated)}")
-        st.write(not_updated)
-        # --- Export not_updated list to CSV ---
-        import csv
-        rows = []
-        for entry in not_updated:
-            # Try to split "Title (Year)" pattern
-            title = entry
-            year = ""
-            imdb_id = ""
-            note = ""
-            try:
-                # Try to extract title and year
-                import re
-                m = re.match(r"^(.*)\s+\((\d{4})\)$", entry.strip())
-                if m:
-                    title = m.group(1).strip()
-                    year = m.group(2).strip()
-                else:
-                    title = entry.strip()
-                    year = ""
-            except Exception:
-                title = entry
-                year = ""
-            # Try to get imdb_id from Firestore
-            # Search all_docs for matching title and year
-            imdb_id = ""
-            for _type, _coll, _doc in all_docs:
-                d = _doc.to_dict()
-                t = (d.get("title") or "").strip()
-                y = str(d.get("year") or "").strip()
-                if title == t and (not year or year == y):
-                    imdb_id = (d.get("imdb") or d.get("imdb_id") or "").strip()
-                    break
-            rows.append([title, year, imdb_id, note])
-        # Write to CSV
-        with open("missing_metadata.csv", "w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(["title", "year", "imdb_id", "note"])
-            for row in rows:
-                writer.writerow(row)
-        st.success("missing_metadata.csv dosyası oluşturuldu.")
-def validate_imdb_id(imdb_id, title=None, year=None):
-    """
-    IMDb ID'nin OMDb'de geçerli olup olmadığını kontrol eder.
-    Öncelikle seed_ratings.csv'yi kontrol eder. Eğer orada geçerli rating varsa imdb_id'yi döndürür.
-    Eğer geçerli değilse, OMDb'den kontrol eder. Eğer OMDb'de geçerli rating varsa imdb_id'yi döndürür.
-    Eğer OMDb'den de alınamazsa, fetch_ratings ile doğru IMDb ID'yi bulmaya çalışır.
-    Doğru ID bulunursa onu döndürür, yoksa None döner.
-    """
-    # 1. Öncelikle seed_ratings.csv'yi kontrol et
-    if imdb_id and imdb_id != "tt0000000":
-        seed_stats = read_seed_rating(imdb_id)
-        if seed_stats and (seed_stats.get("imdb_rating") or seed_stats.get("rt")):
-            return imdb_id
-    # 2. OMDb'de kontrol et
-    if imdb_id and imdb_id != "tt0000000":
-        stats = get_ratings(imdb_id)
-        if stats and (stats.get("imdb_rating") or stats.get("rt")):
-            return imdb_id
-    # 3. OMDb'den rating alınamadıysa veya imdb_id eksikse, fetch_ratings ile deneriz
-    if title:
-        ir, rt, raw = fetch_ratings(title, year)
-        # raw dict ise ve imdbID varsa ve başında "tt" ile başlıyorsa
-        if isinstance(raw, dict):
-            new_id = raw.get("imdbID") or raw.get("imdb_id")
-            if new_id and isinstance(new_id, str) and new_id.startswith("tt") and new_id != "tt0000000":
-                return new_id
-    return None
-from tmdb import search_movie, search_tv, search_by_actor
-from omdb import get_ratings
-from omdb import fetch_ratings
-import csv
-from pathlib import Path
-SEED_META_PATH = Path(__file__).parent / "seed_meta.csv"
-import requests
-import firebase_admin
-import base64
-from firebase_admin import credentials, firestore
+from tmdb import actor_pager, movie_pager, tv_pager
+from validation_cache import get_validation_cache
+from titles import fetch_title_record, parse_tmdb_doc_id, provider_ids_of, tmdb_media_type
+from seeds import append_seed_meta, append_seed_rating
+from metadata import fetch_metadata, get_imdb_id_from_tmdb, resolve_ratings, validate_imdb_id
+from library import backfill_metadata, migrate_provider_ids, push_favorites_to_github, sync_with_firebase
+from jobs import JobAlreadyRunning, get_runner
+from favorites_store import FavoritesStore, bump_data_version
+from warmup import start_warmup
+from breaker import all_status as breaker_status, get_breaker
+from integrity import RULES as INTEGRITY_RULES, scan as scan_integrity
 import json
 import os
 import time
-# ---------- Sorting helpers for Streamio export ----------
-ROMAN_MAP = {
-    "i": 1, "ii": 2, "iii": 3, "iv": 4, "v": 5, "vi": 6, "vii": 7, "viii": 8, "ix": 9, "x": 10,
-}
-
-def _roman_to_int(s: str) -> int | None:
-    s = (s or "").strip().lower()
-    return ROMAN_MAP.get(s)
-
-import re
-_FRANCHISE_WORDS = {"the", "a", "an"}
-
-def _normalize_franchise(title: str) -> str:
-    """Get a coarse franchise/base name from a movie title.
-    Examples:
-      - "The Terminator" -> "terminator"
-      - "Terminator 2: Judgment Day" -> "terminator"
-      - "Back to the Future Part II" -> "back to the future"
-    This is a heuristic; it deliberately keeps it simple.
-    """
-    t = (title or "").lower()
-    # drop leading article
-    parts = t.split()
-    if parts and parts[0] in _FRANCHISE_WORDS and len(parts) > 1:
-        t = " ".join(parts[1:])
-    # keep text before a colon if it looks like a subtitle
-    t = t.split(":")[0]
-    # remove trailing sequel tokens like numbers/roman/"part X"
-    t = re.sub(r"\bpart\s+[ivx]+\b", "", t).strip()
-    t = re.sub(r"\bpart\s+\d+\b", "", t).strip()
-    t = re.sub(r"\b\d+\b", "", t).strip()
-    t = re.sub(r"\s+", " ", t)
-    return t
-
-def _parse_sequel_number(title: str) -> int:
-    """Try to extract sequel ordering number from a title.
-    Returns 0 if not detected (so originals come first).
-    Supports digits and roman numerals after words like 'part' or alone (e.g., 'Terminator 2').
-    """
-    t = (title or "").lower()
-    # "Part II" / "Part 2"
-    m = re.search(r"\bpart\s+([ivx]+|\d+)\b", t)
-    if m:
-        token = m.group(1)
-        if token.isdigit():
-            return int(token)
-        ri = _roman_to_int(token)
-        if ri:
-            return ri
-    # lone digits after the base word: e.g., "Terminator 2"
-    m = re.search(r"\b(\d+)\b", t)
-    if m:
-        try:
-            return int(m.group(1))
-        except Exception:
-            pass
-    # "II", "III" as standalone
-    m = re.search(r"\b([ivx]{1,4})\b", t)
-    if m:
-        ri = _roman_to_int(m.group(1))
-        if ri:
-            return ri
-    return 0
-
-def _compute_franchise_min_year(items: list[dict]) -> dict[str, int]:
-    """Return {base_name: min_year} for bases that have 2+ items in the list.
-    Non-numeric/missing years are ignored.
-    """
-    years_by_base: dict[str, list[int]] = {}
-    for it in items:
-        base = _normalize_franchise(it.get("title", ""))
-        try:
-            y = int(it.get("year") or 0)
-        except Exception:
-            y = 0
-        years_by_base.setdefault(base, []).append(y)
-    return {b: min([y for y in ys if isinstance(y, int)]) for b, ys in years_by_base.items() if len(ys) >= 2}
-
-def sort_media_for_export(items: list[dict], apply_franchise: bool = True) -> list[dict]:
-    """Sort newest->oldest by *group year* (franchise min-year if grouped),
-    then by sequel number (1,2,3…) inside the same franchise, otherwise by CineSelect.
-    """
-    items = list(items or [])
-    base_min_year = _compute_franchise_min_year(items) if apply_franchise else {}
-
-    def keyfn(it: dict):
-        # group year: min franchise year if franchise exists (2+ items), else own year
-        base = _normalize_franchise(it.get("title", ""))
-        try:
-            own_year = int(it.get("year") or 0)
-        except Exception:
-            own_year = 0
-        group_year = base_min_year.get(base, own_year)
-        # sequel number only meaningful if multiple in same base
-        sequel_no = _parse_sequel_number(it.get("title", "")) if base in base_min_year else 0
-        # tie-breaker by CineSelect rating (desc)
-        cs = it.get("cineselectRating") or 0
-        return (-group_year, base, sequel_no, -int(cs))
-
-    return sorted(items, key=keyfn)
-# ---------- /sorting helpers ----------
-# --- seed_ratings.csv için yol ve ekleme fonksiyonu ---
-SEED_PATH = Path(__file__).parent / "seed_ratings.csv"
-
-def append_seed_rating(imdb_id, title, year, imdb_rating, rt_score):
-    """seed_ratings.csv'ye (yoksa) yeni satır ekler; varsa dokunmaz."""
-    if not imdb_id or imdb_id == "tt0000000":
-        return
-
-    # Zaten var mı kontrol et
-    exists = False
-    if SEED_PATH.exists():
-        with SEED_PATH.open(newline="", encoding="utf-8") as f:
-            for r in csv.DictReader(f):
-                if r.get("imdb_id") == imdb_id:
-                    exists = True
-                    break
-    if exists:
-        return  # Aynı imdb_id zaten kayıtlı
-
-    # Başlık yazmak gerekir mi?
-    write_header = not SEED_PATH.exists() or SEED_PATH.stat().st_size == 0
-
-    with SEED_PATH.open("a", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        if write_header:
-            w.writerow(["imdb_id", "title", "year", "imdb_rating", "rt"])
-        w.writerow([
-            imdb_id,
-            title,
-            str(year or ""),
-            (imdb_rating if imdb_rating is not None else ""),
-            (rt_score if rt_score is not None else ""),
-        ])
-# --- /seed ekleme fonksiyonu ---
-
-# --- seed okuma fonksiyonu ---
-@st.cache_data(show_spinner=False)
-def read_seed_rating(imdb_id: str):
-    """seed_ratings.csv içinden imdb_id ile eşleşen satırı döndürür.
-    {'imdb_rating': float|None, 'rt': int|None} şeklinde veri verir; bulunamazsa None döner.
-    Hem 'imdb_id' hem de 'imdb' sütun adlarını destekler.
-    """
-    try:
-        iid = (imdb_id or "").strip()
-        if not iid or not SEED_PATH.exists():
-            return None
-        with SEED_PATH.open(newline="", encoding="utf-8") as f:
-            r = csv.DictReader(f)
-            for row in r:
-                key = (row.get("imdb_id") or row.get("imdb") or "").strip()
-                if key == iid:
-                    # değerleri temizle
-                    ir = row.get("imdb_rating")
-                    rt = row.get("rt")
-                    try:
-                        ir_val = float(ir) if ir not in (None, "", "N/A") else None
-                    except Exception:
-                        ir_val = None
-                    try:
-                        rt_val = int(float(rt)) if rt not in (None, "", "N/A") else None
-                    except Exception:
-                        rt_val = None
-                    # If both are missing/invalid/zero, return None so OMDb fallback works
-                    imdb_invalid = ir_val in (None, 0, 0.0)
-                    rt_invalid = rt_val in (None, 0)
-                    # Special case: IMDb rating string "0.0"
-                    if isinstance(ir, str) and ir.strip() in ("0", "0.0"):
-                        imdb_invalid = True
-                    if isinstance(rt, str) and rt.strip() == "0":
-                        rt_invalid = True
-                    # Also treat "N/A" as invalid (already handled above)
-                    if imdb_invalid and rt_invalid:
-                        return None
-                    return {"imdb_rating": ir_val, "rt": rt_val}
-    except Exception:
-        pass
-    return None
-# --- /seed okuma fonksiyonu ---
-
-# --- seed_meta.csv ekleme fonksiyonu ---
-def overwrite_seed_meta(docs):
-    """seed_meta.csv'yi Firestore'dan tamamen yeniden yazar."""
-    try:
-        with SEED_META_PATH.open("w", newline="", encoding="utf-8") as f:
-            w = csv.writer(f)
-            w.writerow(["imdb_id", "title", "year", "directors", "cast", "genres", "writers"])
-            for doc in docs:
-                item = doc.to_dict()
-                imdb_id = item.get("imdb", "")
-                title = item.get("title", "")
-                year = item.get("year", "")
-                directors   = "; ".join(item.get("directors", []))
-                cast        = "; ".join(item.get("cast", []))
-                genres      = "; ".join(item.get("genres", []))
-                writers     = "; ".join(item.get("writers", []))
-                w.writerow([imdb_id, title, year, directors, cast, genres, writers])
-    except Exception as e:
-        print("overwrite_seed_meta error:", e)
-
-def append_seed_meta(imdb_id, title, year, meta):
-    """seed_meta.csv'ye (yoksa) yeni satır ekler; varsa dokunmaz."""
-    if not imdb_id or imdb_id == "tt0000000":
-        return
-    exists = False
-    if SEED_META_PATH.exists():
-        with SEED_META_PATH.open(newline="", encoding="utf-8") as f:
-            for r in csv.DictReader(f):
-                if r.get("imdb_id") == imdb_id:
-                    exists = True
-                    break
-    if exists:
-        return
-    write_header = not SEED_META_PATH.exists() or SEED_META_PATH.stat().st_size == 0
-    with SEED_META_PATH.open("a", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        if write_header:
-            w.writerow(["imdb_id", "title", "year", "directors", "cast", "genres", "writers"])
-        w.writerow([
-            imdb_id,
-            title,
-            str(year or ""),
-            "; ".join(meta.get("directors", [])),
-            "; ".join(meta.get("cast", [])),
-            "; ".join(meta.get("genres", [])),
-            "; ".join(meta.get("writers", [])),
-        ])
-# --- /seed okuma fonksiyonu ---
-def get_imdb_id_from_tmdb(title, year=None, is_series=False):
-    tmdb_api_key = os.getenv("TMDB_API_KEY")
-    if not tmdb_api_key:
-        print("❌ TMDB API key not found in environment variables.")
-        return ""
-
-    search_type = "tv" if is_series else "movie"
-    search_url = f"https://api.themoviedb.org/3/search/{search_type}"
-    params = {
-        "api_key": tmdb_api_key,
-        "query": title,
-        "year": year if not is_series else None,
-        "first_air_date_year": year if is_series else None,
-    }
-
-    response = requests.get(search_url, params=params)
-    if response.status_code != 200:
-        return ""
-
-    results = response.json().get("results", [])
-    if not results:
-        return ""
-
-    tmdb_id = results[0]["id"]
-    external_ids_url = f"https://api.themoviedb.org/3/{search_type}/{tmdb_id}/external_ids"
-    external_response = requests.get(external_ids_url, params={"api_key": tmdb_api_key})
-    if external_response.status_code != 200:
-        return ""
-
-    imdb_id = external_response.json().get("imdb_id", "")
-    return imdb_id or ""
-def push_favorites_to_github():
-    """Push favorites.json, seed_ratings.csv, seed_meta.csv, and missing_metadata.csv to their respective GitHub repos.
-    - favorites.json  -> serkansu/cineselect-addon
-    - seed_ratings.csv -> serkansu/cineselect-manager-online
-    - seed_meta.csv -> serkansu/cineselect-manager-online
-    - missing_metadata.csv -> serkansu/cineselect-manager-online
-    """
-    github_token = os.getenv("GITHUB_TOKEN")
-    if not github_token:
-        st.warning("⚠️ GITHUB_TOKEN environment variable is missing!")
-        st.error("❌ GitHub token bulunamadı. Environment variable ayarlanmalı.")
-        return
-
-    # Which file goes to which repo
-    publish_plan = [
-        {"file": "favorites.json", "owner": "serkansu", "repo": "cineselect-addon"},
-        {"file": "seed_ratings.csv", "owner": "serkansu", "repo": "cineselect-manager-online"},
-        {"file": "seed_meta.csv", "owner": "serkansu", "repo": "cineselect-manager-online"},
-        {"file": "missing_metadata.csv", "owner": "serkansu", "repo": "cineselect-manager-online"},
-    ]
-
-    headers = {
-        "Authorization": f"token {github_token}",
-        "Accept": "application/vnd.github.v3+json",
-    }
-
-    for item in publish_plan:
-        file_path = item["file"]
-        repo_owner = item["owner"]
-        repo_name = item["repo"]
-        commit_message = f"Update {file_path} via Streamlit sync"
-        url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/contents/{file_path}"
-
-        # Read file to upload; skip if missing
-        try:
-            with open(file_path, "rb") as f:
-                content = f.read()
-        except FileNotFoundError:
-            st.warning(f"⚠️ Dosya bulunamadı, atlandı: {file_path}")
-            continue
-
-        encoded_content = base64.b64encode(content).decode("utf-8")
-
-        # Get current SHA if file exists
-        response = requests.get(url, headers=headers)
-        if response.status_code == 200:
-            sha = response.json().get("sha")
-        elif response.status_code == 404:
-            sha = None
-        else:
-            st.error(f"❌ GitHub API erişim hatası ({file_path} → {repo_owner}/{repo_name}): {response.status_code}")
-            try:
-                st.code(response.json())
-            except Exception:
-                pass
-            continue
-
-        payload = {
-            "message": commit_message,
-            "content": encoded_content,
-            "branch": "main",
-        }
-        if sha:
-            payload["sha"] = sha
-
-        put_response = requests.put(url, headers=headers, json=payload)
-        if put_response.status_code not in (200, 201):
-            st.error(f"❌ Push başarısız ({file_path} → {repo_owner}/{repo_name}): {put_response.status_code}")
-            try:
-                st.code(put_response.json())
-            except Exception:
-                pass
-        else:
-            st.success(f"✅ Push OK: {file_path} → {repo_owner}/{repo_name}")
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from firebase_setup import get_firestore
-def fix_invalid_imdb_ids(data):
-    for section in ["movies", "shows"]:
-        for item in data[section]:
-            if isinstance(item.get("imdb"), (int, float)):
-                item["imdb"] = ""
-
-def sort_flat_for_export(items, mode):
-    """Sort a flat media list by selected mode in descending order.
-    mode: 'imdb' | 'cc' | 'year'
-    """
-    def key_fn(it):
-        if mode == "imdb":
-            v = it.get("imdbRating")
-            try:
-                return float(v) if v not in (None, "", "N/A") else -1
-            except Exception:
-                return -1
-        elif mode == "year":
-            try:
-                return int(str(it.get("year", "0")).strip() or 0)
-            except Exception:
-                return 0
-        # default: CineSelect score
-        try:
-            return int(it.get("cineselectRating") or 0)
-        except Exception:
-            return 0
-    return sorted(items or [], key=key_fn, reverse=True)
-
 # ---------------------- CineSelect clamp & sync helpers ----------------------
 def _clamp_cs(v: int | float) -> int:
     try:
@@ -1044,96 +168,238 @@ def ensure_authenticated():
     st.stop()
 # --- /auth gate ---
 
-def sync_with_firebase(sort_mode="cc"):
-    favorites_data = {
-        "movies": st.session_state.get("favorite_movies", []),
-        "shows": st.session_state.get("favorite_series", [])
+# ---------------------- Background jobs UI ----------------------
+JOB_LABELS = {
+    "sync": "📂 JSON & CSV Sync",
+    "backfill": "🧩 Metadata Backfill",
+    "publish": "🚀 GitHub yayını",
+    "migrate_provider_ids": "🧬 Sağlayıcı ID göçü",
+}
+JOB_STATUS_ICONS = {
+    "queued": "⏳", "running": "🔄", "succeeded": "✅", "failed": "❌", "interrupted": "⚠️",
+}
+
+
+def start_job(name, fn, **params):
+    """İşi arka planda başlatır; aynısı çalışıyorsa uyarı gösterir."""
+    try:
+        get_runner().submit(name, fn, **params)
+    except JobAlreadyRunning as e:
+        st.warning(f"⚠️ {JOB_LABELS.get(name, name)} zaten çalışıyor (iş {e.job_id}).")
+        return
+    # jobs_panel'in run_every'si betik başında belirlenir: yoklamanın hemen başlaması için yeniden çalıştır
+    st.session_state["_job_toast"] = f"{JOB_LABELS.get(name, name)} arka planda başladı."
+    st.rerun()
+
+
+_JOBS_POLLING = get_runner().active()
+
+
+@st.fragment(run_every=2 if _JOBS_POLLING else None)
+def jobs_panel():
+    """Son işlerin durumu; aktif iş varken kendi kendini 2 sn'de bir yeniler."""
+    toast = st.session_state.pop("_job_toast", None)
+    if toast:
+        st.toast(toast, icon="🚀")
+    if _JOBS_POLLING and not get_runner().active():
+        # İş bitti: yoklamayı durdurmak (ve sonuçları listede göstermek) için tüm sayfa yeniden çizilir
+        st.rerun()
+    recent = get_runner().recent(limit=5)
+    if not recent:
+        return
+    with st.expander("⚙️ Arka plan işleri", expanded=any(j["status"] in ("queued", "running") for j in recent)):
+        for job in recent:
+            label = JOB_LABELS.get(job["name"], job["name"])
+            icon = JOB_STATUS_ICONS.get(job["status"], "•")
+            started = time.strftime("%H:%M:%S", time.localtime(job["created_at"] or 0))
+            st.markdown(f"{icon} **{label}** · {job['status']} · {started}")
+            if job["status"] in ("queued", "running"):
+                st.progress(float(job["progress"] or 0), text=job.get("message") or "")
+            elif job["status"] == "failed":
+                st.error(job.get("error") or job.get("message") or "Hata")
+            elif job.get("result") is not None:
+                st.caption(f"Sonuç: {json.dumps(job['result'], ensure_ascii=False)}")
+            if job.get("log"):
+                with st.popover("Günlük"):
+                    st.code("\n".join(entry["msg"] for entry in job["log"][-50:]))
+# ---------------------- /Background jobs UI ----------------------
+
+# ---------------------- Pipelined "Add to Favorites" ----------------------
+@st.cache_resource(show_spinner=False)
+def favorites_store() -> FavoritesStore:
+    """Tüm oturumların paylaştığı favoriler önbelleği (veri sürümü değişince yenilenir)."""
+    return FavoritesStore()
+
+
+@st.cache_resource(show_spinner=False)
+def _csv_writer_pool():
+    """CSV eklemeleri için tek işçili havuz: yazımlar istek yolundan çıkar ama sıralı kalır."""
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="csv-writer")
+
+
+@st.cache_resource(show_spinner=False)
+def _add_latency_log():
+    """Son eklemelerin uçtan uca süreleri (ms), tüm oturumlar için ortak."""
+    return deque(maxlen=50)
+
+
+def _append_seeds_in_background(imdb_id, title, year, imdb_rating, rt_score, meta, tmdb_id=None, tmdb_type=None):
+    def _write():
+        try:
+            append_seed_rating(imdb_id=imdb_id, title=title, year=year,
+                               imdb_rating=imdb_rating, rt_score=rt_score,
+                               tmdb_id=tmdb_id, tmdb_type=tmdb_type)
+            append_seed_meta(imdb_id, title, year, meta, tmdb_id=tmdb_id, tmdb_type=tmdb_type)
+        except Exception as e:
+            print(f"background seed append error ({title}): {e}")
+    return _csv_writer_pool().submit(_write)
+
+
+def add_favorite_pipelined(item, media_key, cineselect_value):
+    """
+    Favori ekleme akışı:
+      1) IMDb ID çöz + doğrula (TMDB id biliniyorsa tek detay isteğinin external_ids'inden)
+      2) Birleşik başlık kaydı: OMDb ve TMDB'ye birer istek, paralel
+      3) Puanlar ve metadata aynı kayıttan türetilir
+      4) Firestore'a yazılır, seed CSV'leri arka planda eklenir
+    Dönüş: arayüzde gösterilecek teşhis/süre raporu (dict).
+    """
+    t0 = time.perf_counter()
+    title = item["title"]
+    year = item.get("year")
+    is_series = (media_key == "show")
+    tmdb_id = parse_tmdb_doc_id(item["id"])
+    tmdb_type = tmdb_media_type(is_series)
+
+    # 1) IMDb ID garanti altına al + doğrula
+    record = None
+    imdb_id = (item.get("imdb") or "").strip()
+    if not imdb_id or imdb_id == "tt0000000":
+        if tmdb_id:
+            record = fetch_title_record(None, tmdb_id, tmdb_type)
+            imdb_id = record.get("imdb_id") or ""
+        if not imdb_id:
+            imdb_id = get_imdb_id_from_tmdb(title=title, year=year, is_series=is_series)
+    verified_id = validate_imdb_id(imdb_id, title, year)
+    imdb_id = verified_id or imdb_id
+    t_resolved = time.perf_counter()
+
+    # 2) Birleşik kayıt (ID doğrulamada değiştiyse yeniden; sağlayıcı yanıtları bellekte paylaşılır)
+    if record is None or record.get("imdb_id") != imdb_id:
+        record = fetch_title_record(imdb_id, tmdb_id, tmdb_type)
+
+    # 3) Puanlar ve metadata aynı kayıttan
+    stats, source, raw_id, raw_title = resolve_ratings(imdb_id, title, year, record=record)
+    try:
+        new_meta = fetch_metadata(imdb_id, title, year, is_series=is_series, tmdb_id=tmdb_id)
+    except Exception as e:
+        print("fetch_metadata error:", e)
+        new_meta = None
+    t_fetched = time.perf_counter()
+
+    imdb_rating = float(stats.get("imdb_rating") or 0.0)
+    rt_score = int(stats.get("rt") or 0)
+    meta = new_meta if new_meta else {"directors": [], "cast": [], "genres": [], "writers": []}
+
+    # 3) Firestore'a yaz
+    doc_data = {
+        "id": item["id"],
+        "title": title,
+        "year": year,
+        "imdb": imdb_id,
+        "imdb_verified": bool(verified_id),
+        "tmdb_id": tmdb_id,
+        "tmdb_type": tmdb_type,
+        "poster": item.get("poster"),
+        "imdbRating": imdb_rating,                 # ✅ eklendi
+        "rt": rt_score,                            # ✅ CSV/OMDb’den gelen kesin değer
+        "cineselectRating": cineselect_value,
+        "type": media_key,
+        "directors": meta.get("directors", []),
+        "cast": meta.get("cast", []),
+        "genres": meta.get("genres", []),
+        "writers": meta.get("writers", []),
     }
-    fix_invalid_imdb_ids(favorites_data)  # IMDb puanı olanları temizle
-    # IMDb düzeltmesinden sonra type alanını normalize et
-    for section in ["movies", "shows"]:
-        for item in favorites_data[section]:
-            t = item.get("type", "").lower()
-            if t in ["tv", "tvshow", "show", "series"]:
-                item["type"] = "show"
-            elif t in ["movie", "film"]:
-                item["type"] = "movie"
-    # IMDb ID eksikse ➜ tamamlama başlıyor
-    # Eksik imdb id'leri tamamla
-    for section in ["movies", "shows"]:
-        for item in favorites_data[section]:
-            if not item.get("imdb") or item.get("imdb") == "":
-                title = item.get("title")
-                year = item.get("year")
-                raw_type = item.get("type", "").lower()
-                section_name = section.lower()
-
-                is_series_by_section = section_name in ["shows", "series"]
-                is_series_by_type = raw_type in ["series", "tv", "tv_show", "tvshow", "show"]
-
-                is_series = is_series_by_section or is_series_by_type
-                # NOTE: İç tip alanını tutarlı hale getiriyoruz: dizi için 'show', film için 'movie'
-                item["type"] = "show" if is_series else "movie"
-                imdb_id = get_imdb_id_from_tmdb(title, year, is_series=is_series)
-                # IMDb ve RT puanlarını çek
-                stats = get_ratings(imdb_id)
-                imdb_rating = stats.get("imdb_rating") if stats else None
-                rt_score = stats.get("rt") if stats else None
-                print(f"🎬 {title} ({year}) | is_series={is_series} → IMDb ID: {imdb_id}")
-                item["imdb"] = imdb_id
-                item["imdbRating"] = float(imdb_rating) if imdb_rating is not None else 0.0
-                item["rt"] = int(rt_score) if rt_score is not None else 0
-                # ⬇️ YENİ: seed_ratings.csv’ye (yoksa) ekle
-                append_seed_rating(imdb_id, title, year, imdb_rating, rt_score)
-    # seed_ratings.csv içinde her favorinin olduğundan emin ol (CSV'de zaten varsa eklenmez)
-    for _section in ("movies", "shows"):
-        for _it in favorites_data.get(_section, []):
-            append_seed_rating(
-                imdb_id=_it.get("imdb"),
-                title=_it.get("title"),
-                year=_it.get("year"),
-                imdb_rating=_it.get("imdbRating"),
-                rt_score=_it.get("rt"),
-            )
-    # ---- Apply export ordering
-    sorted_movies = sort_flat_for_export(favorites_data.get("movies", []), sort_mode)
-    sorted_series = sort_flat_for_export(favorites_data.get("shows", []), sort_mode)
-
-    # Dışarı yazarken anahtar adını 'shows' -> 'series' olarak çevir
-    output_data = {
-        "movies": sorted_movies,
-        "series": sorted_series,
+    # For TV shows, add created_by field if present
+    if media_key == "show" and new_meta and "created_by" in new_meta:
+        doc_data["created_by"] = new_meta["created_by"]
+    db.collection("favorites").document(item["id"]).set(doc_data)
+    bump_data_version("add")
+    t_written = time.perf_counter()
+
+    # 4) seed_ratings.csv ve seed_meta.csv'ye (yoksa) ekle — istek yolunun dışında
+    _append_seeds_in_background(imdb_id, title, year, imdb_rating, rt_score, meta, tmdb_id, tmdb_type)
+
+    total_ms = (time.perf_counter() - t0) * 1000
+    _add_latency_log().append(total_ms)
+    timings = {
+        "resolve_ms": (t_resolved - t0) * 1000,
+        "fetch_ms": (t_fetched - t_resolved) * 1000,
+        "write_ms": (t_written - t_fetched) * 1000,
+        "total_ms": total_ms,
     }
-    with open("favorites.json", "w", encoding="utf-8") as f:
-        json.dump(output_data, f, ensure_ascii=False, indent=4)
-        st.write("🔍 FAVORITES DEBUG (output):", output_data)
-    st.success("✅ favorites.json dosyası yerel olarak oluşturuldu.")
-
-    # --- Overwrite seed_meta.csv and missing_metadata.csv from Firestore ---
-    movie_docs = list(db.collection("favorites").where("type", "==", "movie").stream())
-    series_docs = list(db.collection("favorites").where("type", "==", "show").stream())
-    all_docs = movie_docs + series_docs
-    overwrite_seed_meta(all_docs)
-
-    # Build missing_docs list based on Firestore docs with missing metadata
-    missing_docs = []
-    for d in all_docs:
-        data = d.to_dict()
-        dirs = data.get("directors") or []
-        cast = data.get("cast") or []
-        genres = data.get("genres") or []
-        # Consider missing if any key fields are empty or contain only "Unknown"
-        if (not dirs or dirs == ["Unknown"]) or (not cast) or (not genres or genres == ["Unknown"]):
-            missing_docs.append(d)
-
-    overwrite_missing_meta(missing_docs)
-
-    # GitHub'a push et (tüm CSV dosyaları dahil)
-    push_favorites_to_github()
-    st.success("✅ favorites.json, seed_ratings.csv, seed_meta.csv ve missing_metadata.csv GitHub'a push edildi.")
+    print(f"⏱ add {title} ({year}) | " + " | ".join(f"{k}={v:.0f}" for k, v in timings.items()))
+    return {
+        "title": title,
+        "year": year,
+        "imdb_id": imdb_id,
+        "imdb_rating": imdb_rating,
+        "rt": rt_score,
+        "source": source,
+        "raw_id": raw_id,
+        "raw_title": raw_title,
+        "timings": timings,
+    }
+
+
+def render_add_report(report):
+    """add_favorite_pipelined raporunu (kaynak, ham yanıtlar, süreler) gösterir."""
+    title, year = report["title"], report.get("year")
+    source, imdb_id = report.get("source"), report.get("imdb_id")
+    raw_id, raw_title = report.get("raw_id") or {}, report.get("raw_title") or {}
+    st.success(f"✅ {title} added to favorites!")
+
+    # 🔎 DEBUG: Kaynak ve ham yanıtlar
+    st.write(f"🔍 Source: {source or '—'} | 🆔 IMDb ID: {imdb_id or '—'} | ⭐ IMDb: {report['imdb_rating']} | 🍅 RT: {report['rt']}")
+
+    # Extra, user-visible diagnostics
+    error_msg = None
+    if isinstance(raw_id, dict):
+        error_msg = raw_id.get("Error")
+    if not error_msg and isinstance(raw_title, dict):
+        error_msg = raw_title.get("Error")
+
+    if error_msg:
+        st.error(f"OMDb error: {error_msg}. Check OMDB_API_KEY.", icon="🚨")
+    elif source == "CSV":
+        st.info("Source: seed_ratings.csv (cached)", icon="📂")
+    elif source == "CSV/OMDb-ID":
+        st.info(f"Source: OMDb by IMDb ID ({imdb_id})", icon="🔎")
+    else:
+        st.info(f"Source: OMDb by Title/Year ({title} {year})", icon="🔎")
+
+    t = report["timings"]
+    recent = sorted(_add_latency_log())
+    p50 = recent[len(recent) // 2] if recent else t["total_ms"]
+    st.caption(
+        f"⏱ Ekleme süresi: {t['total_ms']:.0f} ms (ID çözümleme {t['resolve_ms']:.0f} ms, "
+        f"OMDb+TMDB kaydı {t['fetch_ms']:.0f} ms, Firestore {t['write_ms']:.0f} ms) "
+        f"| son {len(recent)} ekleme medyanı: {p50:.0f} ms"
+    )
+    if raw_id or raw_title:
+        with st.expander("OMDb raw JSON"):
+            if raw_id:
+                st.caption("OMDb by ID (raw JSON)")
+                st.code(json.dumps(raw_id, ensure_ascii=False, indent=2))
+            if raw_title:
+                st.caption("OMDb by title (raw JSON)")
+                st.code(json.dumps(raw_title, ensure_ascii=False, indent=2))
+# ---------------------- /Pipelined "Add to Favorites" ----------------------
 
 # --- Page config and auth gate (must run before any Firestore access) ---
 st.set_page_config(page_title="Serkan's Watchagain Movies & Series ONLINE", layout="wide")
+# Süreç başına bir kez: önbellekler giriş ekranı beklenirken arka planda ısıtılır (ekrana veri çizilmez)
+start_warmup(favorites_store())
 ensure_authenticated()
 # --- /Page config & auth gate ---
 import sys
@@ -1144,15 +410,8 @@ except Exception as e:
     st.error(f"❌ Firebase bağlantısı kurulamadı: {e}")
     st.stop()
 
-# --- Tek seferde Firestore'dan tüm favoriler çek ---
-all_docs = [doc.to_dict() for doc in db.collection("favorites").stream()]
-
-# Firestore'dan verileri çek ve session'a yaz
-movie_docs = db.collection("favorites").where("type", "==", "movie").stream()
-series_docs = db.collection("favorites").where("type", "==", "show").stream()
-
-st.session_state["favorite_movies"] = [doc.to_dict() for doc in movie_docs]
-st.session_state["favorite_series"] = [doc.to_dict() for doc in series_docs]
+# Favoriler süreç genelindeki paylaşılan önbellekten okunur (oturum başına kopya yok)
+store = favorites_store()
 st.markdown("""
     <h1 style='text-align:center;'>🍿 <b>Serkan's Watchagain Movies & Series <span style="color:#2ecc71;">ONLINE ✅</span></b></h1>
 """, unsafe_allow_html=True)
@@ -1171,8 +430,7 @@ with col2:
         st.session_state["sync_sort_mode"] = "year"
 
     if st.button("📂 JSON & CSV Sync"):
-        sync_with_firebase(sort_mode=st.session_state.get("sync_sort_mode", "cc"))
-        st.success("✅ favorites.json ve seed_ratings.csv senkronize edildi.")
+        start_job("sync", sync_with_firebase, sort_mode=st.session_state.get("sync_sort_mode", "cc"))
 
     # Butonun ALTINA üç radyo butonu (imdb, cc, year)
     st.radio(
@@ -1184,16 +442,107 @@ with col2:
     )
 
 def show_favorites_count():
-    movie_docs = db.collection("favorites").where("type", "==", "movie").stream()
-    series_docs = db.collection("favorites").where("type", "==", "show").stream()
-
-    movie_count = len(list(movie_docs))
-    series_count = len(list(series_docs))
+    counts = store.counts()
+    movie_count = counts.get("movie", 0)
+    series_count = counts.get("show", 0)
 
     st.info(f"🎬 Favorite Movies: {movie_count} | 📺 Favorite TV Shows: {series_count}")
 if st.button("📊 Favori Sayılarını Göster"):
     show_favorites_count()
 
+job_cols = st.columns([1, 1, 1, 1])
+with job_cols[0]:
+    _backfill_limit = st.number_input("Backfill limiti (0 = hepsi)", min_value=0, value=20, step=10)
+    _backfill_restart = st.checkbox("Baştan başla", value=False, help="Yarıda kalan backfill çalıştırmasını bırakıp yenisini açar.")
+with job_cols[1]:
+    if st.button("🧩 Metadata Backfill"):
+        start_job("backfill", backfill_metadata, limit=(int(_backfill_limit) or None), restart=_backfill_restart)
+with job_cols[2]:
+    if st.button("🚀 GitHub'a yayınla"):
+        start_job("publish", push_favorites_to_github)
+with job_cols[3]:
+    if st.button("🧬 Sağlayıcı ID'lerini tamamla"):
+        start_job("migrate_provider_ids", migrate_provider_ids)
+
+jobs_panel()
+
+with st.expander("🧪 IMDb doğrulama önbelleği"):
+    _vcache = get_validation_cache()
+    _ventries = _vcache.entries()
+    _kinds = {k: sum(1 for e in _ventries if e["kind"] == k) for k in ("valid", "invalid", "title")}
+    st.caption(
+        f"✅ Geçerli: {_kinds['valid']} | ❌ Hatalı: {_kinds['invalid']} | 🔁 Başlık düzeltmesi: {_kinds['title']} "
+        f"| ⏳ Süresi dolmuş: {sum(1 for e in _ventries if not e['fresh'])}"
+    )
+    if _ventries:
+        st.dataframe(
+            pd.DataFrame([
+                {
+                    "key": e["key"],
+                    "kind": e["kind"],
+                    "imdb_id": e["imdb_id"],
+                    "note": e["note"],
+                    "checked_at": time.strftime("%Y-%m-%d %H:%M", time.localtime(e["checked_at"])),
+                    "fresh": e["fresh"],
+                }
+                for e in _ventries
+            ]),
+            use_container_width=True,
+            hide_index=True,
+        )
+    vc_cols = st.columns([2, 1, 1, 1])
+    with vc_cols[0]:
+        _forget_key = st.text_input("IMDb ID veya başlık", key="vcache_forget", label_visibility="collapsed",
+                                    placeholder="IMDb ID veya başlık")
+    with vc_cols[1]:
+        if st.button("🗑 Kaydı sil", key="vcache_forget_btn") and _forget_key:
+            st.success(f"{_vcache.forget(_forget_key)} kayıt silindi.")
+    with vc_cols[2]:
+        if st.button("🧹 Süresi dolanlar", key="vcache_purge_expired"):
+            st.success(f"{_vcache.purge(expired_only=True)} kayıt silindi.")
+    with vc_cols[3]:
+        if st.button("💣 Tümünü temizle", key="vcache_purge_all"):
+            st.success(f"{_vcache.purge()} kayıt silindi.")
+
+_BREAKER_ICONS = {"closed": "🟢", "half_open": "🟡", "open": "🔴"}
+_breakers = breaker_status()
+with st.expander("🔌 Sağlayıcı durumu (OMDb / TMDB) " + " ".join(_BREAKER_ICONS[b["state"]] for b in _breakers),
+                 expanded=any(b["state"] != "closed" for b in _breakers)):
+    st.dataframe(
+        pd.DataFrame([
+            {
+                **b,
+                "state": f"{_BREAKER_ICONS[b['state']]} {b['state']}",
+                "p50": round(b["p50"], 3) if b["p50"] is not None else None,
+                "p95": round(b["p95"], 3) if b["p95"] is not None else None,
+                "retry_in": round(b["retry_in"], 1) if b["retry_in"] is not None else None,
+            }
+            for b in _breakers
+        ]),
+        use_container_width=True,
+        hide_index=True,
+    )
+    br_cols = st.columns(len(_breakers))
+    for _col, _b in zip(br_cols, _breakers):
+        with _col:
+            if st.button(f"↺ {_b['provider']} devresini sıfırla", key=f"breaker_reset_{_b['provider']}"):
+                get_breaker(_b["provider"]).reset()
+                st.rerun()
+
+with st.expander("🩺 Kütüphane bütünlüğü"):
+    # Tarama anlık görüntü sürümü başına bir kez yapılır
+    _integrity = store.derived(("integrity",), lambda snap: scan_integrity([it for items in snap.values() for it in items]))
+    _icounts = _integrity.counts()
+    st.caption(f"{_integrity.scanned} favori tarandı | " + " | ".join(f"{INTEGRITY_RULES[r]}: {n}" for r, n in _icounts.items()))
+    if _integrity.issues:
+        st.dataframe(
+            pd.DataFrame([{**i, "rule": INTEGRITY_RULES[i["rule"]]} for i in _integrity.issues]),
+            use_container_width=True,
+            hide_index=True,
+        )
+    else:
+        st.success("Sorun bulunmadı.")
+
 
 show_posters = st.session_state["show_posters"]
 media_type = st.radio("Search type:", ["Movie", "TV Show", "Actor/Actress"], horizontal=True)
@@ -1211,20 +560,52 @@ if st.session_state.clear_search:
 if "query" not in st.session_state:
     st.session_state.query = ""
 
+
+@st.fragment
+def search_result_rating(item, media_type):
+    # Kaydırıcı ve sayı kutusu yalnızca bu sonucu yeniden çizer; ekleme listeyi değiştirdiği için tam rerun yapar
+    slider_key = f"stars_{item['id']}"
+    manual_key = f"manual_{item['id']}"
+    slider_val = st.slider("🎯 CineSelect Rating:", 1, 10000, st.session_state.get(slider_key, 5000), step=10, key=slider_key)
+    manual_val = st.number_input("Manual value:", min_value=1, max_value=10000, value=slider_val, step=1, key=manual_key)
+
+    if st.button("Add to Favorites", key=f"btn_{item['id']}"):
+        # Oyuncu aramasında her sonucun kendi türü vardır (TMDB media_type); yoksa seçili arama türü
+        item_media = item.get("media_type")
+        if item_media in ("movie", "tv"):
+            media_key = "show" if item_media == "tv" else "movie"
+        else:
+            media_key = "show" if media_type == "TV Show" else "movie"
+        with st.spinner(f"➕ {item['title']} ekleniyor…"):
+            report = add_favorite_pipelined(item, media_key, manual_val)
+        # Teşhis bilgisi rerun sonrasında gösterilir (eskiden 1.2 sn bekleniyordu)
+        st.session_state["_last_add_report"] = report
+        # clear search on next run to avoid "modified after instantiation" error
+        st.session_state.clear_search = True
+        st.rerun()
+
+
 query = st.text_input(
     f"🔍 Search for a {media_type.lower()}",
     value=st.session_state.query,
     key="query_input",
 )
 
+_add_report = st.session_state.pop("_last_add_report", None)
+if _add_report:
+    render_add_report(_add_report)
+
 if query:
     st.session_state.query = query
-    if media_type == "Movie":
-        results = search_movie(query)
-    elif media_type == "TV Show":
-        results = search_tv(query)
-    else:
-        results = search_by_actor(query)
+    # Sonuçlar sayfa sayfa gelir; sayfalayıcı oturumda tutulur, sonraki sayfa yalnızca "daha fazla" ile istenir
+    _pager_key = (media_type, query.strip().lower())
+    pager = st.session_state.get("search_pager")
+    if pager is None or st.session_state.get("search_pager_key") != _pager_key:
+        pager = {"Movie": movie_pager, "TV Show": tv_pager}.get(media_type, actor_pager)(query)
+        pager.load_more()
+        st.session_state["search_pager"] = pager
+        st.session_state["search_pager_key"] = _pager_key
+    results = pager.results
 
     try:
         results = sorted(results, key=lambda x: x.get("cineselectRating", 0), reverse=True)
@@ -1269,126 +650,12 @@ if query:
             rt_display = f"{int(rt_val)}%" if isinstance(rt_val, (int, float)) and rt_val > 0 else "N/A"
             st.markdown(f"⭐ IMDb: {imdb_display} &nbsp;&nbsp; 🍅 RT: {rt_display}", unsafe_allow_html=True)
 
-            slider_key = f"stars_{item['id']}"
-            manual_key = f"manual_{item['id']}"
-            slider_val = st.slider("🎯 CineSelect Rating:", 1, 10000, st.session_state.get(slider_key, 5000), step=10, key=slider_key)
-            manual_val = st.number_input("Manual value:", min_value=1, max_value=10000, value=slider_val, step=1, key=manual_key)
-
-            if st.button("Add to Favorites", key=f"btn_{item['id']}"):
-                media_key = "movie" if media_type == "Movie" else ("show" if media_type == "TV Show" else "movie")
-                # 1) IMDb ID garanti altına al
-                imdb_id = (item.get("imdb") or "").strip()
-                if not imdb_id or imdb_id == "tt0000000":
-                    imdb_id = get_imdb_id_from_tmdb(
-                        title=item["title"],
-                        year=item.get("year"),
-                        is_series=(media_key == "show"),
-                    )
-
-                # IMDb ID doğrulama/düzeltme
-                imdb_id = validate_imdb_id(imdb_id, item["title"], item.get("year")) or imdb_id
-
-                # 2) IMDb/RT puanlarını getir (ÖNCE yerel CSV, yoksa OMDb-ID, o da yoksa Title/Year)
-                stats = {}
-                raw_id = {}
-                raw_title = {}
-                source = None
-
-                # a) yerel CSV
-                seed_hit = read_seed_rating(imdb_id)
-                if seed_hit and (seed_hit.get("imdb_rating") or seed_hit.get("rt")):
-                    stats = {"imdb_rating": seed_hit.get("imdb_rating"), "rt": seed_hit.get("rt")}
-                    source = "CSV"
-
-                # b) CSV yoksa/eksikse OMDb by ID
-                if not source:
-                    if imdb_id:
-                        stats = get_ratings(imdb_id) or {}
-                        raw_id = (stats.get("raw") or {})
-                        source = "CSV/OMDb-ID" if raw_id else None  # get_ratings CSV'den dönerse raw boş kalabilir
-
-                # OMDb-ID fallback: if both ratings are 0, try fetch_ratings by title/year
-                if not stats or (float(stats.get("imdb_rating") or 0) == 0.0 and int(stats.get("rt") or 0) == 0):
-                    ir, rt, raw_title = fetch_ratings(item["title"], item.get("year"))
-                    stats = {"imdb_rating": ir, "rt": rt}
-                    source = "OMDb-title (auto-fallback)"
+            search_result_rating(item, media_type)
 
-                imdb_rating = float(stats.get("imdb_rating") or 0.0)
-                rt_score    = int(stats.get("rt") or 0)
-
-                # --- Fetch full metadata (directors, cast, genres) ---
-                new_meta = fetch_metadata(imdb_id, item["title"], item.get("year"), is_series=(media_key == "show"))
-
-                # 🔎 DEBUG: Kaynak ve ham yanıtlar
-                st.write(f"🔍 Source: {source or '—'} | 🆔 IMDb ID: {imdb_id or '—'} | ⭐ IMDb: {imdb_rating} | 🍅 RT: {rt_score}")
-
-                # Extra, user-visible diagnostics
-                error_msg = None
-                if isinstance(raw_id, dict):
-                    error_msg = raw_id.get("Error")
-                if not error_msg and isinstance(raw_title, dict):
-                    error_msg = raw_title.get("Error")
-
-                if error_msg:
-                    st.error(f"OMDb error: {error_msg}. Check OMDB_API_KEY.", icon="🚨")
-                elif source == "CSV":
-                    st.info("Source: seed_ratings.csv (cached)", icon="📂")
-                elif source == "CSV/OMDb-ID":
-                    st.info(f"Source: OMDb by IMDb ID ({imdb_id})", icon="🔎")
-                else:
-                    st.info(f"Source: OMDb by Title/Year ({item['title']} {item.get('year')})", icon="🔎")
-
-                if raw_id:
-                    import json as _json
-                    st.caption("OMDb by ID (raw JSON)")
-                    st.code(_json.dumps(raw_id, ensure_ascii=False, indent=2))
-                if raw_title:
-                    import json as _json
-                    st.caption("OMDb by title (raw JSON)")
-                    st.code(_json.dumps(raw_title, ensure_ascii=False, indent=2))
-
-                # 3) Firestore'a yaz
-                doc_data = {
-                    "id": item["id"],
-                    "title": item["title"],
-                    "year": item.get("year"),
-                    "imdb": imdb_id,
-                    "poster": item.get("poster"),
-                    "imdbRating": imdb_rating,                 # ✅ eklendi
-                    "rt": rt_score,                            # ✅ CSV/OMDb’den gelen kesin değer
-                    "cineselectRating": manual_val,
-                    "type": media_key,
-                    "directors": new_meta.get("directors", []) if new_meta else [],
-                    "cast": new_meta.get("cast", []) if new_meta else [],
-                    "genres": new_meta.get("genres", []) if new_meta else [],
-                    "writers": new_meta.get("writers", []) if new_meta else [],
-                }
-                # For TV shows, add created_by field if present
-                if media_key == "show" and new_meta and "created_by" in new_meta:
-                    doc_data["created_by"] = new_meta["created_by"]
-                db.collection("favorites").document(item["id"]).set(doc_data)
-                # 4) seed_ratings.csv'ye (yoksa) ekle
-                append_seed_rating(
-                    imdb_id=imdb_id,
-                    title=item["title"],
-                    year=item.get("year"),
-                    imdb_rating=imdb_rating,
-                    rt_score=rt_score,
-                )
-                # 5) seed_meta.csv'ye de ekle (yoksa)
-                append_seed_meta(
-                    imdb_id,
-                    item["title"],
-                    item.get("year"),
-                    new_meta if new_meta else {"directors": [], "cast": [], "genres": [], "writers": []}
-                )
-                st.success(f"✅ {item['title']} added to favorites!")
-                # clear search on next run to avoid "modified after instantiation" error
-                st.session_state.clear_search = True
-                # Let the user see the diagnostics before refresh
-                st.toast("Refreshing…", icon="🔄")
-                time.sleep(1.2)
-                st.rerun()
+    if pager.has_more:
+        st.divider()
+        st.button(f"⬇️ Daha fazla yükle ({len(results)} sonuç gösteriliyor)", key="search_load_more",
+                  on_click=pager.load_more)
 
 st.divider()
 st.subheader("❤️ Your Favorites")
@@ -1397,36 +664,36 @@ sort_option = st.selectbox("Sort by:", ["IMDb", "RT", "CineSelect", "Year"], ind
 
 #
 # Build directors, actors, genres, writers, created_by lists based on selected media_type
-if media_type == "Movie":
-    source_docs = db.collection("favorites").where("type", "==", "movie").stream()
-elif media_type == "TV Show":
-    source_docs = db.collection("favorites").where("type", "==", "show").stream()
-else:
-    source_docs = []
-
-directors = sorted({d for doc in source_docs for d in (doc.to_dict().get("directors") or [])})
-if media_type == "Movie":
-    source_docs = db.collection("favorites").where("type", "==", "movie").stream()
-elif media_type == "TV Show":
-    source_docs = db.collection("favorites").where("type", "==", "show").stream()
-else:
-    source_docs = []
-actors = sorted({a for doc in source_docs for a in (doc.to_dict().get("cast") or [])})
-if media_type == "Movie":
-    source_docs = db.collection("favorites").where("type", "==", "movie").stream()
-elif media_type == "TV Show":
-    source_docs = db.collection("favorites").where("type", "==", "show").stream()
-else:
-    source_docs = []
-genres = sorted({g for doc in source_docs for g in (doc.to_dict().get("genres") or [])})
+_facet_type = {"Movie": "movie", "TV Show": "show"}.get(media_type)
+_facets = store.facets(_facet_type) if _facet_type else {}
+directors = _facets.get("directors", [])
+actors = _facets.get("cast", [])
+genres = _facets.get("genres", [])
 # Writers list (for both movies and shows)
-if media_type == "Movie":
-    source_docs = db.collection("favorites").where("type", "==", "movie").stream()
-elif media_type == "TV Show":
-    source_docs = db.collection("favorites").where("type", "==", "show").stream()
-else:
-    source_docs = []
-writers = sorted({w for doc in source_docs for w in (doc.to_dict().get("writers") or [])})
+writers = _facets.get("writers", [])
+# --- Single-click filters: set inside the session, mirrored to the URL for deep links ---
+FILTER_LABELS = {"director": "🎬 Director", "writer": "✍️ Writer", "actor": "🎭 Actor", "genre": "📚 Genre"}
+
+
+def _set_filter(filter_type, value):
+    """Tek tıkla filtreyi oturum durumuna ve st.query_params'a yazar (sayfa yeniden yüklenmez)."""
+    param = f"filter_{filter_type}"
+    st.session_state[param] = value or None
+    if value:
+        st.query_params[param] = value
+    else:
+        st.query_params.pop(param, None)
+
+
+def _pick_filter(widget_key, filter_type):
+    """Karttaki isim seçildiğinde (on_change): filtreyi uygular, seçimi sıfırlar, tam rerun ister."""
+    value = st.session_state.get(widget_key)
+    st.session_state[widget_key] = None
+    if value:
+        _set_filter(filter_type, value)
+        st.session_state["_filter_nav"] = True
+
+
 ## --- Unified filter row (stateless, no query_params) ---
 # Remove "Filter by Created by" entirely; update order: Director, Writer, Actor, Genre
 col1, col2, col3, col4 = st.columns(4)
@@ -1450,307 +717,363 @@ with col4:
         "🎞 Filter by Genre", genres,
         default=[st.session_state["filter_genre"]] if st.session_state.get("filter_genre") else []
     )
-def get_sort_key(fav):
-    try:
-        if sort_option == "IMDb":
-            return float(fav.get("imdbRating", 0) or 0)
-        elif sort_option == "RT":
-            return float(fav.get("rt", 0))
-        elif sort_option == "CineSelect":
-            return fav.get("cineselectRating", 0)
-        elif sort_option == "Year":
-            return int(fav.get("year", 0))
-    except:
-        return 0
+
+_active_filters = [(t, st.session_state.get(f"filter_{t}")) for t in FILTER_LABELS if st.session_state.get(f"filter_{t}")]
+if _active_filters:
+    for _col, (_t, _v) in zip(st.columns(len(FILTER_LABELS)), _active_filters):
+        _col.button(f"✖ {FILTER_LABELS[_t]}: {_v}", key=f"clear_filter_{_t}", on_click=_set_filter, args=(_t, None))
+
+# --- Range filters (vectorized over the columnar view) ---
+year_range = min_imdb = min_rt = cs_range = None
+if _facet_type:
+    _bounds = store.columns(_facet_type).bounds()
+    rcol1, rcol2, rcol3, rcol4 = st.columns(4)
+    with rcol1:
+        _y_lo, _y_hi = int(_bounds["year"][0]), int(_bounds["year"][1])
+        if _y_lo < _y_hi:
+            _years = st.slider("📅 Year range", _y_lo, _y_hi, (_y_lo, _y_hi))
+            year_range = _years if _years != (_y_lo, _y_hi) else None
+    with rcol2:
+        min_imdb = st.slider("⭐ Min IMDb", 0.0, 10.0, 0.0, step=0.1, key="range_min_imdb") or None
+    with rcol3:
+        min_rt = st.slider("🍅 Min RT", 0, 100, 0, step=1, key="range_min_rt") or None
+    with rcol4:
+        _cs = st.slider("🎯 CS range", 1, 10000, (1, 10000), step=10, key="range_cs")
+        cs_range = _cs if _cs != (1, 10000) else None
+
 
 def show_favorites(fav_type, label):
     # --- Filtering logic using session_state (no query_params) ---
-    docs = db.collection("favorites").where("type", "==", fav_type).stream()
-    favorites = sorted([doc.to_dict() for doc in docs], key=get_sort_key, reverse=True)
-    # Apply director filter(s) if selected
-    if selected_directors:
-        favorites = [f for f in favorites if any(d in (f.get("directors") or []) for d in selected_directors)]
-    # Apply writers filter(s) if selected
-    if selected_writers:
-        favorites = [f for f in favorites if any(w in (f.get("writers") or []) for w in selected_writers)]
-    # Apply actor/cast filter(s) if selected
-    if selected_actors:
-        favorites = [f for f in favorites if any(a in (f.get("cast") or []) for a in selected_actors)]
-    # Apply genre filter(s) if selected
-    if selected_genres:
-        favorites = [f for f in favorites if any(g in (f.get("genres", []) or []) for g in selected_genres)]
+    # Sıralama önceden hesaplanmış argsort'lardan, filtreler boolean maskelerden gelir
+    view = store.columns(fav_type)
+    mask = view.range_mask(year=year_range, min_imdb=min_imdb, min_rt=min_rt, cs=cs_range)
+    # Apply director / writer / actor / genre filter(s) if selected
+    for field, selected in (
+        ("directors", selected_directors),
+        ("writers", selected_writers),
+        ("cast", selected_actors),
+        ("genres", selected_genres),
+    ):
+        if selected:
+            mask &= view.any_of(field, selected)
     # --- Also support single-click filter by director, writer, actor, genre via session_state ---
-    fd = st.session_state.get("filter_director")
-    fw = st.session_state.get("filter_writer")
-    fa = st.session_state.get("filter_actor")
-    fg = st.session_state.get("filter_genre")
-    if fd:
-        favorites = [f for f in favorites if fd in f.get("directors",[])]
-    if fw:
-        favorites = [f for f in favorites if fw in (f.get("writers") or [])]
-    if fa:
-        favorites = [f for f in favorites if fa in f.get("cast",[])]
-    if fg:
-        favorites = [f for f in favorites if fg in f.get("genres",[])]
+    for field, sskey in (
+        ("directors", "filter_director"),
+        ("writers", "filter_writer"),
+        ("cast", "filter_actor"),
+        ("genres", "filter_genre"),
+    ):
+        value = st.session_state.get(sskey)
+        if value:
+            mask &= view.any_of(field, [value])
+    favorites = view.ordered(sort_option, mask)
 
     st.markdown(f"### 📁 {label}")
     for idx, fav in enumerate(favorites):
-        imdb_val = fav.get("imdbRating")
-        if imdb_val in (None, "", "N/A") or (isinstance(imdb_val, (int, float)) and float(imdb_val) == 0.0):
+        favorite_card(fav_type, fav["id"], idx)
+
+
+def _filters_active() -> bool:
+    return bool(
+        selected_directors or selected_writers or selected_actors or selected_genres
+        or year_range or min_imdb or min_rt or cs_range
+        or any(st.session_state.get(k) for k in ("filter_director", "filter_writer", "filter_actor", "filter_genre"))
+    )
+
+
+def _rerun_after_card_change(order_changed=False, membership_changed=False):
+    """Kart içindeki bir kayıttan sonra: sıra/üyelik değiştiyse tüm sayfa, değilse yalnızca kart yeniden çizilir."""
+    if order_changed or membership_changed:
+        st.rerun()
+    st.rerun(scope="fragment")
+
+
+def render_similar(fav):
+    """Kartın altında en benzer favorileri (yönetmen / senarist / oyuncu / tür örtüşmesi) listeler."""
+    neighbours = store.similarity().neighbours(fav["id"])
+    if not neighbours:
+        st.caption("🧭 Benzer favori bulunamadı (yönetmen/oyuncu/tür bilgisi eksik olabilir).")
+        return
+    lines = [
+        f"- {'📺' if other.get('type') == 'show' else '🎬'} **{other.get('title')}** ({other.get('year')}) — %{score * 100:.0f}"
+        for other, score in neighbours
+    ]
+    st.markdown("🧭 **Benzerleri:**\n" + "\n".join(lines))
+
+
+@st.fragment
+def favorite_card(fav_type, fav_id, idx):
+    # Karttan bir filtre seçildiyse liste değişir: yalnızca kart değil tüm sayfa yeniden çizilir
+    if st.session_state.pop("_filter_nav", False):
+        st.rerun()
+    # Kart, fragment yeniden çalıştığında da güncel veriyi göstersin diye paylaşılan önbellekten okunur
+    fav = store.get(fav_type, fav_id)
+    if fav is None:
+        return
+    imdb_val = fav.get("imdbRating")
+    if imdb_val in (None, "", "N/A") or (isinstance(imdb_val, (int, float)) and float(imdb_val) == 0.0):
+        imdb_display = "N/A"
+    else:
+        try:
+            imdb_display = f"{float(imdb_val):.1f}"
+        except:
             imdb_display = "N/A"
-        else:
-            try:
-                imdb_display = f"{float(imdb_val):.1f}"
-            except:
-                imdb_display = "N/A"
-        rt_display = f"{fav['rt']}%" if isinstance(fav["rt"], (int, float)) else "N/A"
-        cols = st.columns([1, 5, 1, 1])
-        with cols[0]:
-            if show_posters and fav.get("poster"):
-                imdb_id_link = str(
-                    fav.get("imdb") or fav.get("imdb_id") or fav.get("imdbID") or ""
-                ).strip()
-                poster_url = fav["poster"]
-                if imdb_id_link and imdb_id_link.startswith("tt"):
-                    st.markdown(
-                        f'<a href="https://www.imdb.com/title/{imdb_id_link}/" target="_blank" rel="noopener">'
-                        f'<img src="{poster_url}" width="120"/></a>',
-                        unsafe_allow_html=True,
-                    )
-                else:
-                    st.image(poster_url, width=120)
-        with cols[1]:
-            st.markdown(f"**{idx+1}. {fav['title']} ({fav['year']})** | ⭐ IMDb: {imdb_display} | 🍅 RT: {rt_display} | 🎯 CS: {fav.get('cineselectRating', 'N/A')}")
-
-            # --- Directors / Writers / Cast / Genres as inline markdown links ---
-            def link_list(items, filter_type, emoji, label):
-                if not items:
-                    return
-                filter_param = f"filter_{filter_type}"
-                links = [
-                    f"<a href='?{filter_param}={urllib.parse.quote(name)}' "
-                    f"style='color:#3498db; text-decoration:underline; margin-right:8px;'>{name}</a>"
-                    for name in items
-                ]
-                st.markdown(f"{emoji} <b>{label}:</b> " + " ".join(links), unsafe_allow_html=True)
-
-            # --- Show directors if present and non-empty ---
-            if fav.get("directors") and fav["directors"] and fav["directors"] != ["Unknown"]:
-                link_list(fav["directors"], "director", "🎬", "Directors")
-            # --- Show writers if present and non-empty ---
-            if fav.get("writers") and fav["writers"]:
-                link_list(fav["writers"], "writer", "✍️", "Writers")
-            # Cast
-            if fav.get("cast"):
-                link_list(fav["cast"], "actor", "🎭", "Cast")
-            # Genres
-            if fav.get("genres"):
-                link_list(fav["genres"], "genre", "📚", "Genres")
-            # --- TEMPORARY DEBUG LOG for directors/creators origin ---
-            if fav.get("debug_log"):
-                st.caption(f"DEBUG: {fav['debug_log']}")  # TEMP log for directors/creators info
-
-            # --- IMDb&RT ve Full Meta butonlarını yan yana ve küçük göster ---
-            btn_cols = st.columns([1, 1])
-            with btn_cols[0]:
-                if st.button("🔄 IMDb&RT", key=f"refresh_{fav['id']}", use_container_width=True):
-                    imdb_id = (fav.get("imdb") or "").strip()
-                    title = fav.get("title")
-                    year = fav.get("year")
-                    is_series = (fav.get("type") == "show")
-                    # 1) IMDb ID guarantee
-                    if not imdb_id or imdb_id == "tt0000000":
-                        imdb_id = get_imdb_id_from_tmdb(title, year, is_series=is_series)
-                        st.info(f"🎬 IMDb ID TMDb'den alındı: {imdb_id}")
-                    # IMDb ID doğrulama/düzeltme (OMDb sorgusundan önce)
-                    imdb_id = validate_imdb_id(imdb_id, title, year) or imdb_id
-
-                    stats = {}
-                    raw_id = {}
-                    raw_title = {}
-                    source = None
-
-                    # 2a) Try seed_ratings.csv
-                    seed_hit = read_seed_rating(imdb_id)
-                    if seed_hit and (seed_hit.get("imdb_rating") or seed_hit.get("rt")):
-                        stats = {"imdb_rating": seed_hit.get("imdb_rating"), "rt": seed_hit.get("rt")}
-                        source = "CSV"
-
-                    # 2b) If missing/empty → OMDb by ID
-                    if not source:
-                        if imdb_id:
-                            stats = get_ratings(imdb_id) or {}
-                            raw_id = (stats.get("raw") or {})
-                            source = "CSV/OMDb-ID" if raw_id else None
-
-                    # OMDb-ID fallback: if both ratings are 0, try fetch_ratings by title/year
-                    if not stats or (float(stats.get("imdb_rating") or 0) == 0.0 and int(stats.get("rt") or 0) == 0):
-                        ir, rt, raw_title = fetch_ratings(title, year)
-                        stats = {"imdb_rating": ir, "rt": rt}
-                        source = "OMDb-title (auto-fallback)"
-
-                    imdb_rating = float(stats.get("imdb_rating") or 0.0)
-                    rt_score = int(stats.get("rt") or 0)
-
-                    # --- Debug log before updating Firestore ---
-                    st.info(f"🎬 Refresh Debug → Title='{title}' ({year}) | IMDb ID={imdb_id} | IMDb={imdb_rating} | RT={rt_score}")
-
-                    # Update Firestore
-                    db.collection("favorites").document(fav["id"]).update({
-                        "imdb": imdb_id,
-                        "imdbRating": imdb_rating,
-                        "rt": rt_score,
-                    })
-
-                    # Update seed_ratings.csv
-                    append_seed_rating(
-                        imdb_id=imdb_id,
-                        title=title,
-                        year=year,
-                        imdb_rating=imdb_rating,
-                        rt_score=rt_score,
-                    )
+    rt_display = f"{fav['rt']}%" if isinstance(fav["rt"], (int, float)) else "N/A"
+    cols = st.columns([1, 5, 1, 1])
+    with cols[0]:
+        if show_posters and fav.get("poster"):
+            imdb_id_link = str(
+                fav.get("imdb") or fav.get("imdb_id") or fav.get("imdbID") or ""
+            ).strip()
+            poster_url = fav["poster"]
+            if imdb_id_link and imdb_id_link.startswith("tt"):
+                st.markdown(
+                    f'<a href="https://www.imdb.com/title/{imdb_id_link}/" target="_blank" rel="noopener">'
+                    f'<img src="{poster_url}" width="120"/></a>',
+                    unsafe_allow_html=True,
+                )
+            else:
+                st.image(poster_url, width=120)
+    with cols[1]:
+        st.markdown(f"**{idx+1}. {fav['title']} ({fav['year']})** | ⭐ IMDb: {imdb_display} | 🍅 RT: {rt_display} | 🎯 CS: {fav.get('cineselectRating', 'N/A')}")
+
+        # --- Directors / Writers / Cast / Genres as single-click filter pills ---
+        def link_list(items, filter_type, emoji, label):
+            if not items:
+                return
+            widget_key = f"pick_{fav_type}_{fav_id}_{filter_type}"
+            st.pills(
+                f"{emoji} **{label}:**", list(dict.fromkeys(items)), selection_mode="single",
+                key=widget_key, on_change=_pick_filter, args=(widget_key, filter_type),
+            )
+
+        # --- Show directors if present and non-empty ---
+        if fav.get("directors") and fav["directors"] and list(fav["directors"]) != ["Unknown"]:
+            link_list(fav["directors"], "director", "🎬", "Directors")
+        # --- Show writers if present and non-empty ---
+        if fav.get("writers") and fav["writers"]:
+            link_list(fav["writers"], "writer", "✍️", "Writers")
+        # Cast
+        if fav.get("cast"):
+            link_list(fav["cast"], "actor", "🎭", "Cast")
+        # Genres
+        if fav.get("genres"):
+            link_list(fav["genres"], "genre", "📚", "Genres")
+        # --- TEMPORARY DEBUG LOG for directors/creators origin ---
+        if fav.get("debug_log"):
+            st.caption(f"DEBUG: {fav['debug_log']}")  # TEMP log for directors/creators info
+
+        # --- IMDb&RT ve Full Meta butonlarını yan yana ve küçük göster ---
+        btn_cols = st.columns([1, 1, 1])
+        with btn_cols[0]:
+            if st.button("🔄 IMDb&RT", key=f"refresh_{fav['id']}", use_container_width=True):
+                imdb_id = (fav.get("imdb") or "").strip()
+                title = fav.get("title")
+                year = fav.get("year")
+                is_series = (fav.get("type") == "show")
+                tmdb_id, tmdb_type = provider_ids_of(fav)
+                # 1) IMDb ID guarantee
+                if not imdb_id or imdb_id == "tt0000000":
+                    imdb_id = get_imdb_id_from_tmdb(title, year, is_series=is_series, tmdb_id=tmdb_id)
+                    st.info(f"🎬 IMDb ID TMDb'den alındı: {imdb_id}")
+                # IMDb ID doğrulama/düzeltme (OMDb sorgusundan önce)
+                verified_id = None if fav.get("imdb_verified") and imdb_id == fav.get("imdb") else validate_imdb_id(imdb_id, title, year)
+                imdb_id = verified_id or imdb_id
+
+                # 2) seed_ratings.csv → OMDb-ID → OMDb-title
+                stats, source, raw_id, raw_title = resolve_ratings(imdb_id, title, year)
 
-                    st.success(f"✅ {title} IMDb & RT yenilendi. (IMDb={imdb_rating}, RT={rt_score}%)")
-                    st.rerun()
-            with btn_cols[1]:
-                if st.button("🎬 Full Meta", key=f"fullmeta_{fav['id']}", use_container_width=True):
-                    imdb_id = (fav.get("imdb") or "").strip()
-                    title = fav.get("title")
-                    year = fav.get("year")
-                    is_series = (fav.get("type") == "show")
-
-                    new_meta = fetch_metadata(imdb_id, title, year, is_series=is_series)
-                    if new_meta:
-                        update_data = {
-                            "directors": new_meta.get("directors", []),
-                            "cast": new_meta.get("cast", []),
-                            "genres": new_meta.get("genres", []),
-                            "writers": new_meta.get("writers", []),
-                        }
-                        db.collection("favorites").document(fav["id"]).update(update_data)
-                        append_seed_meta(imdb_id, title, year, new_meta)
-                        # Show debug log if available
-                        if new_meta.get("debug_log"):
-                            st.caption(f"DEBUG (directors/creators): {new_meta['debug_log']}")
-                        else:
-                            st.caption("DEBUG: No debug_log returned from fetch_metadata")
-                        st.success(f"✅ Metadata updated for {title} ({year})")
-                        st.rerun()
-        with cols[2]:
-            if st.button("❌", key=f"remove_{fav['id']}"):
-                db.collection("favorites").document(fav["id"]).delete()
+                imdb_rating = float(stats.get("imdb_rating") or 0.0)
+                rt_score = int(stats.get("rt") or 0)
+
+                # --- Debug log before updating Firestore ---
+                st.info(f"🎬 Refresh Debug → Title='{title}' ({year}) | IMDb ID={imdb_id} | IMDb={imdb_rating} | RT={rt_score}")
+
+                # Update Firestore
+                refresh_update = {
+                    "imdb": imdb_id,
+                    "imdbRating": imdb_rating,
+                    "rt": rt_score,
+                }
+                if tmdb_id:
+                    refresh_update["tmdb_id"] = tmdb_id
+                    refresh_update["tmdb_type"] = tmdb_type
+                if verified_id:
+                    refresh_update["imdb_verified"] = True
+                db.collection("favorites").document(fav["id"]).update(refresh_update)
+                bump_data_version("refresh")
+
+                # Update seed_ratings.csv
+                append_seed_rating(
+                    imdb_id=imdb_id,
+                    title=title,
+                    year=year,
+                    imdb_rating=imdb_rating,
+                    rt_score=rt_score,
+                    tmdb_id=tmdb_id,
+                    tmdb_type=tmdb_type,
+                )
+
+                st.success(f"✅ {title} IMDb & RT yenilendi. (IMDb={imdb_rating}, RT={rt_score}%)")
                 st.rerun()
-        with cols[3]:
-            if st.button("✏️", key=f"edit_{fav['id']}"):
-                st.session_state[f"edit_mode_{fav['id']}"] = True
-
-        if st.session_state.get(f"edit_mode_{fav['id']}", False):
-            s_key = f"slider_{fav['id']}"
-            i_key = f"input_{fav['id']}"
-            current = _clamp_cs(fav.get("cineselectRating", 5000))
-            if s_key not in st.session_state:
-                st.session_state[s_key] = current
-            if i_key not in st.session_state:
-                st.session_state[i_key] = current
-
-            # --- Editable fields for directors, cast, genres, writers (single-line text_area) ---
-            dir_key = f"edit_dirs_{fav['id']}"
-            cast_key = f"edit_cast_{fav['id']}"
-            genres_key = f"edit_genres_{fav['id']}"
-            writers_key = f"edit_writers_{fav['id']}"
-            # Pre-populate with joined string
-            if dir_key not in st.session_state:
-                st.session_state[dir_key] = "; ".join(fav.get("directors", []))
-            if cast_key not in st.session_state:
-                st.session_state[cast_key] = "; ".join(fav.get("cast", []))
-            if genres_key not in st.session_state:
-                st.session_state[genres_key] = "; ".join(fav.get("genres", []))
-            if writers_key not in st.session_state:
-                st.session_state[writers_key] = "; ".join(fav.get("writers", []))
-
-            st.slider(
-                "🎯 CS:", 1, 10000, st.session_state[s_key], step=1,
-                key=s_key, on_change=_sync_cs_from_slider, args=(s_key, i_key)
+        with btn_cols[1]:
+            if st.button("🎬 Full Meta", key=f"fullmeta_{fav['id']}", use_container_width=True):
+                imdb_id = (fav.get("imdb") or "").strip()
+                title = fav.get("title")
+                year = fav.get("year")
+                is_series = (fav.get("type") == "show")
+                tmdb_id, tmdb_type = provider_ids_of(fav)
+
+                new_meta = fetch_metadata(imdb_id, title, year, is_series=is_series, tmdb_id=tmdb_id)
+                if new_meta:
+                    update_data = {
+                        "directors": new_meta.get("directors", []),
+                        "cast": new_meta.get("cast", []),
+                        "genres": new_meta.get("genres", []),
+                        "writers": new_meta.get("writers", []),
+                    }
+                    db.collection("favorites").document(fav["id"]).update(update_data)
+                    bump_data_version("full_meta")
+                    append_seed_meta(imdb_id, title, year, new_meta, tmdb_id=tmdb_id, tmdb_type=tmdb_type)
+                    # Show debug log if available
+                    if new_meta.get("debug_log"):
+                        st.caption(f"DEBUG (directors/creators): {new_meta['debug_log']}")
+                    else:
+                        st.caption("DEBUG: No debug_log returned from fetch_metadata")
+                    st.success(f"✅ Metadata updated for {title} ({year})")
+                    _rerun_after_card_change(membership_changed=_filters_active())
+        with btn_cols[2]:
+            if st.button("🧭 Benzerleri", key=f"similar_btn_{fav['id']}", use_container_width=True):
+                st.session_state[f"similar_{fav['id']}"] = not st.session_state.get(f"similar_{fav['id']}", False)
+        if st.session_state.get(f"similar_{fav['id']}", False):
+            render_similar(fav)
+    with cols[2]:
+        if st.button("❌", key=f"remove_{fav['id']}"):
+            db.collection("favorites").document(fav["id"]).delete()
+            bump_data_version("remove")
+            st.rerun()
+    with cols[3]:
+        if st.button("✏️", key=f"edit_{fav['id']}"):
+            st.session_state[f"edit_mode_{fav['id']}"] = True
+
+    if st.session_state.get(f"edit_mode_{fav['id']}", False):
+        s_key = f"slider_{fav['id']}"
+        i_key = f"input_{fav['id']}"
+        current = _clamp_cs(fav.get("cineselectRating", 5000))
+        if s_key not in st.session_state:
+            st.session_state[s_key] = current
+        if i_key not in st.session_state:
+            st.session_state[i_key] = current
+
+        # --- Editable fields for directors, cast, genres, writers (single-line text_area) ---
+        dir_key = f"edit_dirs_{fav['id']}"
+        cast_key = f"edit_cast_{fav['id']}"
+        genres_key = f"edit_genres_{fav['id']}"
+        writers_key = f"edit_writers_{fav['id']}"
+        # Pre-populate with joined string
+        if dir_key not in st.session_state:
+            st.session_state[dir_key] = "; ".join(fav.get("directors", []))
+        if cast_key not in st.session_state:
+            st.session_state[cast_key] = "; ".join(fav.get("cast", []))
+        if genres_key not in st.session_state:
+            st.session_state[genres_key] = "; ".join(fav.get("genres", []))
+        if writers_key not in st.session_state:
+            st.session_state[writers_key] = "; ".join(fav.get("writers", []))
+
+        st.slider(
+            "🎯 CS:", 1, 10000, st.session_state[s_key], step=1,
+            key=s_key, on_change=_sync_cs_from_slider, args=(s_key, i_key)
+        )
+        st.number_input(
+            "CS (manuel):", min_value=1, max_value=10000, value=st.session_state[i_key], step=1,
+            key=i_key, on_change=_sync_cs_from_input, args=(i_key, s_key)
+        )
+
+        # Compact editable text areas (single-line each)
+        edit_cols = st.columns(4)
+        with edit_cols[0]:
+            st.text_area(
+                "Directors", value=st.session_state[dir_key], key=dir_key,
+                height=28, label_visibility="visible"
             )
-            st.number_input(
-                "CS (manuel):", min_value=1, max_value=10000, value=st.session_state[i_key], step=1,
-                key=i_key, on_change=_sync_cs_from_input, args=(i_key, s_key)
+        with edit_cols[1]:
+            st.text_area(
+                "Cast", value=st.session_state[cast_key], key=cast_key,
+                height=28, label_visibility="visible"
+            )
+        with edit_cols[2]:
+            st.text_area(
+                "Genres", value=st.session_state[genres_key], key=genres_key,
+                height=28, label_visibility="visible"
+            )
+        with edit_cols[3]:
+            st.text_area(
+                "Writers", value=st.session_state[writers_key], key=writers_key,
+                height=28, label_visibility="visible"
             )
 
-            # Compact editable text areas (single-line each)
-            edit_cols = st.columns(4)
-            with edit_cols[0]:
-                st.text_area(
-                    "Directors", value=st.session_state[dir_key], key=dir_key,
-                    height=28, label_visibility="visible"
-                )
-            with edit_cols[1]:
-                st.text_area(
-                    "Cast", value=st.session_state[cast_key], key=cast_key,
-                    height=28, label_visibility="visible"
-                )
-            with edit_cols[2]:
-                st.text_area(
-                    "Genres", value=st.session_state[genres_key], key=genres_key,
-                    height=28, label_visibility="visible"
-                )
-            with edit_cols[3]:
-                st.text_area(
-                    "Writers", value=st.session_state[writers_key], key=writers_key,
-                    height=28, label_visibility="visible"
-                )
-
-            cols_edit = st.columns([1, 1, 2])
-            with cols_edit[0]:
-                if st.button("✅ Kaydet", key=f"save_{fav['id']}"):
-                    new_val = _clamp_cs(st.session_state.get(i_key, st.session_state.get(s_key, current)))
-                    # Parse directors/cast/genres/writers from textareas (split on ";")
-                    dir_list = [d.strip() for d in (st.session_state.get(dir_key, "") or "").split(";") if d.strip()]
-                    cast_list = [c.strip() for c in (st.session_state.get(cast_key, "") or "").split(";") if c.strip()]
-                    genres_list = [g.strip() for g in (st.session_state.get(genres_key, "") or "").split(";") if g.strip()]
-                    writers_list = [w.strip() for w in (st.session_state.get(writers_key, "") or "").split(";") if w.strip()]
-
-                    db.collection("favorites").document(fav["id"]).update({
-                        "cineselectRating": new_val,
+        cols_edit = st.columns([1, 1, 2])
+        with cols_edit[0]:
+            if st.button("✅ Kaydet", key=f"save_{fav['id']}"):
+                new_val = _clamp_cs(st.session_state.get(i_key, st.session_state.get(s_key, current)))
+                # Parse directors/cast/genres/writers from textareas (split on ";")
+                dir_list = [d.strip() for d in (st.session_state.get(dir_key, "") or "").split(";") if d.strip()]
+                cast_list = [c.strip() for c in (st.session_state.get(cast_key, "") or "").split(";") if c.strip()]
+                genres_list = [g.strip() for g in (st.session_state.get(genres_key, "") or "").split(";") if g.strip()]
+                writers_list = [w.strip() for w in (st.session_state.get(writers_key, "") or "").split(";") if w.strip()]
+
+                db.collection("favorites").document(fav["id"]).update({
+                    "cineselectRating": new_val,
+                    "directors": dir_list,
+                    "cast": cast_list,
+                    "genres": genres_list,
+                    "writers": writers_list,
+                })
+                bump_data_version("edit")
+                # Also update seed_meta.csv
+                _tmdb_id, _tmdb_type = provider_ids_of(fav)
+                append_seed_meta(
+                    fav.get("imdb") or fav.get("imdb_id") or "",
+                    fav.get("title"),
+                    fav.get("year"),
+                    {
                         "directors": dir_list,
                         "cast": cast_list,
                         "genres": genres_list,
                         "writers": writers_list,
-                    })
-                    # Also update seed_meta.csv
-                    append_seed_meta(
-                        fav.get("imdb") or fav.get("imdb_id") or "",
-                        fav.get("title"),
-                        fav.get("year"),
-                        {
-                            "directors": dir_list,
-                            "cast": cast_list,
-                            "genres": genres_list,
-                            "writers": writers_list,
-                        }
-                    )
-                    st.success(f"✅ {fav['title']} güncellendi.")
-                    st.session_state[f"edit_mode_{fav['id']}"] = False
-                    st.rerun()
-            with cols_edit[1]:
-                if st.button("📌 Başa tuttur", key=f"pin_{fav['id']}"):
-                    # Aynı türdeki favorilerde en yüksek CS'yi bul, 10 ekle (üst sınır 10000)
-                    cur_max = 0
-                    for d in db.collection("favorites").where("type", "==", fav_type).stream():
-                        try:
-                            cs = int((d.to_dict() or {}).get("cineselectRating") or 0)
-                            if cs > cur_max:
-                                cur_max = cs
-                        except Exception:
-                            pass
-                    pin_val = _clamp_cs(cur_max + 10)
-                    db.collection("favorites").document(fav["id"]).update({"cineselectRating": pin_val})
-                    st.session_state[s_key] = pin_val
-                    st.session_state[i_key] = pin_val
-                    st.success(f"📌 {fav['title']} en üste taşındı (CS={pin_val}).")
-                    st.rerun()
-
+                    },
+                    tmdb_id=_tmdb_id,
+                    tmdb_type=_tmdb_type,
+                )
+                st.success(f"✅ {fav['title']} güncellendi.")
+                st.session_state[f"edit_mode_{fav['id']}"] = False
+                meta_changed = any(
+                    new != list(fav.get(field) or [])
+                    for field, new in (("directors", dir_list), ("cast", cast_list),
+                                       ("genres", genres_list), ("writers", writers_list))
+                )
+                _rerun_after_card_change(
+                    order_changed=(new_val != current and sort_option == "CineSelect"),
+                    membership_changed=(meta_changed and _filters_active()),
+                )
+        with cols_edit[1]:
+            if st.button("📌 Başa tuttur", key=f"pin_{fav['id']}"):
+                # Aynı türdeki favorilerde en yüksek CS'yi bul, 10 ekle (üst sınır 10000)
+                cur_max = 0
+                for d in store.items(fav_type):
+                    try:
+                        cs = int(d.get("cineselectRating") or 0)
+                        if cs > cur_max:
+                            cur_max = cs
+                    except Exception:
+                        pass
+                pin_val = _clamp_cs(cur_max + 10)
+                db.collection("favorites").document(fav["id"]).update({"cineselectRating": pin_val})
+                bump_data_version("pin")
+                st.session_state[s_key] = pin_val
+                st.session_state[i_key] = pin_val
+                st.success(f"📌 {fav['title']} en üste taşındı (CS={pin_val}).")
+                st.rerun()
 
 
 if media_type == "Movie":
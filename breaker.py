@@ -0,0 +1,172 @@
+# breaker.py
+"""
+Sağlayıcı (OMDb, TMDB) başına devre kesici ve uyarlanır zaman aşımı.
+
+Durumlar:
+  - closed    : istekler normal gider. Art arda FAILURE_THRESHOLD hata olursa devre açılır.
+  - open      : istekler ağa çıkmadan CircuitOpen ile hemen düşer (backfill saatlerce beklemez).
+  - half_open : bekleme süresi dolunca TEK bir deneme isteği geçer; başarılıysa devre kapanır,
+                başarısızsa bekleme süresi ikiye katlanarak (en çok MAX_COOLDOWN) yeniden açılır.
+
+Zaman aşımı sabit 12 sn yerine son başarılı isteklerin gecikmelerinden hesaplanır:
+p95 × TIMEOUT_MULTIPLIER, [MIN_TIMEOUT, MAX_TIMEOUT] aralığında. Yeterli örnek yoksa ve
+half_open denemelerinde MAX_TIMEOUT kullanılır.
+
+Hata sayılanlar: bağlantı hataları / zaman aşımı ve HTTP 5xx / 429. 404 gibi yanıtlar
+sağlayıcının ayakta olduğunu gösterir, başarı sayılır.
+"""
+import os
+import threading
+import time
+from collections import deque
+
+import requests
+
+FAILURE_THRESHOLD = int(os.getenv("CINESELECT_BREAKER_FAILURES", "5"))
+COOLDOWN = float(os.getenv("CINESELECT_BREAKER_COOLDOWN", "30"))
+MAX_COOLDOWN = 300.0
+MIN_TIMEOUT = 2.0
+MAX_TIMEOUT = float(os.getenv("CINESELECT_HTTP_TIMEOUT", "12"))
+TIMEOUT_MULTIPLIER = 3.0
+MIN_SAMPLES = 10
+WINDOW = 200
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpen(RuntimeError):
+    """Devre açıkken yapılan çağrı: sağlayıcıya gidilmedi."""
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    idx = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+class CircuitBreaker:
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=WINDOW)
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.cooldown = COOLDOWN
+        self.opened_at = None
+        self._probe_in_flight = False
+        self.calls = 0
+        self.failures = 0
+        self.rejected = 0
+        self.last_error = ""
+
+    # ---- zaman aşımı ----
+    def timeout(self) -> float:
+        with self._lock:
+            if self.state == HALF_OPEN or len(self._latencies) < MIN_SAMPLES:
+                return MAX_TIMEOUT
+            p95 = _percentile(sorted(self._latencies), 0.95)
+        return max(MIN_TIMEOUT, min(MAX_TIMEOUT, p95 * TIMEOUT_MULTIPLIER))
+
+    # ---- durum geçişleri ----
+    def _acquire(self):
+        """İsteğin geçip geçemeyeceğine karar verir; geçemezse CircuitOpen."""
+        with self._lock:
+            if self.state == OPEN:
+                if time.time() - self.opened_at < self.cooldown:
+                    self.rejected += 1
+                    raise CircuitOpen(f"{self.name} devresi açık ({self.last_error})")
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN:
+                if self._probe_in_flight:
+                    self.rejected += 1
+                    raise CircuitOpen(f"{self.name} devresi deneniyor")
+                self._probe_in_flight = True
+            self.calls += 1
+
+    def record_success(self, latency: float):
+        with self._lock:
+            self._latencies.append(latency)
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+            if self.state != CLOSED:
+                self.state = CLOSED
+                self.cooldown = COOLDOWN
+                self.opened_at = None
+
+    def record_failure(self, error: str):
+        with self._lock:
+            self.failures += 1
+            self.consecutive_failures += 1
+            self.last_error = error
+            if self.state == HALF_OPEN:
+                self._probe_in_flight = False
+                self.cooldown = min(MAX_COOLDOWN, self.cooldown * 2)
+                self.state = OPEN
+                self.opened_at = time.time()
+            elif self.state == CLOSED and self.consecutive_failures >= FAILURE_THRESHOLD:
+                self.state = OPEN
+                self.opened_at = time.time()
+
+    def reset(self):
+        with self._lock:
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self.cooldown = COOLDOWN
+            self.opened_at = None
+            self._probe_in_flight = False
+
+    # ---- istek ----
+    def get(self, url, **kwargs) -> requests.Response:
+        """
+        requests.get'in korunan hali: zaman aşımı uyarlanır, sonuç devre durumuna işlenir.
+        Devre açıksa CircuitOpen; ağ hatalarında requests istisnası yükseltilir.
+        """
+        self._acquire()
+        kwargs.setdefault("timeout", self.timeout())
+        t0 = time.perf_counter()
+        try:
+            r = requests.get(url, **kwargs)
+        except Exception as e:
+            self.record_failure(f"{type(e).__name__}: {e}")
+            raise
+        if r.status_code >= 500 or r.status_code == 429:
+            self.record_failure(f"HTTP {r.status_code}")
+        else:
+            self.record_success(time.perf_counter() - t0)
+        return r
+
+    def status(self) -> dict:
+        timeout = self.timeout()
+        with self._lock:
+            latencies = sorted(self._latencies)
+            retry_in = None
+            if self.state == OPEN:
+                retry_in = max(0.0, self.cooldown - (time.time() - self.opened_at))
+            return {
+                "provider": self.name,
+                "state": self.state,
+                "timeout": round(timeout, 2),
+                "p50": _percentile(latencies, 0.5),
+                "p95": _percentile(latencies, 0.95),
+                "samples": len(latencies),
+                "consecutive_failures": self.consecutive_failures,
+                "calls": self.calls,
+                "failures": self.failures,
+                "rejected": self.rejected,
+                "retry_in": retry_in,
+                "last_error": self.last_error,
+            }
+
+
+_breakers = {name: CircuitBreaker(name) for name in ("omdb", "tmdb")}
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    return _breakers[name]
+
+
+def all_status() -> list:
+    return [b.status() for b in _breakers.values()]
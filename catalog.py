@@ -0,0 +1,202 @@
+# catalog.py
+"""
+Addon için önceden hesaplanmış katalog parçaları (shard) ve manifest.
+
+favorites.json tek parça olduğundan addon herhangi bir kataloğu sunmak için dosyanın
+tamamını indirip ayrıştırmak zorunda. sync'in export aşaması bunun yanında şunları yazar:
+
+    catalog/<tür>/<sıralama>/<tür filtresi>/page-<n>.json
+        tür          : movies | series
+        sıralama     : library.EXPORT_SORTS anahtarları (cc, imdb, year, release)
+        tür filtresi : all | genre-<slug>
+    catalog/manifest.json
+        her parça için sha256 + öğe sayısı, her katalog için toplam / sayfa sayısı
+
+Addon yalnızca ihtiyaç duyduğu parçayı çeker ve manifest'teki özetle ucuzca doğrular.
+İçeriği değişmeyen parçalar yeniden yazılmaz.
+
+Yayınlanacak dosyalar yerel manifest'e değil, son başarılı yayına göre belirlenir:
+catalog/.published.json GitHub'a gönderilmiş her dosyanın özetini tutar. Yalnızca yerelde
+üretilen (export, yayınsız sync) değişiklikler böylece bir sonraki yayında gönderilir ve
+artık üretilmeyen parçalar addon deposundan da silinir.
+"""
+import hashlib
+import json
+import os
+import re
+import time
+from pathlib import Path
+
+CATALOG_DIR = Path("catalog")
+MANIFEST_NAME = "manifest.json"
+PUBLISHED_NAME = ".published.json"
+PAGE_SIZE = int(os.getenv("CINESELECT_CATALOG_PAGE_SIZE", "100"))
+ALL_GENRES = "all"
+
+
+def genre_slug(genre: str) -> str:
+    slug = re.sub(r"[^0-9a-z]+", "-", (genre or "").strip().lower()).strip("-")
+    return f"genre-{slug or 'unknown'}"
+
+
+def filter_genre(items, genre=None) -> list:
+    """
+    Sıralı listeden verilen türü içerenleri (sırayı koruyarak) seçer; genre boşsa hepsi.
+    Türler slug'larıyla karşılaştırılır: "Sci-Fi" ile "Sci Fi" aynı türdür.
+    """
+    if not genre:
+        return list(items)
+    wanted = genre_slug(genre)
+    return [it for it in items if any(genre_slug(g) == wanted for g in (it.get("genres") or []) if g)]
+
+
+def paginate(items, page: int = 1, page_size: int = PAGE_SIZE):
+    """(sayfa öğeleri, toplam sayfa). Sayfalar 1'den başlar; boş liste de 1 sayfadır."""
+    pages = max(1, -(-len(items) // page_size))
+    start = (max(1, page) - 1) * page_size
+    return items[start:start + page_size], pages
+
+
+def _encode(payload) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def build_shards(sections: dict, sorts: dict, page_size: int = PAGE_SIZE):
+    """
+    sections: {"movies": [...], "series": [...]}, sorts: {mod: fn(items) -> sıralı liste}.
+    Her mod için liste bir kez sıralanır, tür parçaları sıralı listenin süzülmesiyle çıkar.
+    Dönüş: ({göreli yol: (bytes, öğe sayısı)}, katalog özeti)
+    """
+    shards = {}
+    catalogs = {}
+    for section, items in sections.items():
+        # slug -> görünen ad (ilk rastlanan yazım) ve o slug'a giren kayıtlar; aynı slug'a
+        # düşen farklı yazımlar ("Sci-Fi" / "Sci Fi") tek parçada birleşir
+        genres = {}
+        members = {}
+        for it in items:
+            for g in (it.get("genres") or []):
+                if g and g != "Unknown":
+                    slug = genre_slug(g)
+                    genres.setdefault(slug, g)
+                    members.setdefault(slug, set()).add(id(it))
+        catalogs[section] = {}
+        for mode, sort_fn in sorts.items():
+            ordered = sort_fn(items)
+            views = [(ALL_GENRES, None, ordered)]
+            views += [
+                (slug, name, [it for it in ordered if id(it) in members[slug]])
+                for slug, name in sorted(genres.items())
+            ]
+            for key, name, view in views:
+                _, pages = paginate(view, 1, page_size)
+                catalogs[section].setdefault(key, {"genre": name, "total": len(view), "pages": pages})
+                for page in range(1, pages + 1):
+                    chunk, _ = paginate(view, page, page_size)
+                    path = f"{section}/{mode}/{key}/page-{page}.json"
+                    shards[path] = (_encode({
+                        "type": section, "sort": mode, "genre": name,
+                        "page": page, "pages": pages, "total": len(view), "items": chunk,
+                    }), len(chunk))
+    return shards, catalogs
+
+
+def read_manifest(root: Path = CATALOG_DIR) -> dict:
+    try:
+        with open(Path(root) / MANIFEST_NAME, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_catalog(sections: dict, sorts: dict, root: Path = CATALOG_DIR, page_size: int = PAGE_SIZE) -> dict:
+    """
+    Parçaları ve manifest'i `root` altına yazar. Özeti önceki manifest'le aynı olan ve diskte
+    duran parçalar atlanır, artık üretilmeyenler silinir; hiçbir şey değişmediyse manifest de
+    yeniden yazılmaz. Yayınlanacaklar için pending_publish() kullanılır.
+    Dönüş: {"shards", "written", "removed", "changed": [yazılan yollar], "deleted": [silinen yollar]}
+    """
+    root = Path(root)
+    old_manifest = read_manifest(root)
+    previous = old_manifest.get("shards", {})
+    shards, catalogs = build_shards(sections, sorts, page_size)
+    entries = {}
+    changed = []
+    for rel, (data, count) in shards.items():
+        digest = hashlib.sha256(data).hexdigest()
+        entries[rel] = {"sha256": digest, "items": count, "bytes": len(data)}
+        path = root / rel
+        if (previous.get(rel) or {}).get("sha256") == digest and path.exists():
+            continue
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        changed.append(str(path))
+
+    deleted = []
+    for rel in sorted(set(previous) - set(entries)):
+        try:
+            (root / rel).unlink()
+            deleted.append(str(root / rel))
+        except OSError:
+            pass
+
+    written = len(changed)
+    manifest = {
+        "page_size": page_size,
+        "sorts": list(sorts),
+        "catalogs": catalogs,
+        "shards": entries,
+    }
+    unchanged = all(old_manifest.get(k) == v for k, v in manifest.items()) and (root / MANIFEST_NAME).exists()
+    if not unchanged:
+        manifest["generated_at"] = int(time.time())
+        root.mkdir(parents=True, exist_ok=True)
+        (root / MANIFEST_NAME).write_bytes(_encode(manifest))
+        changed.append(str(root / MANIFEST_NAME))
+    return {"shards": len(entries), "written": written, "removed": len(deleted), "changed": changed,
+            "deleted": deleted}
+
+
+def read_published(root: Path = CATALOG_DIR) -> dict:
+    """Son başarılı yayının kaydı: {göreli yol: sha256}."""
+    try:
+        with open(Path(root) / PUBLISHED_NAME, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def pending_publish(root: Path = CATALOG_DIR) -> dict:
+    """
+    Son yayından bu yana değişen katalog dosyaları.
+    Dönüş: {"upload": {yol: sha256}, "delete": {yol: sha256}}; manifest yüklemelerin sonundadır,
+    böylece addon yeni manifest'i gördüğünde parçalar yerindedir.
+    """
+    root = Path(root)
+    manifest_path = root / MANIFEST_NAME
+    try:
+        manifest_bytes = manifest_path.read_bytes()
+    except OSError:
+        return {"upload": {}, "delete": {}}
+    current = {rel: entry["sha256"] for rel, entry in json.loads(manifest_bytes).get("shards", {}).items()}
+    current[MANIFEST_NAME] = hashlib.sha256(manifest_bytes).hexdigest()
+    published = read_published(root)
+    return {
+        "upload": {str(root / rel): digest for rel, digest in current.items() if published.get(rel) != digest},
+        "delete": {str(root / rel): digest for rel, digest in published.items() if rel not in current},
+    }
+
+
+def mark_published(uploaded: dict, deleted, root: Path = CATALOG_DIR):
+    """
+    Başarıyla gönderilen ({yol: sha256}, pending_publish'teki özetler) ve silinen yolları yayın
+    kaydına işler. Başarısız olanlar kayda girmez, bir sonraki yayında yeniden denenir.
+    """
+    root = Path(root)
+    published = read_published(root)
+    for path, digest in uploaded.items():
+        published[Path(path).relative_to(root).as_posix()] = digest
+    for path in deleted:
+        published.pop(Path(path).relative_to(root).as_posix(), None)
+    root.mkdir(parents=True, exist_ok=True)
+    (root / PUBLISHED_NAME).write_bytes(_encode(dict(sorted(published.items()))))
@@ -0,0 +1,133 @@
+# catalog_server.py
+"""
+İsteğe bağlı, salt okunur katalog HTTP servisi (Streamlit'siz).
+
+    python -m catalog_server [--host 127.0.0.1] [--port 8765]
+
+    GET /catalog/<movies|series>?sort=cc|imdb|year|release&genre=Drama&page=1&page_size=100
+    GET /health
+
+Yanıtlar bellek içi favori anlık görüntüsünden (favorites_store) üretilir; sıralama
+favorites.json / katalog parçalarıyla aynıdır (library.EXPORT_SORTS). Her yanıtın güçlü
+ETag'i veri sürümünden ve isteğin parametrelerinden türetilir: If-None-Match eşleşirse
+anlık görüntüye hiç dokunmadan 304 döner. İstemci gzip kabul ediyorsa gövde sıkıştırılır.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from catalog import PAGE_SIZE, filter_genre, paginate
+from favorites_store import FavoritesStore, data_version
+from library import EXPORT_SORTS
+
+SECTIONS = {"movies": "movie", "series": "show"}
+MAX_PAGE_SIZE = 500
+GZIP_MIN_BYTES = 1024
+
+_store = FavoritesStore()
+
+
+def _sorted(section: str, mode: str):
+    """
+    Dışa aktarım sırasına dizilmiş kayıtlar ve kurulduğu sürüm: (liste, sürüm).
+    Sürüm başına (tür, mod) için bir kez hesaplanır.
+    """
+    fav_type = SECTIONS[section]
+    return _store.derived_with_version(
+        ("export_sort", fav_type, mode),
+        lambda snap: EXPORT_SORTS[mode]([it.to_dict() for it in snap.get(fav_type, [])]),
+    )
+
+
+def _etag(version, params) -> str:
+    digest = hashlib.sha256(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    return f'"v{version}-{digest}"'
+
+
+class CatalogHandler(BaseHTTPRequestHandler):
+    server_version = "CineSelectCatalog/1.0"
+
+    def _send(self, status, body: bytes = b"", etag=None, content_type="application/json; charset=utf-8"):
+        gzipped = False
+        if body and len(body) >= GZIP_MIN_BYTES and "gzip" in (self.headers.get("Accept-Encoding") or ""):
+            body = gzip.compress(body)
+            gzipped = True
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        if status != 304:
+            self.send_header("Content-Type", content_type)
+            if gzipped:
+                self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body and self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _error(self, status, message):
+        self._send(status, json.dumps({"error": message}, ensure_ascii=False).encode("utf-8"))
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        if parts == ["health"]:
+            return self._send(200, json.dumps({"ok": True, "version": data_version()}).encode("utf-8"))
+        if len(parts) != 2 or parts[0] != "catalog" or parts[1] not in SECTIONS:
+            return self._error(404, "bilinmeyen yol; /catalog/movies veya /catalog/series")
+
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        mode = query.get("sort", "cc")
+        if mode not in EXPORT_SORTS:
+            return self._error(400, f"sort: {', '.join(EXPORT_SORTS)}")
+        try:
+            page = max(1, int(query.get("page", 1)))
+            page_size = min(MAX_PAGE_SIZE, max(1, int(query.get("page_size", PAGE_SIZE))))
+        except ValueError:
+            return self._error(400, "page / page_size tamsayı olmalı")
+        params = {"type": parts[1], "sort": mode, "genre": query.get("genre") or None,
+                  "page": page, "page_size": page_size}
+
+        # Sürüm değişmediyse istemcinin kopyası günceldir: anlık görüntü okunmadan 304
+        inm = self.headers.get("If-None-Match")
+        if inm:
+            current = _etag(_store.current_version(), params)
+            if current in (tag.strip() for tag in inm.split(",")):
+                return self._send(304, etag=current)
+
+        items, version = _sorted(parts[1], mode)
+        items = filter_genre(items, params["genre"])
+        chunk, pages = paginate(items, page, page_size)
+        body = json.dumps({**params, "version": version, "pages": pages, "total": len(items), "items": chunk},
+                          ensure_ascii=False, default=str).encode("utf-8")
+        self._send(200, body, etag=_etag(version, params))
+
+
+def serve(host="127.0.0.1", port=8765):
+    httpd = ThreadingHTTPServer((host, port), CatalogHandler)
+    print(f"📡 Katalog servisi: http://{host}:{port}/catalog/movies")
+    try:
+        httpd.serve_forever()
+    finally:
+        httpd.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m catalog_server", description="CineSelect salt okunur katalog servisi")
+    parser.add_argument("--host", default=os.getenv("CINESELECT_CATALOG_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("CINESELECT_CATALOG_PORT", "8765")))
+    args = parser.parse_args(argv)
+    serve(args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
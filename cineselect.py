@@ -0,0 +1,100 @@
+# cineselect.py
+"""
+Toplu işler için komut satırı girişi (Streamlit'siz).
+
+    python -m cineselect sync [--sort cc|imdb|year] [--no-publish] [--publish-shards] [--keep-placeholders]
+    python -m cineselect backfill [--limit N] [--restart] [--max-attempts N]
+    python -m cineselect export [--sort cc|imdb|year]
+    python -m cineselect publish [--shards]
+    python -m cineselect refresh-ratings [--limit N] [--only-missing]
+    python -m cineselect migrate-ids
+
+İlerleme stdout'a satır başına bir JSON nesnesi olarak yazılır:
+    {"event": "progress", "t": ..., "level": "info", "message": "...", "fraction": 0.42}
+    {"event": "result", "command": "sync", "ok": true, "elapsed": 12.3, "result": {...}}
+Hata olursa {"event": "error", ...} yazılır ve çıkış kodu 1 olur. Cron / Render job için uygundur.
+"""
+import argparse
+import contextlib
+import json
+import sys
+import time
+
+import library
+
+
+def _emit(stream, **event):
+    stream.write(json.dumps(event, ensure_ascii=False, default=str) + "\n")
+    stream.flush()
+
+
+def _json_report(stream):
+    def report(message, fraction=None, level="info"):
+        _emit(stream, event="progress", t=round(time.time(), 3), level=level, message=str(message),
+              fraction=(round(float(fraction), 4) if fraction is not None else None))
+    return report
+
+
+COMMANDS = {
+    "sync": lambda a, report: library.sync_with_firebase(sort_mode=a.sort, report=report, publish=not a.no_publish,
+                                                      publish_shards=a.publish_shards,
+                                                      resolve_placeholders=not a.keep_placeholders),
+    "backfill": lambda a, report: library.backfill_metadata(limit=(a.limit or None), report=report, restart=a.restart,
+                                                          max_attempts=a.max_attempts),
+    "export": lambda a, report: library.sync_with_firebase(sort_mode=a.sort, report=report, publish=False),
+    "publish": lambda a, report: library.push_favorites_to_github(report=report, publish_shards=a.shards),
+    "refresh-ratings": lambda a, report: library.refresh_ratings(limit=(a.limit or None),
+                                                                 only_missing=a.only_missing, report=report),
+    "migrate-ids": lambda a, report: library.migrate_provider_ids(report=report),
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m cineselect", description="CineSelect toplu işleri")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("sync", help="favorites.json + CSV'leri üret ve GitHub'a yayınla")
+    p.add_argument("--sort", choices=("cc", "imdb", "year"), default="cc")
+    p.add_argument("--no-publish", action="store_true", help="GitHub'a gönderme")
+    p.add_argument("--publish-shards", action="store_true", help="son yayından beri değişen katalog parçalarını da gönder")
+    p.add_argument("--keep-placeholders", action="store_true", help="tt0000000 ID'lerini yeniden çözme")
+
+    p = sub.add_parser("backfill", help="eksik directors/cast/genres/writers alanlarını doldur")
+    p.add_argument("--limit", type=int, default=20, help="bu çağrıda işlenecek doküman (0 = hepsi)")
+    p.add_argument("--restart", action="store_true", help="yarıda kalan çalıştırmayı bırak, baştan başla")
+    p.add_argument("--max-attempts", type=int, default=None, help="bu kadar başarısızlıktan sonra kaydı park et")
+
+    p = sub.add_parser("export", help="favorites.json + CSV'leri yalnızca yerelde üret")
+    p.add_argument("--sort", choices=("cc", "imdb", "year"), default="cc")
+
+    p = sub.add_parser("publish", help="mevcut dosyaları GitHub'a gönder")
+    p.add_argument("--shards", action="store_true", help="son yayından beri değişen katalog parçalarını da gönder")
+
+    p = sub.add_parser("refresh-ratings", help="IMDb/RT puanlarını toplu yenile")
+    p.add_argument("--limit", type=int, default=0, help="işlenecek doküman (0 = hepsi)")
+    p.add_argument("--only-missing", action="store_true", help="yalnızca puanı olmayanlar")
+
+    sub.add_parser("migrate-ids", help="tmdb_id / tmdb_type / doğrulanmış imdb alanlarını tamamla")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    out = sys.stdout
+    report = _json_report(out)
+    started = time.time()
+    # Kütüphanedeki düz print() çıktıları JSON akışını bozmasın diye stderr'e yönlendirilir
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            result = COMMANDS[args.command](args, report)
+    except Exception as e:
+        _emit(out, event="error", command=args.command, ok=False, elapsed=round(time.time() - started, 3),
+              error=f"{type(e).__name__}: {e}")
+        return 1
+    ok = not (isinstance(result, dict) and result.get("failed"))
+    _emit(out, event="result", command=args.command, ok=ok, elapsed=round(time.time() - started, 3), result=result)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+# columnar.py
+"""
+Favorilerin sütunlu (NumPy) görünümü.
+
+Anlık görüntü her değiştiğinde bir kez kurulur (FavoritesStore.columns):
+  - imdbRating, rt, cineselectRating ve year için dizi sütunları,
+  - "Sort by" seçeneklerinin dördü için önceden hesaplanmış argsort sıraları,
+  - directors/cast/genres/writers için ad -> satır indeksleri.
+Böylece her rerun'da sıralama ve aralık/facet filtreleri Python döngüsü yerine
+vektörel maske işlemleriyle yapılır.
+"""
+import numpy as np
+
+SORT_COLUMNS = {"IMDb": "imdb", "RT": "rt", "CineSelect": "cs", "Year": "year"}
+
+
+def _number(value, cast=float):
+    """get_sort_key ile aynı kural: okunamayan / boş değerler 0 sayılır."""
+    try:
+        return cast(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+class ColumnarView:
+    def __init__(self, items):
+        self.items = list(items)
+        n = len(self.items)
+        self.imdb = np.fromiter((_number(it.get("imdbRating")) for it in self.items), dtype=np.float64, count=n)
+        self.rt = np.fromiter((_number(it.get("rt")) for it in self.items), dtype=np.float64, count=n)
+        self.cs = np.fromiter((_number(it.get("cineselectRating")) for it in self.items), dtype=np.float64, count=n)
+        self.year = np.fromiter((_number(it.get("year"), int) for it in self.items), dtype=np.int64, count=n)
+        # Azalan sıra; eşitlerde özgün sırayı koruyan kararlı sıralama (sorted(reverse=True) ile aynı)
+        self.orders = {
+            option: np.argsort(-getattr(self, column), kind="stable")
+            for option, column in SORT_COLUMNS.items()
+        }
+        self._postings = {}
+
+    def __len__(self):
+        return len(self.items)
+
+    # ---- aralıklar ----
+    def bounds(self) -> dict:
+        """Filtre kaydırıcıları için sütun aralıkları (bilinmeyen 0 değerleri hariç)."""
+        def span(arr, default):
+            known = arr[arr > 0]
+            return (known.min().item(), known.max().item()) if known.size else default
+        return {
+            "year": span(self.year, (1900, 2100)),
+            "imdb": span(self.imdb, (0.0, 10.0)),
+            "rt": span(self.rt, (0.0, 100.0)),
+            "cs": span(self.cs, (1.0, 10000.0)),
+        }
+
+    def range_mask(self, year=None, min_imdb=None, min_rt=None, cs=None):
+        """
+        Verilen aralık filtrelerinin kesişimi. None olan filtre uygulanmaz.
+        year / cs: (alt, üst) dahil; min_imdb / min_rt: alt sınır.
+        """
+        mask = np.ones(len(self.items), dtype=bool)
+        if year is not None:
+            mask &= (self.year >= year[0]) & (self.year <= year[1])
+        if min_imdb:
+            mask &= self.imdb >= min_imdb
+        if min_rt:
+            mask &= self.rt >= min_rt
+        if cs is not None:
+            mask &= (self.cs >= cs[0]) & (self.cs <= cs[1])
+        return mask
+
+    # ---- facet'ler ----
+    def _postings_for(self, field):
+        postings = self._postings.get(field)
+        if postings is None:
+            rows = {}
+            for i, it in enumerate(self.items):
+                for name in (it.get(field) or []):
+                    rows.setdefault(name, []).append(i)
+            postings = {name: np.asarray(idx, dtype=np.int64) for name, idx in rows.items()}
+            self._postings[field] = postings
+        return postings
+
+    def any_of(self, field, names):
+        """`field` listesinde `names` değerlerinden en az biri geçen satırların maskesi."""
+        mask = np.zeros(len(self.items), dtype=bool)
+        postings = self._postings_for(field)
+        for name in names:
+            idx = postings.get(name)
+            if idx is not None:
+                mask[idx] = True
+        return mask
+
+    # ---- sonuç ----
+    def ordered(self, sort_option, mask=None) -> list:
+        order = self.orders.get(sort_option, self.orders["CineSelect"])
+        if mask is not None:
+            order = order[mask[order]]
+        return [self.items[i] for i in order]
@@ -0,0 +1,255 @@
+# favorites_store.py
+"""
+Favorilerin süreç genelinde paylaşılan bellek içi kopyası.
+
+Tüm Streamlit oturumları aynı anlık görüntüyü okur (app.py onu st.cache_resource ile
+tutar). Firestore'a yapılan her yazımdan sonra bump_data_version() çağrılır; sürüm
+state_store'da tutulur ve yalnızca artar. Böylece arka plan işlerinin ve komut
+satırının (ayrı süreç) yazımları da bir sonraki okumada görülür. Facet listeleri gibi
+türetilmiş veriler de sürüme bağlı olarak önbelleğe alınır.
+"""
+import os
+import sys
+import threading
+import time
+
+from columnar import ColumnarView
+from similarity import SimilarityIndex
+from state_store import connect
+
+_NAME = "favorites"
+# Sürüm SQLite'tan en fazla bu sıklıkta okunur (bir sayfa çizimi yüzlerce kez snapshot() çağırır).
+# Bu süreçteki yazımlar (_local_bumps) beklemeden görülür; diğer süreçlerinkiler en geç bu kadar gecikir.
+VERSION_CHECK_INTERVAL = float(os.getenv("CINESELECT_VERSION_CHECK_INTERVAL", "1.0"))
+_local_bumps = 0
+_bumps_lock = threading.Lock()
+
+
+def data_version() -> int:
+    """Favori verisinin güncel sürümü (hiç yazım olmadıysa 0)."""
+    conn = connect()
+    try:
+        row = conn.execute("SELECT version FROM data_version WHERE name=?", (_NAME,)).fetchone()
+        return int(row["version"]) if row else 0
+    finally:
+        conn.close()
+
+
+def bump_data_version(reason="") -> int:
+    """Sürümü bir artırır ve yeni değeri döndürür. Her Firestore yazımından sonra çağrılmalı."""
+    global _local_bumps
+    conn = connect()
+    try:
+        conn.execute(
+            "INSERT INTO data_version (name, version, reason, updated_at) VALUES (?, 1, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET version=version+1, reason=excluded.reason, "
+            "updated_at=excluded.updated_at",
+            (_NAME, reason, time.time()),
+        )
+        version = int(conn.execute("SELECT version FROM data_version WHERE name=?", (_NAME,)).fetchone()["version"])
+    finally:
+        conn.close()
+    # Yazım kaydedildikten sonra: bu süreçteki önbellekler sürümü bir sonraki okumada yeniden kontrol eder
+    with _bumps_lock:
+        _local_bumps += 1
+    return version
+
+
+FACET_FIELDS = ("directors", "cast", "genres", "writers")
+
+
+class Favorite:
+    """
+    Bir favorinin sıkıştırılmış, salt okunur kaydı.
+
+    Sık kullanılan alanlar __slots__ ile tutulur; kişi ve tür adları sys.intern ile
+    paylaşılan tabloya alınır ve demet (tuple) olarak saklanır, böylece yüzlerce
+    dokümanda tekrar eden "Christopher Nolan" tek bir string olur. Seyrek alanlar
+    `_extra` sözlüğündedir. Arayüz kodu için sözlük gibi .get() / [] erişimi sunar.
+    """
+
+    __slots__ = (
+        "id", "title", "year", "type", "imdb", "imdbRating", "rt", "cineselectRating", "poster",
+        "directors", "writers", "cast", "genres", "tmdb_id", "tmdb_type", "imdb_verified", "_nulls", "_extra",
+    )
+    _NAME_FIELDS = FACET_FIELDS
+    _FIELDS = __slots__[:-2]
+
+    def __init__(self, data: dict):
+        data = dict(data)
+        # Dokümanda açıkça null olan alanlar: get()/[] onlar için default değil None döndürür
+        object.__setattr__(self, "_nulls", frozenset(k for k in self._FIELDS if data.get(k, _MISSING) is None))
+        for field in self._FIELDS:
+            value = data.pop(field, None)
+            if field in self._NAME_FIELDS and value is not None:
+                # Yalnızca dokümanda olan listeler demete çevrilir; olmayan alan yok sayılmaya devam eder
+                value = tuple(sys.intern(v) for v in value if isinstance(v, str))
+            elif field in ("type", "tmdb_type") and isinstance(value, str):
+                value = sys.intern(value)
+            object.__setattr__(self, field, value)
+        object.__setattr__(self, "_extra", data or None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Favorite kayıtları salt okunurdur")
+
+    def _lookup(self, key):
+        """Saklanan değer (None olabilir) ya da alan hiç yoksa _MISSING (sözlükteki dict.get ile aynı)."""
+        if key in self._FIELDS:
+            value = getattr(self, key)
+            if value is not None or key in self._nulls:
+                return value
+            return _MISSING
+        return (self._extra or {}).get(key, _MISSING)
+
+    def get(self, key, default=None):
+        value = self._lookup(key)
+        return default if value is _MISSING else value
+
+    def __getitem__(self, key):
+        value = self._lookup(key)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self._lookup(key) is not _MISSING
+
+    def to_dict(self) -> dict:
+        d = {f: getattr(self, f) for f in self._FIELDS if getattr(self, f) is not None or f in self._nulls}
+        for f in self._NAME_FIELDS:
+            if d.get(f) is not None:
+                d[f] = list(d[f])
+        d.update(self._extra or {})
+        return d
+
+    def __repr__(self):
+        return f"Favorite({self.id!r}, {self.title!r}, {self.year!r})"
+
+
+_MISSING = object()
+
+
+def build_facets(items) -> dict:
+    """Filtre listeleri: alan -> sıralı benzersiz değerler."""
+    return {field: sorted({v for it in items for v in (it.get(field) or [])}) for field in FACET_FIELDS}
+
+
+def _load_from_firestore():
+    from firebase_setup import get_firestore
+
+    snapshot = {"movie": [], "show": []}
+    for doc in get_firestore().collection("favorites").stream():
+        item = doc.to_dict() or {}
+        item.setdefault("id", doc.id)
+        if item.get("type") in snapshot:
+            snapshot[item["type"]].append(Favorite(item))
+    return snapshot
+
+
+class FavoritesStore:
+    """
+    {"movie": [Favorite, ...], "show": [...]} anlık görüntüsü. Sürüm değişince tek bir okumayla
+    yenilenir; eşzamanlı oturumlar aynı yüklemeyi bekler. Dönen listeler ve sözlükler
+    paylaşılır, çağıranlar onları değiştirmemelidir.
+    """
+
+    def __init__(self, loader=None):
+        self._loader = loader or _load_from_firestore
+        self._lock = threading.Lock()
+        self._version = None
+        self._snapshot = None
+        self._derived = {}
+        self._similarity = SimilarityIndex()
+        self._similarity_version = None
+        self._checked_at = 0.0
+        self._checked_bumps = None
+        self._checked_version = None
+        self.loaded_at = None
+        self.load_seconds = None
+
+    def current_version(self):
+        """
+        Verinin güncel sürümü; SQLite en fazla VERSION_CHECK_INTERVAL'da bir okunur.
+        Henüz yüklenmemiş olabilir: yüklü anlık görüntünün sürümü `version`dır.
+        """
+        now = time.monotonic()
+        bumps = _local_bumps
+        if bumps == self._checked_bumps and now - self._checked_at < VERSION_CHECK_INTERVAL:
+            return self._checked_version
+        version = data_version()
+        self._checked_at, self._checked_bumps, self._checked_version = now, bumps, version
+        return version
+
+    def _refresh(self, version) -> dict:
+        """
+        Sürüm ilerlediyse anlık görüntüyü yeniden yükler. self._lock tutulurken çağrılır.
+        Sürümler yalnızca artar: kilidi beklerken eski bir sürüm okumuş iş parçacığı geri yüklemez.
+        """
+        if self._snapshot is None or version > self._version:
+            t0 = time.perf_counter()
+            self._snapshot = self._loader()
+            self.load_seconds = time.perf_counter() - t0
+            self.loaded_at = time.time()
+            self._version = version
+            self._derived = {}
+        return self._snapshot
+
+    def snapshot(self) -> dict:
+        version = self.current_version()
+        with self._lock:
+            return self._refresh(version)
+
+    @property
+    def version(self):
+        return self._version
+
+    def items(self, fav_type: str) -> list:
+        return self.snapshot().get(fav_type, [])
+
+    def get(self, fav_type: str, fav_id):
+        """Tek favoriyi ID ile döndürür (yoksa None)."""
+        by_id = self.derived(("by_id", fav_type), lambda snap: {it.get("id"): it for it in snap.get(fav_type, [])})
+        return by_id.get(fav_id)
+
+    def facets(self, fav_type: str) -> dict:
+        return self.derived(("facets", fav_type), lambda snap: build_facets(snap.get(fav_type, [])))
+
+    def columns(self, fav_type: str) -> ColumnarView:
+        """Sıralama ve aralık filtreleri için NumPy sütun görünümü (sürüm başına bir kez kurulur)."""
+        return self.derived(("columns", fav_type), lambda snap: ColumnarView(snap.get(fav_type, [])))
+
+    def similarity(self) -> SimilarityIndex:
+        """
+        "Benzerlerini göster" dizini. Sürümler arasında korunur; yeni anlık görüntüye
+        yalnızca eklenen / değişen / silinen dokümanlar işlenerek eşitlenir.
+        """
+        version = self.current_version()
+        with self._lock:
+            snapshot = self._refresh(version)
+            if self._similarity_version != self._version:
+                self._similarity.sync([it for items in snapshot.values() for it in items])
+                self._similarity_version = self._version
+        return self._similarity
+
+    def counts(self) -> dict:
+        return {k: len(v) for k, v in self.snapshot().items()}
+
+    def derived(self, key, build):
+        """
+        Anlık görüntüden türetilen değeri (build(snapshot)) sürüm değişene kadar saklar.
+        Yenileme ve build aynı kilit altında yapılır: araya giren bir yeniden yükleme, eski
+        anlık görüntüden kurulmuş değeri yeni sürüme yazamaz.
+        """
+        return self.derived_with_version(key, build)[0]
+
+    def derived_with_version(self, key, build):
+        """derived() ile aynı; (değer, değerin kurulduğu anlık görüntünün sürümü) döndürür."""
+        version = self.current_version()
+        with self._lock:
+            snapshot = self._refresh(version)
+            if key not in self._derived:
+                self._derived[key] = build(snapshot)
+            return self._derived[key], self._version
+
+    def invalidate(self, reason="") -> int:
+        return bump_data_version(reason)
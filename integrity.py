@@ -0,0 +1,127 @@
+# integrity.py
+"""
+Kütüphane bütünlük tarayıcısı.
+
+Favorilerin üzerinden TEK geçişte tüm kuralları kontrol eder ve yapılandırılmış bir
+rapor üretir. Rapor hem missing_metadata.csv'yi (sync) hem de arayüzdeki bütünlük
+panelini besler.
+
+Kurallar:
+  - non_string_imdb   : imdb alanı string değil (ör. yanlışlıkla puan yazılmış)
+  - placeholder_imdb  : imdb = tt0000000
+  - missing_imdb      : imdb boş
+  - duplicate_imdb    : aynı imdb farklı dokümanlarda (ör. iki ayrı tmdb… kaydı)
+  - unknown_genres    : genres = ["Unknown"]
+  - missing_metadata  : directors / cast / genres eksik
+"""
+PLACEHOLDER_IMDB = "tt0000000"
+
+RULES = {
+    "non_string_imdb": "IMDb alanı string değil",
+    "placeholder_imdb": "IMDb ID yer tutucu (tt0000000)",
+    "missing_imdb": "IMDb ID yok",
+    "duplicate_imdb": "Aynı IMDb ID birden çok dokümanda",
+    "unknown_genres": 'Tür ["Unknown"]',
+    "missing_metadata": "Directors / cast / genres eksik",
+}
+
+# missing_metadata.csv'ye yazılan kurallar
+MISSING_META_RULES = ("missing_metadata", "unknown_genres")
+
+
+class IntegrityReport:
+    def __init__(self):
+        self.issues = []     # {"doc_id", "title", "year", "type", "imdb", "rule", "detail"}
+        self.scanned = 0
+        self._by_doc = {}
+
+    def add(self, item, rule, detail=""):
+        issue = {
+            "doc_id": item.get("id"),
+            "title": item.get("title") or "",
+            "year": item.get("year") or "",
+            "type": item.get("type") or "",
+            "imdb": item.get("imdb") if isinstance(item.get("imdb"), str) else "",
+            "rule": rule,
+            "detail": detail,
+        }
+        self.issues.append(issue)
+        self._by_doc.setdefault(issue["doc_id"], []).append(issue)
+
+    def counts(self) -> dict:
+        counts = {rule: 0 for rule in RULES}
+        for issue in self.issues:
+            counts[issue["rule"]] += 1
+        return counts
+
+    def doc_ids(self, rule) -> set:
+        return {i["doc_id"] for i in self.issues if i["rule"] == rule}
+
+    def for_doc(self, doc_id) -> list:
+        return self._by_doc.get(doc_id, [])
+
+    def missing_metadata_entries(self) -> list:
+        """missing_metadata.csv satırları: doküman başına bir kayıt, nedenler 'note' sütununda."""
+        entries = {}
+        for issue in self.issues:
+            if issue["rule"] not in MISSING_META_RULES:
+                continue
+            entry = entries.setdefault(issue["doc_id"], {
+                "title": issue["title"],
+                "year": issue["year"],
+                "imdb_id": issue["imdb"],
+                "doc_id": issue["doc_id"],
+                "note": [],
+            })
+            entry["note"].append(issue["detail"] or issue["rule"])
+        for entry in entries.values():
+            entry["note"] = "; ".join(entry["note"])
+        return list(entries.values())
+
+    def summary(self) -> dict:
+        return {"scanned": self.scanned, "issues": len(self.issues),
+                "counts": {k: v for k, v in self.counts().items() if v}}
+
+
+def scan(items) -> IntegrityReport:
+    """Tüm kuralları tek geçişte uygular. items: "id" alanı olan favori kayıtları (dict veya Favorite)."""
+    report = IntegrityReport()
+    seen_imdb = {}  # imdb -> ilk doküman
+    duplicates = {}  # imdb -> [doküman, ...]
+    for item in items:
+        report.scanned += 1
+        imdb = item.get("imdb")
+        if imdb not in (None, "") and not isinstance(imdb, str):
+            report.add(item, "non_string_imdb", f"imdb={imdb!r}")
+        else:
+            imdb = (imdb or "").strip()
+            if not imdb:
+                report.add(item, "missing_imdb")
+            elif imdb == PLACEHOLDER_IMDB:
+                report.add(item, "placeholder_imdb")
+            elif imdb in seen_imdb:
+                duplicates.setdefault(imdb, [seen_imdb[imdb]]).append(item)
+            else:
+                seen_imdb[imdb] = item
+
+        dirs = list(item.get("directors") or [])
+        cast = list(item.get("cast") or [])
+        genres = list(item.get("genres") or [])
+        if genres == ["Unknown"]:
+            report.add(item, "unknown_genres", "genres unknown")
+        # Consider missing if any key fields are empty or contain only "Unknown"
+        missing = [
+            name for name, empty in (
+                ("directors", not dirs or dirs == ["Unknown"]),
+                ("cast", not cast),
+                ("genres", not genres),
+            ) if empty
+        ]
+        if missing:
+            report.add(item, "missing_metadata", "missing " + ", ".join(missing))
+
+    for imdb, docs in duplicates.items():
+        ids = ", ".join(str(d.get("id")) for d in docs)
+        for d in docs:
+            report.add(d, "duplicate_imdb", f"{imdb}: {ids}")
+    return report
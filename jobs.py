@@ -0,0 +1,213 @@
+# jobs.py
+"""
+Arka plan iş çalıştırıcısı.
+
+Senkronizasyon, backfill ve GitHub yayını gibi uzun işler Streamlit betik
+thread'inde değil, sunucu sürecindeki ayrı thread'lerde çalışır. Durum ve ilerleme
+state_store'daki `jobs` tablosuna yazılır; böylece sekme yenilense de iş devam eder
+ve herhangi bir oturum ilerlemeyi okuyabilir. Aynı isimde çalışan bir iş varsa
+yenisi başlatılmaz (JobAlreadyRunning).
+"""
+import json
+import os
+import threading
+import time
+import traceback
+import uuid
+
+from state_store import connect
+
+ACTIVE = ("queued", "running")
+_LOG_LIMIT = 200
+# İlerleme satırı en fazla bu aralıkla yazılır (saniye); ara bildirimler bellekte birikir
+REPORT_INTERVAL = float(os.getenv("CINESELECT_JOB_REPORT_INTERVAL", "0.5"))
+
+
+class JobAlreadyRunning(RuntimeError):
+    def __init__(self, name, job_id):
+        super().__init__(f"'{name}' işi zaten çalışıyor ({job_id})")
+        self.name = name
+        self.job_id = job_id
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _row_to_dict(row):
+    if row is None:
+        return None
+    d = dict(row)
+    for k in ("params", "log", "result"):
+        try:
+            d[k] = json.loads(d[k]) if d.get(k) else None
+        except ValueError:
+            pass
+    return d
+
+
+class JobRunner:
+    def __init__(self):
+        self.owner = f"{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+        self._recover()
+
+    # ---- sahipsiz işler ----
+    def _owner_alive(self, owner) -> bool:
+        if owner == self.owner:
+            return True
+        try:
+            pid = int(str(owner).split(":")[0])
+        except ValueError:
+            return False
+        # Aynı PID ama farklı jeton: önceki (yeniden başlatılmış) sürecin kalıntısı
+        return pid != os.getpid() and _pid_alive(pid)
+
+    def _recover(self):
+        """Sahibi ölmüş süreçten kalan 'running' kayıtlarını 'interrupted' yapar."""
+        conn = connect()
+        try:
+            rows = conn.execute(
+                "SELECT id, owner FROM jobs WHERE status IN (?, ?)", ACTIVE
+            ).fetchall()
+            for row in rows:
+                if not self._owner_alive(row["owner"]):
+                    conn.execute(
+                        "UPDATE jobs SET status='interrupted', finished_at=?, message=? WHERE id=?",
+                        (time.time(), "Süreç yeniden başladı; iş yarıda kaldı.", row["id"]),
+                    )
+        finally:
+            conn.close()
+
+    # ---- başlatma ----
+    def submit(self, name, fn, **params) -> str:
+        """
+        `fn(report=..., **params)` çağrısını arka planda başlatır ve iş ID'sini döndürür.
+        Aynı isimde aktif iş varsa JobAlreadyRunning fırlatır.
+        """
+        job_id = uuid.uuid4().hex[:12]
+        with self._lock:
+            conn = connect()
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                active = conn.execute(
+                    "SELECT id, owner FROM jobs WHERE name=? AND status IN (?, ?)", (name, *ACTIVE)
+                ).fetchall()
+                for row in active:
+                    if self._owner_alive(row["owner"]):
+                        conn.execute("ROLLBACK")
+                        raise JobAlreadyRunning(name, row["id"])
+                    conn.execute(
+                        "UPDATE jobs SET status='interrupted', finished_at=? WHERE id=?",
+                        (time.time(), row["id"]),
+                    )
+                conn.execute(
+                    "INSERT INTO jobs (id, name, params, status, progress, message, owner, created_at) "
+                    "VALUES (?, ?, ?, 'queued', 0, 'Sırada', ?, ?)",
+                    (job_id, name, json.dumps(params, default=str), self.owner, time.time()),
+                )
+                conn.execute("COMMIT")
+            finally:
+                conn.close()
+
+        threading.Thread(
+            target=self._run, args=(job_id, fn, params), name=f"job-{name}-{job_id}", daemon=True
+        ).start()
+        return job_id
+
+    def _run(self, job_id, fn, params):
+        log = []
+        # report() sınırlı eşzamanlı aşamalarda birden çok thread'den çağrılır
+        lock = threading.Lock()
+        state = {"progress": 0.0, "message": None, "written_at": None}
+
+        def _update(**fields):
+            cols = ", ".join(f"{k}=?" for k in fields)
+            conn = connect()
+            try:
+                conn.execute(f"UPDATE jobs SET {cols} WHERE id=?", (*fields.values(), job_id))
+            finally:
+                conn.close()
+
+        def _progress_fields():
+            fields = {"progress": state["progress"], "log": json.dumps(log, ensure_ascii=False)}
+            if state["message"] is not None:
+                fields["message"] = state["message"]
+            return fields
+
+        def report(message, fraction=None, level="info"):
+            print(f"[job {job_id}] {message}")
+            with lock:
+                log.append({"t": time.time(), "level": level, "msg": str(message)})
+                del log[:-_LOG_LIMIT]
+                if fraction is not None:
+                    state["progress"] = max(0.0, min(1.0, float(fraction)))
+                state["message"] = str(message)
+                # Öğe başına bildirimler tabloya her seferinde yazılmaz; hatalar hemen görünür
+                now = time.monotonic()
+                if level == "error" or state["written_at"] is None or now - state["written_at"] >= REPORT_INTERVAL:
+                    state["written_at"] = now
+                    _update(**_progress_fields())
+
+        _update(status="running", started_at=time.time(), message="Başladı")
+        try:
+            result = fn(report=report, **params)
+        except Exception as e:
+            traceback.print_exc()
+            with lock:
+                log.append({"t": time.time(), "level": "error", "msg": f"{type(e).__name__}: {e}"})
+                _update(status="failed", finished_at=time.time(), error=f"{type(e).__name__}: {e}",
+                        message=f"❌ {e}", log=json.dumps(log, ensure_ascii=False))
+            return
+        with lock:
+            state["progress"] = 1.0
+            _update(**_progress_fields(), status="succeeded", finished_at=time.time(),
+                    result=json.dumps(result, default=str, ensure_ascii=False))
+
+    # ---- sorgular ----
+    def get(self, job_id):
+        conn = connect()
+        try:
+            return _row_to_dict(conn.execute("SELECT * FROM jobs WHERE id=?", (job_id,)).fetchone())
+        finally:
+            conn.close()
+
+    def recent(self, limit=10):
+        conn = connect()
+        try:
+            rows = conn.execute("SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+            return [_row_to_dict(r) for r in rows]
+        finally:
+            conn.close()
+
+    def active(self, name=None):
+        conn = connect()
+        try:
+            if name:
+                rows = conn.execute(
+                    "SELECT * FROM jobs WHERE name=? AND status IN (?, ?)", (name, *ACTIVE)
+                ).fetchall()
+            else:
+                rows = conn.execute("SELECT * FROM jobs WHERE status IN (?, ?)", ACTIVE).fetchall()
+            return [_row_to_dict(r) for r in rows]
+        finally:
+            conn.close()
+
+
+# Süreç genelinde tek çalıştırıcı (app.py her rerun'da yeniden çalışır, bu modül çalışmaz)
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_runner() -> JobRunner:
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = JobRunner()
+        return _runner
@@ -0,0 +1,94 @@
+# ledger.py
+"""
+Yeniden başlatılabilir toplu işler için iş defteri (work ledger).
+
+Her çalıştırma (run) bir görev adına (ör. "backfill") bağlıdır ve işlenen her öğe
+sonucu ve zaman damgasıyla kaydedilir. Yarıda kalan bir çalıştırma sonraki çağrıda
+kaldığı yerden devam eder; aynı çalıştırmada tamamlanmış öğeler atlanır. Kayıtlar
+upsert edildiği için aynı öğeyi iki kez işlemek defteri bozmaz.
+"""
+import time
+import uuid
+
+from state_store import connect
+
+
+class WorkLedger:
+    def __init__(self, task: str):
+        self.task = task
+        self.run_id = None
+
+    def open_run(self, restart=False) -> tuple[str, bool]:
+        """
+        Bitmemiş çalıştırmayı sürdürür ya da yenisini açar.
+        Dönüş: (run_id, resumed)
+        """
+        conn = connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT run_id FROM work_runs WHERE task=? AND status='open' ORDER BY started_at DESC LIMIT 1",
+                (self.task,),
+            ).fetchone()
+            if row and restart:
+                conn.execute(
+                    "UPDATE work_runs SET status='abandoned', finished_at=? WHERE run_id=?",
+                    (time.time(), row["run_id"]),
+                )
+                row = None
+            if row:
+                self.run_id = row["run_id"]
+                resumed = True
+            else:
+                self.run_id = f"{self.task}-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:4]}"
+                now = time.time()
+                conn.execute(
+                    "INSERT INTO work_runs (run_id, task, status, started_at, updated_at) VALUES (?, ?, 'open', ?, ?)",
+                    (self.run_id, self.task, now, now),
+                )
+                resumed = False
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+        return self.run_id, resumed
+
+    def outcomes(self) -> dict:
+        """Bu çalıştırmada işlenmiş öğeler: {item_key: (outcome, note)}."""
+        conn = connect()
+        try:
+            rows = conn.execute(
+                "SELECT item_key, outcome, note FROM work_ledger WHERE run_id=?", (self.run_id,)
+            ).fetchall()
+        finally:
+            conn.close()
+        return {r["item_key"]: (r["outcome"], r["note"]) for r in rows}
+
+    def record(self, item_key: str, outcome: str, note: str = ""):
+        now = time.time()
+        conn = connect()
+        try:
+            conn.execute(
+                "INSERT INTO work_ledger (run_id, item_key, outcome, note, updated_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(run_id, item_key) DO UPDATE SET outcome=excluded.outcome, note=excluded.note, "
+                "updated_at=excluded.updated_at",
+                (self.run_id, item_key, outcome, note or "", now),
+            )
+            conn.execute("UPDATE work_runs SET updated_at=? WHERE run_id=?", (now, self.run_id))
+        finally:
+            conn.close()
+
+    def finish(self):
+        conn = connect()
+        try:
+            conn.execute(
+                "UPDATE work_runs SET status='finished', finished_at=? WHERE run_id=?", (time.time(), self.run_id)
+            )
+        finally:
+            conn.close()
+
+    def summary(self) -> dict:
+        """Sonuç başına sayılar, ör. {"updated": 12, "no_meta": 3}."""
+        counts = {}
+        for outcome, _note in self.outcomes().values():
+            counts[outcome] = counts.get(outcome, 0) + 1
+        return counts
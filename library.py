@@ -0,0 +1,841 @@
+# library.py
+"""
+Kütüphane genelindeki toplu işlemler: senkronizasyon (favorites.json + CSV'ler),
+metadata backfill, sağlayıcı ID göçü ve GitHub'a yayınlama.
+
+Streamlit'e bağımlı değildir. İlerleme `report(message, fraction=None, level="info")`
+geri çağrısıyla bildirilir; arayüzde bunu arka plan iş çalıştırıcısı (jobs.py) sağlar.
+"""
+import base64
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+from catalog import mark_published, pending_publish, write_catalog
+from favorites_store import bump_data_version
+from firebase_setup import get_firestore
+from integrity import scan as scan_integrity
+from ledger import WorkLedger
+from metadata import (
+    fetch_metadata,
+    get_imdb_id_from_tmdb,
+    resolve_provider_ids,
+    resolve_ratings,
+    validate_imdb_id,
+)
+from omdb import get_ratings
+from seeds import (
+    REASON_NO_IMDB,
+    REASON_NO_META,
+    REASON_RETRY_FAILED,
+    REASON_STILL_MISSING,
+    REASON_UPDATE_FAILED,
+    SEED_META_FIELDS,
+    SEED_META_PATH,
+    SEED_PATH,
+    SEED_RATING_FIELDS,
+    MissingMetaTracker,
+    append_seed_meta,
+    append_seed_rating,
+    append_seed_ratings,
+    replace_missing_meta,
+    overwrite_seed_meta,
+    read_seed_meta,
+    rewrite_seed_csv,
+)
+from titles import provider_ids_of
+
+
+def print_report(message, fraction=None, level="info"):
+    """Varsayılan ilerleme bildirimi: konsola yazar."""
+    pct = f"[{int(fraction * 100):3d}%] " if fraction is not None else ""
+    print(f"{pct}{message}")
+
+
+# ---------- Sorting helpers for Streamio export ----------
+ROMAN_MAP = {
+    "i": 1, "ii": 2, "iii": 3, "iv": 4, "v": 5, "vi": 6, "vii": 7, "viii": 8, "ix": 9, "x": 10,
+}
+
+def _roman_to_int(s: str) -> int | None:
+    s = (s or "").strip().lower()
+    return ROMAN_MAP.get(s)
+
+_FRANCHISE_WORDS = {"the", "a", "an"}
+
+def _normalize_franchise(title: str) -> str:
+    """Get a coarse franchise/base name from a movie title.
+    Examples:
+      - "The Terminator" -> "terminator"
+      - "Terminator 2: Judgment Day" -> "terminator"
+      - "Back to the Future Part II" -> "back to the future"
+    This is a heuristic; it deliberately keeps it simple.
+    """
+    t = (title or "").lower()
+    # drop leading article
+    parts = t.split()
+    if parts and parts[0] in _FRANCHISE_WORDS and len(parts) > 1:
+        t = " ".join(parts[1:])
+    # keep text before a colon if it looks like a subtitle
+    t = t.split(":")[0]
+    # remove trailing sequel tokens like numbers/roman/"part X"
+    t = re.sub(r"\bpart\s+[ivx]+\b", "", t).strip()
+    t = re.sub(r"\bpart\s+\d+\b", "", t).strip()
+    t = re.sub(r"\b\d+\b", "", t).strip()
+    t = re.sub(r"\s+", " ", t)
+    return t
+
+def _parse_sequel_number(title: str) -> int:
+    """Try to extract sequel ordering number from a title.
+    Returns 0 if not detected (so originals come first).
+    Supports digits and roman numerals after words like 'part' or alone (e.g., 'Terminator 2').
+    """
+    t = (title or "").lower()
+    # "Part II" / "Part 2"
+    m = re.search(r"\bpart\s+([ivx]+|\d+)\b", t)
+    if m:
+        token = m.group(1)
+        if token.isdigit():
+            return int(token)
+        ri = _roman_to_int(token)
+        if ri:
+            return ri
+    # lone digits after the base word: e.g., "Terminator 2"
+    m = re.search(r"\b(\d+)\b", t)
+    if m:
+        try:
+            return int(m.group(1))
+        except Exception:
+            pass
+    # "II", "III" as standalone
+    m = re.search(r"\b([ivx]{1,4})\b", t)
+    if m:
+        ri = _roman_to_int(m.group(1))
+        if ri:
+            return ri
+    return 0
+
+def _compute_franchise_min_year(items: list[dict]) -> dict[str, int]:
+    """Return {base_name: min_year} for bases that have 2+ items in the list.
+    Non-numeric/missing years are ignored.
+    """
+    years_by_base: dict[str, list[int]] = {}
+    for it in items:
+        base = _normalize_franchise(it.get("title", ""))
+        try:
+            y = int(it.get("year") or 0)
+        except Exception:
+            y = 0
+        years_by_base.setdefault(base, []).append(y)
+    return {b: min([y for y in ys if isinstance(y, int)]) for b, ys in years_by_base.items() if len(ys) >= 2}
+
+def sort_media_for_export(items: list[dict], apply_franchise: bool = True) -> list[dict]:
+    """Sort newest->oldest by *group year* (franchise min-year if grouped),
+    then by sequel number (1,2,3…) inside the same franchise, otherwise by CineSelect.
+    """
+    items = list(items or [])
+    base_min_year = _compute_franchise_min_year(items) if apply_franchise else {}
+
+    def keyfn(it: dict):
+        # group year: min franchise year if franchise exists (2+ items), else own year
+        base = _normalize_franchise(it.get("title", ""))
+        try:
+            own_year = int(it.get("year") or 0)
+        except Exception:
+            own_year = 0
+        group_year = base_min_year.get(base, own_year)
+        # sequel number only meaningful if multiple in same base
+        sequel_no = _parse_sequel_number(it.get("title", "")) if base in base_min_year else 0
+        # tie-breaker by CineSelect rating (desc)
+        cs = it.get("cineselectRating") or 0
+        return (-group_year, base, sequel_no, -int(cs))
+
+    return sorted(items, key=keyfn)
+# ---------- /sorting helpers ----------
+
+
+def sort_flat_for_export(items, mode):
+    """Sort a flat media list by selected mode in descending order.
+    mode: 'imdb' | 'cc' | 'year'
+    """
+    def key_fn(it):
+        if mode == "imdb":
+            v = it.get("imdbRating")
+            try:
+                return float(v) if v not in (None, "", "N/A") else -1
+            except Exception:
+                return -1
+        elif mode == "year":
+            try:
+                return int(str(it.get("year", "0")).strip() or 0)
+            except Exception:
+                return 0
+        # default: CineSelect score
+        try:
+            return int(it.get("cineselectRating") or 0)
+        except Exception:
+            return 0
+    return sorted(items or [], key=key_fn, reverse=True)
+
+
+# Dışa aktarım sıralamaları: mod -> fn(items) (katalog parçaları bunlarla üretilir)
+EXPORT_SORTS = {
+    "cc": lambda items: sort_flat_for_export(items, "cc"),
+    "imdb": lambda items: sort_flat_for_export(items, "imdb"),
+    "year": lambda items: sort_flat_for_export(items, "year"),
+    "release": sort_media_for_export,
+}
+
+
+# Firestore sınırları: "in" sorgusu en fazla 30 değer, write batch en fazla 500 işlem
+_IN_QUERY_LIMIT = 30
+_BATCH_WRITE_LIMIT = 400
+# Yardımcı taramalar tüm dokümanı (uzun cast listeleri, poster URL'leri...) değil yalnızca
+# okudukları alanları indirir: Firestore alan maskesi (select)
+_SCAN_FIELDS = ["title", "year", "type", "imdb", "imdb_verified", "tmdb_id", "tmdb_type"]
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _docs_by_imdb(db, imdb_ids):
+    """imdb_id -> [doküman] eşlemesini 30'luk where("imdb", "in", ...) sorgularıyla kurar."""
+    found = {}
+    ids = sorted({i for i in imdb_ids if i})
+    for chunk in _chunks(ids, _IN_QUERY_LIMIT):
+        query = db.collection("favorites").where("imdb", "in", chunk).select(_SCAN_FIELDS)
+        for d in query.stream():
+            found.setdefault((d.to_dict() or {}).get("imdb"), []).append(d)
+    return found
+
+
+def backfill_metadata(limit=20, report=None, restart=False, max_attempts=None):
+    """
+    Firestore'daki favorilerin directors/cast/genres/writers alanlarını doldurur.
+    Önce missing_metadata.csv'deki kayıtları yeniden dener, sonra dokümanları tarar.
+    `report(message, fraction=None, level="info")`: ilerleme bildirimi (arka plan işi / CLI).
+
+    İlerleme iş defterine (ledger.WorkLedger) yazılır: yarıda kalan çalıştırma kaldığı
+    yerden sürer, aynı çalıştırmada işlenmiş kayıtlar atlanır. `limit` her çağrıda
+    işlenecek yeni doküman sayısıdır; tüm dokümanlar bitince çalıştırma kapanır.
+    `restart=True` bitmemiş çalıştırmayı bırakıp baştan başlar.
+
+    missing_metadata.csv kayıtları üstel geri çekilmeyle yeniden denenir: yalnızca zamanı
+    gelenler denenir, `max_attempts` (varsayılan seeds.MAX_ATTEMPTS) başarısızlıktan sonra
+    kayıt park edilir ve bir daha denenmez.
+    """
+    report = report or print_report
+    db = get_firestore()
+    ledger = WorkLedger("backfill")
+    run_id, resumed = ledger.open_run(restart=restart)
+    done = ledger.outcomes()
+    if resumed:
+        report(f"▶️ Backfill {run_id} kaldığı yerden sürüyor ({len(done)} kayıt zaten işlendi)")
+    else:
+        report(f"▶️ Yeni backfill çalıştırması: {run_id}")
+    # Eksik metadata kayıtları bellekte tutulur, çalıştırma sonunda tek seferde yazılır
+    missing = MissingMetaTracker.load(max_attempts=max_attempts)
+
+    # --- Retry from missing_metadata.csv before scanning all docs ---
+    due = missing.retry_candidates()
+    report(f"🔁 Eksik listesi: {len(missing)} kayıt, {len(due)} tanesinin deneme zamanı geldi, "
+           f"{len(missing.parked())} park edilmiş")
+    retry_entries = []
+    for entry in due:
+        retry_key = f"retry:{entry['imdb_id']}"
+        if retry_key in done:
+            # Bu çalıştırmada zaten denendi; sonucu defterden al
+            if done[retry_key][0] == "recovered":
+                missing.discard(entry["imdb_id"])
+            continue
+        retry_entries.append(entry)
+
+    # Eşleşen dokümanlar 30'luk "in" sorgularıyla tek seferde bulunur
+    docs_by_imdb = _docs_by_imdb(db, [e["imdb_id"] for e in retry_entries])
+    recovered = []  # (entry, matches, meta, tmdb_id, tmdb_type)
+    for entry in retry_entries:
+        title, year, imdb_id = entry["title"], entry["year"], entry["imdb_id"]
+        # Doküman varsa saklı TMDB kimliğini kullan (/find turu atlanır)
+        matches = docs_by_imdb.get(imdb_id, [])
+        tmdb_id, tmdb_type = provider_ids_of(matches[0].to_dict() | {"id": matches[0].id}) if matches else (None, None)
+        meta = fetch_metadata(imdb_id, title, year, is_series=(tmdb_type != "movie"), tmdb_id=tmdb_id)
+        if meta and (meta.get("directors") or meta.get("cast") or meta.get("genres") or meta.get("writers")):
+            recovered.append((entry, matches, meta, tmdb_id, tmdb_type))
+        else:
+            missing.record_failure(title, year, imdb_id, REASON_STILL_MISSING, doc_id=entry.get("doc_id"))
+            ledger.record(f"retry:{imdb_id}", "still_missing", REASON_STILL_MISSING)
+
+    # Firestore güncellemeleri toplu yazımlarla (write batch) gönderilir. Aynı IMDb ID birden
+    # çok dokümanda olabildiğinden parçalar kayıt sayısına değil yazım sayısına göre bölünür.
+    writes = []  # (recovered indeksi, doküman, güncelleme)
+    for n, (entry, matches, meta, _, _) in enumerate(recovered):
+        update_data = {
+            "directors": meta.get("directors", []),
+            "cast":      meta.get("cast", []),
+            "genres":    meta.get("genres", []),
+            "writers":   meta.get("writers", []),
+        }
+        writes.extend((n, d, update_data) for d in matches)
+    failed = {}  # recovered indeksi -> hata
+    for chunk in _chunks(writes, _BATCH_WRITE_LIMIT):
+        batch = db.batch()
+        for _, d, update_data in chunk:
+            batch.update(db.collection("favorites").document(d.id), update_data)
+        try:
+            batch.commit()
+        except Exception as e:
+            for n, _, _ in chunk:
+                failed.setdefault(n, e)
+    for n, (entry, matches, meta, tmdb_id, tmdb_type) in enumerate(recovered):
+        title, year, imdb_id = entry["title"], entry["year"], entry["imdb_id"]
+        if n in failed:
+            print(f"⚠️ Failed to update retried {title}: {failed[n]}")
+            missing.record_failure(title, year, imdb_id, REASON_RETRY_FAILED, doc_id=entry.get("doc_id"))
+            ledger.record(f"retry:{imdb_id}", "failed", REASON_RETRY_FAILED)
+            continue
+        append_seed_meta(imdb_id, title, year, meta, tmdb_id=tmdb_id, tmdb_type=tmdb_type)
+        print(f"✅ Missing re-fetched successfully: {title} ({year})")
+        missing.discard(imdb_id)
+        ledger.record(f"retry:{imdb_id}", "recovered")
+    if retry_entries:
+        report(f"🔁 Eksik listesi yeniden denendi: {len(recovered) - len(failed)}/{len(retry_entries)} kurtarıldı")
+
+    # toplamı göstermek için önce topla
+    all_docs = []
+    for type_name, collection in [("movie", "favorites"), ("show", "favorites")]:
+        for d in db.collection(collection).where("type", "==", type_name).select(_SCAN_FIELDS).stream():
+            all_docs.append((type_name, collection, d))
+
+    total = len(all_docs) or 1
+
+    count = 0
+    updated = 0
+    not_updated = []
+
+    # Bu çalıştırmada işlenmiş dokümanları atla
+    remaining = [entry for entry in all_docs if entry[2].id not in done]
+    already = len(all_docs) - len(remaining)
+    docs_to_process = remaining if limit is None else remaining[:limit]
+
+    for idx, (type_name, collection, doc) in enumerate(docs_to_process, start=already + 1):
+        item = doc.to_dict() or {}
+        item.setdefault("id", doc.id)
+        imdb_id = (item.get("imdb") or "").strip()
+        title = item.get("title")
+        year = item.get("year")
+        tmdb_id, tmdb_type = provider_ids_of(item)
+
+        if not imdb_id or imdb_id == "tt0000000":
+            report(f"⏭ Skipped (no imdb): {title} ({year}) [{idx}/{total}]", idx / total)
+            missing.add(title, year, imdb_id, REASON_NO_IMDB, doc_id=doc.id)
+            ledger.record(doc.id, "skipped", REASON_NO_IMDB)
+            count += 1
+            continue
+
+        meta = read_seed_meta(imdb_id)
+        meta_source = "seed"
+        needs_fetch = not meta or not all(meta.get(k) for k in ("directors", "cast", "genres", "writers"))
+        if needs_fetch and missing.waiting(imdb_id, doc.id):
+            # Yeniden deneme takvimi henüz gelmedi (veya park edildi): ağa çıkma
+            entry = missing.get(imdb_id, doc.id) or {}
+            report(f"⏳ Deferred: {title} ({year}) [{idx}/{total}] next={entry.get('next_retry_at')}", idx / total)
+            ledger.record(doc.id, "deferred", entry.get("next_retry_at", ""))
+            count += 1
+            continue
+        # If meta exists but directors, cast, genres, or writers are missing, try to fetch again from OMDb/TMDB
+        if meta and (not meta.get("directors") or not meta.get("cast") or not meta.get("genres") or not meta.get("writers")):
+            new_meta = fetch_metadata(imdb_id, title, year, is_series=(type_name == "show"), tmdb_id=tmdb_id)
+            if new_meta:
+                if not meta.get("directors"):
+                    meta["directors"] = new_meta.get("directors", [])
+                if not meta.get("cast"):
+                    meta["cast"] = new_meta.get("cast", [])
+                if not meta.get("genres"):
+                    meta["genres"] = new_meta.get("genres", [])
+                if not meta.get("writers"):
+                    meta["writers"] = new_meta.get("writers", [])
+                meta_source = "fetch"
+        if not meta:
+            meta = fetch_metadata(imdb_id, title, year, is_series=(type_name == "show"), tmdb_id=tmdb_id)
+            meta_source = "fetch"
+            time.sleep(0.5)
+            # If fetch_metadata returns None (should not anymore), set genres to ["Unknown"]
+            if meta is None:
+                meta = {"directors": [], "cast": [], "genres": ["Unknown"], "writers": []}
+
+        if meta and (meta.get("directors") or meta.get("cast") or meta.get("genres")):
+            # Ensure genres is not empty; if so, set to ["Unknown"]
+            if not meta.get("genres"):
+                meta["genres"] = ["Unknown"]
+            try:
+                update_data = {
+                    "directors": meta.get("directors", []),
+                    "cast":      meta.get("cast", []),
+                    "genres":    meta.get("genres", []),
+                    "writers":   meta.get("writers", []),
+                }
+                db.collection(collection).document(doc.id).update(update_data)
+                append_seed_meta(imdb_id, title, year, meta, tmdb_id=tmdb_id, tmdb_type=tmdb_type)   # ✅ CSV’ye de yaz
+                updated += 1
+                missing.discard(imdb_id, doc.id)
+                report(f"✅ Updated: {title} ({year}) [{idx}/{total}] via {meta_source}", idx / total)
+                ledger.record(doc.id, "updated", meta_source)
+            except Exception as e:
+                not_updated.append(f"{title} ({year})")
+                report(f"⚠️ Failed to update Firestore for {title} ({year}): {e}", idx / total, "warning")
+                missing.record_failure(title, year, imdb_id, REASON_UPDATE_FAILED, doc_id=doc.id)
+                ledger.record(doc.id, "failed", str(e))
+        else:
+            not_updated.append(f"{title} ({year})")
+            report(f"⚠️ No metadata: {title} ({year}) [{idx}/{total}]", idx / total, "warning")
+            missing.record_failure(title, year, imdb_id, REASON_NO_META, doc_id=doc.id)
+            ledger.record(doc.id, "no_meta", REASON_NO_META)
+
+        count += 1
+
+    if updated or recovered:
+        bump_data_version("backfill")
+    finished = len(docs_to_process) == len(remaining)
+    if finished:
+        ledger.finish()
+    report(f"Done. Scanned: {count}, updated: {updated}, not updated: {len(not_updated)}", 1.0, "success")
+    report(
+        f"📒 {run_id}: {already + count}/{len(all_docs)} doküman işlendi"
+        + (" — çalıştırma tamamlandı." if finished else " — kalanlar bir sonraki çağrıda sürecek."),
+        None, "success" if finished else "info",
+    )
+    if not_updated:
+        report(f"⚠️ Güncellenemeyenler: {len(not_updated)}: {', '.join(not_updated)}", None, "warning")
+    missing.flush()
+    report(f"📝 missing_metadata.csv yazıldı ({len(missing)} eksik kayıt, {len(missing.parked())} park edilmiş).",
+           None, "success")
+    return {
+        "run_id": run_id,
+        "scanned": count,
+        "updated": updated,
+        "not_updated": len(not_updated),
+        "missing": len(missing),
+        "parked": len(missing.parked()),
+        "run_finished": finished,
+        "run_summary": ledger.summary(),
+    }
+
+
+def migrate_provider_ids(report=None):
+    """
+    Mevcut favorilere tmdb_id / tmdb_type / doğrulanmış imdb alanlarını ekler,
+    seed_ratings.csv ve seed_meta.csv satırlarına da tmdb_id / tmdb_type yazar.
+    Tekrar çalıştırmak güvenlidir: yalnızca eksik alanlar doldurulur.
+    Dönüş: {"scanned": n, "updated": n, "seed_rows": n}
+    """
+    report = report or print_report
+    db_ = get_firestore()
+    docs = list(db_.collection("favorites").select(_SCAN_FIELDS).stream())
+    ids_by_imdb = {}
+    updated = 0
+    for idx, doc in enumerate(docs, start=1):
+        item = doc.to_dict() or {}
+        item.setdefault("id", doc.id)
+        tmdb_id, tmdb_type = provider_ids_of(item)
+        update = {}
+        if tmdb_id and item.get("tmdb_id") != tmdb_id:
+            update["tmdb_id"] = tmdb_id
+        if tmdb_type and item.get("tmdb_type") != tmdb_type:
+            update["tmdb_type"] = tmdb_type
+        imdb_id = (item.get("imdb") or "").strip()
+        if not item.get("imdb_verified"):
+            if not imdb_id or imdb_id == "tt0000000":
+                imdb_id = get_imdb_id_from_tmdb(item.get("title"), item.get("year"),
+                                                is_series=(tmdb_type == "tv"), tmdb_id=tmdb_id)
+            verified = validate_imdb_id(imdb_id, item.get("title"), item.get("year"))
+            if verified:
+                if verified != item.get("imdb"):
+                    update["imdb"] = verified
+                update["imdb_verified"] = True
+                imdb_id = verified
+        if update:
+            db_.collection("favorites").document(doc.id).update(update)
+            updated += 1
+        if imdb_id and tmdb_id:
+            ids_by_imdb[imdb_id] = (tmdb_id, tmdb_type)
+        report(f"🧬 {item.get('title')} [{idx}/{len(docs)}]", idx / (len(docs) or 1))
+
+    def _fill(row):
+        ids = ids_by_imdb.get((row.get("imdb_id") or "").strip())
+        if ids and not row.get("tmdb_id"):
+            row["tmdb_id"], row["tmdb_type"] = ids
+            return True
+        return False
+
+    if updated:
+        bump_data_version("migrate_provider_ids")
+    seed_rows = rewrite_seed_csv(SEED_PATH, SEED_RATING_FIELDS, _fill)
+    seed_rows += rewrite_seed_csv(SEED_META_PATH, SEED_META_FIELDS, _fill)
+    report(f"✅ Taranan: {len(docs)} | güncellenen doküman: {updated} | seed satırı: {seed_rows}", 1.0, "success")
+    return {"scanned": len(docs), "updated": updated, "seed_rows": seed_rows}
+
+
+def refresh_ratings(limit=None, only_missing=False, report=None):
+    """
+    Favorilerin IMDb/RT puanlarını toplu yeniler (kartlardaki 🔄 IMDb&RT düğmesinin toplu hali).
+    `only_missing=True` yalnızca puanı 0 olanları dener; `limit` işlenecek doküman sayısını sınırlar.
+    Dönüş: {"scanned": n, "updated": n, "failed": n}
+    """
+    report = report or print_report
+    db_ = get_firestore()
+    docs = list(db_.collection("favorites").select(_SCAN_FIELDS + ["imdbRating", "rt"]).stream())
+    if only_missing:
+        docs = [d for d in docs if not (d.to_dict() or {}).get("imdbRating") and not (d.to_dict() or {}).get("rt")]
+    if limit:
+        docs = docs[:limit]
+    updated = failed = 0
+    for idx, doc in enumerate(docs, start=1):
+        fav = doc.to_dict() or {}
+        fav.setdefault("id", doc.id)
+        imdb_id = (fav.get("imdb") or "").strip()
+        title = fav.get("title")
+        year = fav.get("year")
+        tmdb_id, tmdb_type = provider_ids_of(fav)
+        try:
+            if not imdb_id or imdb_id == "tt0000000":
+                imdb_id = get_imdb_id_from_tmdb(title, year, is_series=(fav.get("type") == "show"), tmdb_id=tmdb_id)
+            verified_id = None if fav.get("imdb_verified") and imdb_id == fav.get("imdb") else validate_imdb_id(imdb_id, title, year)
+            imdb_id = verified_id or imdb_id
+            stats, source, _, _ = resolve_ratings(imdb_id, title, year)
+            imdb_rating = float(stats.get("imdb_rating") or 0.0)
+            rt_score = int(stats.get("rt") or 0)
+            refresh_update = {"imdb": imdb_id, "imdbRating": imdb_rating, "rt": rt_score}
+            if tmdb_id:
+                refresh_update["tmdb_id"] = tmdb_id
+                refresh_update["tmdb_type"] = tmdb_type
+            if verified_id:
+                refresh_update["imdb_verified"] = True
+            db_.collection("favorites").document(doc.id).update(refresh_update)
+            append_seed_rating(imdb_id, title, year, imdb_rating, rt_score, tmdb_id=tmdb_id, tmdb_type=tmdb_type)
+            updated += 1
+            report(f"🔄 {title} ({year}) IMDb={imdb_rating} RT={rt_score} via {source} [{idx}/{len(docs)}]",
+                   idx / (len(docs) or 1))
+        except Exception as e:
+            failed += 1
+            report(f"⚠️ {title} ({year}) yenilenemedi: {e}", idx / (len(docs) or 1), "warning")
+    if updated:
+        bump_data_version("refresh_ratings")
+    report(f"✅ Taranan: {len(docs)} | yenilenen: {updated} | hata: {failed}", 1.0, "success")
+    return {"scanned": len(docs), "updated": updated, "failed": failed}
+
+
+def push_favorites_to_github(report=None, publish_shards=False):
+    """Push favorites.json, seed_ratings.csv, seed_meta.csv, and missing_metadata.csv to their respective GitHub repos.
+    - favorites.json  -> serkansu/cineselect-addon
+    - seed_ratings.csv -> serkansu/cineselect-manager-online
+    - seed_meta.csv -> serkansu/cineselect-manager-online
+    - missing_metadata.csv -> serkansu/cineselect-manager-online
+    - publish_shards ise son yayından beri değişen katalog parçaları + manifest -> serkansu/cineselect-addon;
+      artık üretilmeyen parçalar addon deposundan silinir (catalog.pending_publish)
+    Dönüş: {"pushed": [...], "failed": [...], "deleted": [...]}
+    """
+    report = report or print_report
+    pushed, failed, deleted = [], [], []
+    github_token = os.getenv("GITHUB_TOKEN")
+    if not github_token:
+        report("❌ GitHub token bulunamadı. GITHUB_TOKEN environment variable ayarlanmalı.", None, "error")
+        return {"pushed": pushed, "failed": ["GITHUB_TOKEN"], "deleted": deleted}
+
+    # Which file goes to which repo
+    publish_plan = [
+        {"file": "favorites.json", "owner": "serkansu", "repo": "cineselect-addon"},
+        {"file": "seed_ratings.csv", "owner": "serkansu", "repo": "cineselect-manager-online"},
+        {"file": "seed_meta.csv", "owner": "serkansu", "repo": "cineselect-manager-online"},
+        {"file": "missing_metadata.csv", "owner": "serkansu", "repo": "cineselect-manager-online"},
+    ]
+    catalog_plan = pending_publish() if publish_shards else {"upload": {}, "delete": {}}
+    publish_plan += [
+        {"file": Path(path).as_posix(), "owner": "serkansu", "repo": "cineselect-addon"}
+        for path in catalog_plan["upload"]
+    ]
+    delete_plan = [
+        {"file": Path(path).as_posix(), "owner": "serkansu", "repo": "cineselect-addon"}
+        for path in catalog_plan["delete"]
+    ]
+    total = len(publish_plan) + len(delete_plan)
+
+    headers = {
+        "Authorization": f"token {github_token}",
+        "Accept": "application/vnd.github.v3+json",
+    }
+
+    for n, item in enumerate(publish_plan, start=1):
+        file_path = item["file"]
+        repo_owner = item["owner"]
+        repo_name = item["repo"]
+        commit_message = f"Update {file_path} via Streamlit sync"
+        url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/contents/{file_path}"
+
+        # Read file to upload; skip if missing
+        try:
+            with open(file_path, "rb") as f:
+                content = f.read()
+        except FileNotFoundError:
+            report(f"⚠️ Dosya bulunamadı, atlandı: {file_path}", n / total, "warning")
+            continue
+
+        encoded_content = base64.b64encode(content).decode("utf-8")
+
+        # Get current SHA if file exists
+        response = requests.get(url, headers=headers)
+        if response.status_code == 200:
+            sha = response.json().get("sha")
+        elif response.status_code == 404:
+            sha = None
+        else:
+            report(f"❌ GitHub API erişim hatası ({file_path} → {repo_owner}/{repo_name}): {response.status_code} {response.text[:300]}",
+                   n / total, "error")
+            failed.append(file_path)
+            continue
+
+        payload = {
+            "message": commit_message,
+            "content": encoded_content,
+            "branch": "main",
+        }
+        if sha:
+            payload["sha"] = sha
+
+        put_response = requests.put(url, headers=headers, json=payload)
+        if put_response.status_code not in (200, 201):
+            report(f"❌ Push başarısız ({file_path} → {repo_owner}/{repo_name}): {put_response.status_code} {put_response.text[:300]}",
+                   n / total, "error")
+            failed.append(file_path)
+        else:
+            report(f"✅ Push OK: {file_path} → {repo_owner}/{repo_name}", n / total, "success")
+            pushed.append(file_path)
+
+    # Yeni manifest yüklendikten sonra eski parçalar silinir
+    for n, item in enumerate(delete_plan, start=len(publish_plan) + 1):
+        file_path = item["file"]
+        repo_owner = item["owner"]
+        repo_name = item["repo"]
+        url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/contents/{file_path}"
+
+        response = requests.get(url, headers=headers)
+        if response.status_code == 404:
+            deleted.append(file_path)
+            continue
+        if response.status_code != 200:
+            report(f"❌ GitHub API erişim hatası ({file_path} → {repo_owner}/{repo_name}): {response.status_code} {response.text[:300]}",
+                   n / total, "error")
+            failed.append(file_path)
+            continue
+
+        payload = {
+            "message": f"Remove {file_path} via Streamlit sync",
+            "sha": response.json().get("sha"),
+            "branch": "main",
+        }
+        delete_response = requests.delete(url, headers=headers, json=payload)
+        if delete_response.status_code != 200:
+            report(f"❌ Silme başarısız ({file_path} → {repo_owner}/{repo_name}): {delete_response.status_code} {delete_response.text[:300]}",
+                   n / total, "error")
+            failed.append(file_path)
+        else:
+            report(f"🗑 Silindi: {file_path} → {repo_owner}/{repo_name}", n / total, "success")
+            deleted.append(file_path)
+
+    if publish_shards:
+        # Yalnızca başarıyla gönderilen / silinen dosyalar yayın kaydına girer
+        mark_published(
+            {path: digest for path, digest in catalog_plan["upload"].items() if Path(path).as_posix() in pushed},
+            [path for path in catalog_plan["delete"] if Path(path).as_posix() in deleted],
+        )
+    return {"pushed": pushed, "failed": failed, "deleted": deleted}
+
+
+def load_favorites(db=None):
+    """Firestore'dan {"movies": [...], "shows": [...]} olarak tüm favorileri okur."""
+    db = db or get_firestore()
+    return {
+        "movies": [doc.to_dict() for doc in db.collection("favorites").where("type", "==", "movie").stream()],
+        "shows": [doc.to_dict() for doc in db.collection("favorites").where("type", "==", "show").stream()],
+    }
+
+
+# sync ağ aşamalarında aynı anda en fazla bu kadar istek (OMDb/TMDB kotalarını zorlamamak için)
+SYNC_WORKERS = int(os.getenv("CINESELECT_SYNC_WORKERS", "6"))
+
+
+def _run_stage(stats, name, items, fn, report, fraction=None, workers=1):
+    """
+    Bir sync aşamasını çalıştırır: fn(item) her öğeye uygulanır (workers>1 ise sınırlı
+    eşzamanlılıkla). Öğe hatası aşamayı durdurmaz, None döner. Süre ve hız raporlanır.
+    """
+    def safe(item):
+        try:
+            return fn(item)
+        except Exception as e:
+            report(f"⚠️ {name}: {item.get('title') if isinstance(item, dict) else item}: {e}", None, "warning")
+            return None
+
+    t0 = time.perf_counter()
+    if workers > 1 and len(items) > 1:
+        with ThreadPoolExecutor(max_workers=min(workers, len(items)), thread_name_prefix=f"sync-{name}") as pool:
+            results = list(pool.map(safe, items))
+    else:
+        results = [safe(item) for item in items]
+    secs = time.perf_counter() - t0
+    rate = len(items) / secs if secs > 0 else 0.0
+    stats[name] = {"items": len(items), "seconds": round(secs, 3), "per_second": round(rate, 1)}
+    report(f"⏱ {name}: {len(items)} öğe, {secs:.2f} sn ({rate:.1f}/sn)", fraction)
+    return results
+
+
+def sync_with_firebase(sort_mode="cc", report=None, publish=True, publish_shards=False, resolve_placeholders=True):
+    """
+    favorites.json'u ve katalog parçalarını (catalog.py) üretir, seed CSV'lerini ve
+    missing_metadata.csv'yi günceller, `publish` ise hepsini GitHub'a gönderir.
+    `publish_shards` ise son yayından beri değişen katalog parçaları ve manifest de gönderilir.
+    `resolve_placeholders` ise imdb = tt0000000 olan kayıtların ID'si de (sayısal değerler gibi)
+    temizlenip yeniden çözülür; kaç kayıt etkilendiği sonuçta "placeholders_cleared" olarak döner.
+
+    Aşamalar: normalize → eksik ID'leri çöz (eşzamanlı) → puanları çek (eşzamanlı) →
+    seed_ratings.csv'ye toplu ekle → sırala → dışa aktar. Her aşama süresini ve hızını raporlar.
+    """
+    report = report or print_report
+    stats = {}
+    db = get_firestore()
+    # Firestore'dan bir kez okunur; hem favorites.json hem seed_meta/missing listesi bunu kullanır
+    movie_docs = list(db.collection("favorites").where("type", "==", "movie").stream())
+    series_docs = list(db.collection("favorites").where("type", "==", "show").stream())
+    all_docs = movie_docs + series_docs
+    favorites_data = {"movies": [], "shows": []}
+    for section, docs in (("movies", movie_docs), ("shows", series_docs)):
+        for doc in docs:
+            item = doc.to_dict()
+            item.setdefault("id", doc.id)
+            favorites_data[section].append(item)
+    report(f"📥 Firestore: {len(favorites_data['movies'])} film, {len(favorites_data['shows'])} dizi", 0.05)
+
+    # 0) bütünlük taraması: tüm kurallar tek geçişte (missing listesi ve geçersiz ID'ler buradan)
+    t0 = time.perf_counter()
+    integrity = scan_integrity(favorites_data["movies"] + favorites_data["shows"])
+    stats["integrity_scan"] = {"items": integrity.scanned, "seconds": round(time.perf_counter() - t0, 3)}
+    report(f"🩺 Bütünlük: {integrity.summary()['counts']}", 0.08)
+    invalid_imdb = integrity.doc_ids("non_string_imdb")
+    placeholders = integrity.doc_ids("placeholder_imdb") if resolve_placeholders else set()
+    if placeholders:
+        report(f"🔁 {len(placeholders)} kayıtta yer tutucu IMDb ID (tt0000000) temizlenip yeniden çözülecek", 0.09)
+    invalid_imdb |= placeholders
+
+    # 1) normalize: geçersiz imdb değerlerini temizle, type alanını düzelt, eksik ID'leri belirle
+    def normalize(entry):
+        section, item = entry
+        if item.get("id") in invalid_imdb:
+            item["imdb"] = ""  # IMDb puanı / yer tutucu olanları temizle, yeniden çözülsün
+        t = item.get("type", "").lower()
+        if t in ["tv", "tvshow", "show", "series"]:
+            item["type"] = "show"
+        elif t in ["movie", "film"]:
+            item["type"] = "movie"
+        if item.get("imdb"):
+            return None
+        raw_type = item.get("type", "").lower()
+        is_series_by_section = section in ["shows", "series"]
+        is_series_by_type = raw_type in ["series", "tv", "tv_show", "tvshow", "show"]
+        # NOTE: İç tip alanını tutarlı hale getiriyoruz: dizi için 'show', film için 'movie'
+        item["type"] = "show" if (is_series_by_section or is_series_by_type) else "movie"
+        return item
+
+    entries = [(section, item) for section in ("movies", "shows") for item in favorites_data[section]]
+    missing_ids = [it for it in _run_stage(stats, "normalize", entries, normalize, report, 0.1) if it is not None]
+
+    # 2) eksik IMDb ID'lerini çöz (saklı TMDB kimliği varsa arama yapmadan external_ids'ten)
+    def resolve(item):
+        tmdb_id, _ = provider_ids_of(item)
+        imdb_id, tmdb_id, tmdb_type = resolve_provider_ids(
+            item.get("title"), item.get("year"), is_series=(item["type"] == "show"), tmdb_id=tmdb_id
+        )
+        item["imdb"] = imdb_id
+        if tmdb_id:
+            item["tmdb_id"] = tmdb_id
+            item["tmdb_type"] = tmdb_type
+        report(f"🎬 {item.get('title')} ({item.get('year')}) | is_series={item['type'] == 'show'} → IMDb ID: {imdb_id}")
+        return item
+
+    _run_stage(stats, "resolve_ids", missing_ids, resolve, report, 0.25, workers=SYNC_WORKERS)
+
+    # 3) yeni çözülen ID'ler için IMDb ve RT puanlarını çek
+    def ratings(item):
+        stats_ = get_ratings(item.get("imdb"))
+        imdb_rating = stats_.get("imdb_rating") if stats_ else None
+        rt_score = stats_.get("rt") if stats_ else None
+        item["imdbRating"] = float(imdb_rating) if imdb_rating is not None else 0.0
+        item["rt"] = int(rt_score) if rt_score is not None else 0
+        return item
+
+    _run_stage(stats, "fetch_ratings", missing_ids, ratings, report, 0.4, workers=SYNC_WORKERS)
+
+    # 4) seed_ratings.csv içinde her favorinin olduğundan emin ol (tek yazımda; CSV'de zaten varsa eklenmez)
+    def seed_row(entry):
+        _, it = entry
+        _tmdb_id, _tmdb_type = provider_ids_of(it)
+        return {
+            "imdb_id": it.get("imdb"),
+            "title": it.get("title"),
+            "year": it.get("year"),
+            "imdb_rating": it.get("imdbRating"),
+            "rt": it.get("rt"),
+            "tmdb_id": _tmdb_id,
+            "tmdb_type": _tmdb_type,
+        }
+
+    t0 = time.perf_counter()
+    seed_rows = [row for row in _run_stage(stats, "seed_rows", entries, seed_row, report) if row]
+    added = append_seed_ratings(seed_rows)
+    stats["seed_upsert"] = {"items": len(seed_rows), "added": added, "seconds": round(time.perf_counter() - t0, 3)}
+    report(f"⏱ seed_upsert: {len(seed_rows)} satır kontrol edildi, {added} yeni satır eklendi", 0.5)
+
+    # 5) Apply export ordering
+    t0 = time.perf_counter()
+    sorted_movies = sort_flat_for_export(favorites_data.get("movies", []), sort_mode)
+    sorted_series = sort_flat_for_export(favorites_data.get("shows", []), sort_mode)
+    stats["sort"] = {"items": len(entries), "seconds": round(time.perf_counter() - t0, 3)}
+
+    # 6) export
+    t0 = time.perf_counter()
+
+    # Dışarı yazarken anahtar adını 'shows' -> 'series' olarak çevir
+    output_data = {
+        "movies": sorted_movies,
+        "series": sorted_series,
+    }
+    with open("favorites.json", "w", encoding="utf-8") as f:
+        json.dump(output_data, f, ensure_ascii=False, indent=4)
+    report("✅ favorites.json dosyası yerel olarak oluşturuldu.", 0.6, "success")
+
+    # Addon için önceden sayfalanmış katalog parçaları + manifest (yalnızca değişenler yazılır)
+    catalog = write_catalog(output_data, EXPORT_SORTS)
+    report(f"🗂 Katalog: {catalog['shards']} parça, {catalog['written']} yazıldı, {catalog['removed']} silindi", 0.65)
+
+    # --- Overwrite seed_meta.csv and missing_metadata.csv from Firestore ---
+    overwrite_seed_meta(all_docs)
+
+    missing_docs = integrity.missing_metadata_entries()
+    replace_missing_meta(missing_docs)
+    report(f"📝 seed_meta.csv ve missing_metadata.csv yazıldı ({len(missing_docs)} eksik)", 0.8)
+    stats["export"] = {"items": len(all_docs), "seconds": round(time.perf_counter() - t0, 3)}
+    report(f"⏱ sort: {stats['sort']['seconds']:.2f} sn | export: {stats['export']['seconds']:.2f} sn")
+
+    result = {"movies": len(sorted_movies), "series": len(sorted_series), "missing": len(missing_docs),
+              "integrity": integrity.summary(), "placeholders_cleared": len(placeholders), "stages": stats,
+              "catalog": {k: v for k, v in catalog.items() if k not in ("changed", "deleted")}}
+    if publish:
+        # GitHub'a push et (tüm CSV dosyaları dahil)
+        result["publish"] = push_favorites_to_github(report=report, publish_shards=publish_shards)
+        report("✅ favorites.json, seed_ratings.csv, seed_meta.csv ve missing_metadata.csv GitHub'a push edildi.", 1.0, "success")
+    return result
@@ -0,0 +1,56 @@
+# memo.py
+"""
+Sağlayıcı yanıtları için sınırlı, süreli bellek önbelleği (LRU + TTL).
+
+omdb / tmdb son yanıtları kısa süre tutar ki aynı başlık için ardışık çağrılar
+(doğrulama → puan → metadata) ağa tekrar çıkmasın. Süresi dolan kayıtlar yazımda
+temizlenir, kayıt sayısı `maxsize` ile sınırlıdır: toplu yenileme / backfill gibi
+uzun işler bellekte sınırsız birikme yapmaz.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class TTLCache:
+    def __init__(self, maxsize: int = 1024, ttl: float = 600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._data = OrderedDict()  # key -> (saklandığı an, değer); en eski başta
+
+    def get(self, key, default=None):
+        now = time.time()
+        with self._lock:
+            hit = self._data.get(key, _MISSING)
+            if hit is _MISSING:
+                return default
+            if now - hit[0] >= self.ttl:
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return hit[1]
+
+    def set(self, key, value):
+        now = time.time()
+        with self._lock:
+            self._data[key] = (now, value)
+            self._data.move_to_end(key)
+            # En az kullanılanlar baştadır: süresi dolmamış ilk kayda kadar olanlar silinir
+            while self._data:
+                oldest_key, (stored, _) = next(iter(self._data.items()))
+                if now - stored < self.ttl:
+                    break
+                del self._data[oldest_key]
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
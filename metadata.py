@@ -0,0 +1,352 @@
+# metadata.py
+"""
+Başlık metadata'sı, IMDb ID çözümleme/doğrulama ve puan çözümleme.
+
+Streamlit'e bağımlı değildir; arayüz, arka plan işleri ve komut satırı aynı fonksiyonları kullanır.
+"""
+import json
+import os
+import re
+
+from breaker import get_breaker
+from omdb import fetch_ratings, get_ratings
+from seeds import read_seed_rating
+from singleflight import single_flight
+from titles import fetch_title_record, tmdb_media_type
+from tmdb import fetch_details as tmdb_fetch_details
+from validation_cache import get_validation_cache
+
+_tmdb_breaker = get_breaker("tmdb")
+
+
+@single_flight()
+def fetch_metadata(imdb_id, title=None, year=None, is_series=False, existing=None, tmdb_id=None):
+    """
+    OMDb öncelikli, gerekirse TMDB fallback ile metadata getirir.
+    Yalnızca Firestore'daki mevcut (manuel) değerleri BOŞ olan alanları doldurur.
+    `existing`: mevcut Firestore değerleri (dict), varsa.
+    `tmdb_id`: biliniyorsa TMDB /find adımı atlanır (tek detay isteği).
+    Veriler titles.fetch_title_record'dan gelir (OMDb ve TMDB'ye birer istek).
+    """
+    omdb_result = None
+    tmdb_result = None
+    omdb_data = None
+    try:
+        record = fetch_title_record(imdb_id, tmdb_id, tmdb_media_type(is_series) if tmdb_id else None)
+    except Exception as e:
+        print("fetch_metadata title record error:", e)
+        record = {}
+
+    d = record.get("omdb")
+    if d:
+        omdb_data = d
+        # Alan bazında kontrol: "N/A" ise sadece o alanı boş bırak
+        directors = [] if d.get("Director") in (None, "N/A") else [x.strip() for x in (d.get("Director", "")).split(",") if x.strip()]
+        cast = [] if d.get("Actors") in (None, "N/A") else [x.strip() for x in (d.get("Actors", "")).split(",") if x.strip()]
+        genres = [] if d.get("Genre") in (None, "N/A") else [x.strip() for x in (d.get("Genre", "")).split(",") if x.strip()]
+        writers = [] if d.get("Writer") in (None, "N/A") else [x.strip() for x in (d.get("Writer", "")).split(",") if x.strip()]
+        if (not directors) and writers:
+            omdb_result = {
+                "directors": [],
+                "cast": cast,
+                "genres": genres,
+                "writers": writers,
+                "debug_log": "Writers from OMDb (no directors)"
+            }
+        elif directors or cast or genres or writers:
+            omdb_result = {
+                "directors": directors,
+                "cast": cast,
+                "genres": genres,
+                "writers": writers,
+                "debug_log": "Directors from OMDb"
+            }
+    tmdb_result = record.get("tmdb") or None
+
+    # --- Unified merge logic for directors, writers, cast, genres ---
+    def is_empty(val):
+        # Returns True if val is None, empty, or "n/a", "none", "unknown" (case-insensitive)
+        if not val:
+            return True
+        if isinstance(val, str):
+            return str(val).strip().lower() in ["n/a", "none", "unknown", ""]
+        if isinstance(val, (list, tuple, set)):
+            # If all items are empty, the whole field is empty
+            return all(is_empty(v) for v in val)
+        if isinstance(val, dict):
+            # If all values are empty, the dict is empty
+            return all(is_empty(v) for v in val.values())
+        return False
+
+    def merge_field(omdb_val, tmdb_val):
+        """
+        Merge fields from OMDb and TMDb for any of: writers, directors, cast, genres.
+        - If OMDb is empty (None, "", "N/A", "unknown", etc), use TMDb.
+        - If TMDb is empty, use OMDb.
+        - If both are present, merge uniquely (preserving order).
+        - Accepts string, list, or list of dicts (with "name").
+        """
+        IGNORE_VALUES = ("n/a", "unknown", "none", "")
+        def normalize(val):
+            # Accepts str, list of str, list of dicts (with "name"), or None
+            if not val:
+                return []
+            # If it's a dict with "name", treat as one item
+            if isinstance(val, dict):
+                n = val.get("name")
+                if n and str(n).strip().lower() not in IGNORE_VALUES:
+                    return [str(n).strip()]
+                return []
+            if isinstance(val, str):
+                # OMDb: comma or semicolon separated string
+                parts = [p.strip() for p in re.split(r"[;,]", val) if p and p.strip().lower() not in IGNORE_VALUES]
+                return parts
+            if isinstance(val, list):
+                cleaned = []
+                for v in val:
+                    if isinstance(v, dict):
+                        n = v.get("name")
+                        if n and str(n).strip().lower() not in IGNORE_VALUES:
+                            cleaned.append(str(n).strip())
+                    elif isinstance(v, str):
+                        if v.strip().lower() not in IGNORE_VALUES:
+                            cleaned.append(v.strip())
+                return cleaned
+            return []
+
+        omdb_is_empty = is_empty(omdb_val)
+        tmdb_is_empty = is_empty(tmdb_val)
+        omdb_list = normalize(omdb_val)
+        tmdb_list = normalize(tmdb_val)
+        # If OMDb is empty, use TMDb
+        if omdb_is_empty and not tmdb_is_empty:
+            return tmdb_list
+        # If TMDb is empty, use OMDb
+        if tmdb_is_empty and not omdb_is_empty:
+            return omdb_list
+        # If both are empty, return []
+        if omdb_is_empty and tmdb_is_empty:
+            return []
+        # Both are present: merge
+        merged = list(dict.fromkeys(omdb_list + tmdb_list))
+        return merged
+
+    # OMDb/TMDb raw data
+    # omdb_data is already set above, never set to None forcibly anymore
+    tmdb_data = tmdb_result if tmdb_result else {}
+
+    meta = {}
+    # Writers: prefer created_by from TMDb if present, else writers field
+    meta["writers"] = merge_field(
+        omdb_data.get("Writer") if omdb_data else None,
+        tmdb_data.get("created_by") if tmdb_data.get("created_by") else tmdb_data.get("writers")
+    )
+    # Directors: If OMDb is missing or "N/A", fall back to TMDb crew (job == "Director") or created_by.
+    omdb_director_val = omdb_data.get("Director") if omdb_data else None
+    tmdb_director_val = tmdb_data.get("directors")
+    # If OMDb is empty, use created_by for TV, else TMDb directors
+    if is_empty(omdb_director_val):
+        # For TV, prefer created_by if present, else directors
+        tmdb_director_val = tmdb_data.get("created_by") if tmdb_data.get("created_by") else tmdb_data.get("directors")
+    meta["directors"] = merge_field(
+        omdb_director_val,
+        tmdb_director_val
+    )
+    # Cast
+    meta["cast"] = merge_field(
+        omdb_data.get("Actors") if omdb_data else None,
+        tmdb_data.get("cast")
+    )
+    # Genres
+    meta["genres"] = merge_field(
+        omdb_data.get("Genre") if omdb_data else None,
+        tmdb_data.get("genres")
+    )
+    # --- Enhanced debug block: print both raw OMDb/TMDb JSON and merged field sources ---
+    print("==== DEBUG METADATA SOURCES ====")
+    print("OMDb raw:", json.dumps(omdb_data, indent=2, ensure_ascii=False) if omdb_data else None)
+    print("TMDb raw:", json.dumps(tmdb_data, indent=2, ensure_ascii=False) if tmdb_data else None)
+    print("Merged Directors:", meta["directors"])
+    print("Merged Writers:", meta["writers"])
+    print("Merged Cast:", meta["cast"])
+    print("Merged Genres:", meta["genres"])
+    print("==== END DEBUG ====")
+    # --- Debug prints for raw/merged values ---
+    print(f"DEBUG directors: OMDb={omdb_data.get('Director') if omdb_data else None}, TMDb={tmdb_data.get('directors')} → {meta['directors']}")
+    print(f"DEBUG writers: OMDb={omdb_data.get('Writer') if omdb_data else None}, TMDb={tmdb_data.get('created_by') or tmdb_data.get('writers')} → {meta['writers']}")
+    print(f"DEBUG cast: OMDb={omdb_data.get('Actors') if omdb_data else None}, TMDb={tmdb_data.get('cast')} → {meta['cast']}")
+    print(f"DEBUG genres: OMDb={omdb_data.get('Genre') if omdb_data else None}, TMDb={tmdb_data.get('genres')} → {meta['genres']}")
+    # Debug log
+    if omdb_result and omdb_result.get("debug_log"):
+        meta["debug_log"] = omdb_result["debug_log"]
+    elif tmdb_result and tmdb_result.get("debug_log"):
+        meta["debug_log"] = tmdb_result["debug_log"]
+    else:
+        meta["debug_log"] = "No directors/creators found (OMDb+TMDB)"
+
+    # --- Only fill empty fields; keep existing manual values if present ---
+    if existing is not None:
+        result = {}
+        for field in ("directors", "cast", "genres", "writers"):
+            existing_val = existing.get(field)
+
+            def _all_invalid(val_list):
+                return all(
+                    (str(x or "").strip().lower() in ("n/a", "unknown", "none", ""))
+                    for x in val_list
+                )
+
+            is_empty = (
+                not existing_val
+                or (isinstance(existing_val, list) and (len(existing_val) == 0 or _all_invalid(existing_val)))
+            )
+
+            if is_empty:
+                result[field] = meta.get(field, [])
+            else:
+                result[field] = existing_val
+        if "debug_log" in meta:
+            result["debug_log"] = meta["debug_log"]
+        return result
+    else:
+        return meta
+
+
+# OMDb'nin kesin "yok" cevapları. "Request limit reached!", "Invalid API key!" ve HTTP hataları
+# geçicidir; bunlar önbelleğe yazılırsa tek bir kota aşımı geçerli ID'leri günlerce hatalı gösterir.
+_OMDB_NOT_FOUND = ("incorrect imdb id", "not found")
+
+
+def _omdb_not_found(raw) -> bool:
+    if not isinstance(raw, dict) or raw.get("Response") != "False":
+        return False
+    message = (raw.get("Error") or "").lower()
+    return any(marker in message for marker in _OMDB_NOT_FOUND)
+
+
+def validate_imdb_id(imdb_id, title=None, year=None):
+    """
+    IMDb ID'nin OMDb'de geçerli olup olmadığını kontrol eder.
+    Öncelikle doğrulama önbelleğine bakar; taze bir kayıt varsa ağa hiç çıkmaz.
+    Yoksa seed_ratings.csv'yi kontrol eder. Eğer orada geçerli rating varsa imdb_id'yi döndürür.
+    Eğer geçerli değilse, OMDb'den kontrol eder. Eğer OMDb'de geçerli rating varsa imdb_id'yi döndürür.
+    Eğer OMDb'den de alınamazsa, fetch_ratings ile doğru IMDb ID'yi bulmaya çalışır.
+    Doğru ID bulunursa onu döndürür, yoksa None döner.
+    Sonuçlar (geçerli, hatalı ve başlık→ID düzeltmeleri) önbelleğe yazılır.
+    """
+    cache = get_validation_cache()
+    if imdb_id and imdb_id != "tt0000000":
+        status = cache.id_status(imdb_id)
+        if status == "valid":
+            return imdb_id
+        if status is None:
+            # 1. Öncelikle seed_ratings.csv'yi kontrol et
+            seed_stats = read_seed_rating(imdb_id)
+            if seed_stats and (seed_stats.get("imdb_rating") or seed_stats.get("rt")):
+                cache.mark_valid(imdb_id, "seed")
+                return imdb_id
+            # 2. OMDb'de kontrol et
+            stats = get_ratings(imdb_id)
+            if stats and (stats.get("imdb_rating") or stats.get("rt")):
+                cache.mark_valid(imdb_id, "omdb")
+                return imdb_id
+            raw = (stats or {}).get("raw") or {}
+            # Ağ/kota/anahtar hatalarını önbelleğe yazma; sadece OMDb'nin kesin cevabını kaydet
+            if raw.get("Response") == "True" or _omdb_not_found(raw):
+                cache.mark_invalid(imdb_id, raw.get("Error") or "no ratings")
+    # 3. OMDb'den rating alınamadıysa veya imdb_id eksikse, fetch_ratings ile deneriz
+    if title:
+        known, cached_id = cache.title_lookup(title, year)
+        if known:
+            return cached_id
+        ir, rt, raw = fetch_ratings(title, year)
+        # raw dict ise ve imdbID varsa ve başında "tt" ile başlıyorsa
+        if isinstance(raw, dict):
+            new_id = raw.get("imdbID") or raw.get("imdb_id")
+            if new_id and isinstance(new_id, str) and new_id.startswith("tt") and new_id != "tt0000000":
+                cache.mark_title(title, year, new_id, "omdb title")
+                return new_id
+            if _omdb_not_found(raw):
+                cache.mark_title(title, year, "", raw.get("Error"))
+    return None
+
+
+def resolve_provider_ids(title, year=None, is_series=False, tmdb_id=None):
+    """
+    (imdb_id, tmdb_id, tmdb_type) döndürür.
+    TMDB id biliniyorsa arama yapılmaz: tek detay isteğinin external_ids'inden IMDb ID okunur.
+    """
+    tmdb_type = tmdb_media_type(is_series)
+    if not tmdb_id:
+        tmdb_api_key = os.getenv("TMDB_API_KEY")
+        if not tmdb_api_key:
+            print("❌ TMDB API key not found in environment variables.")
+            return "", None, tmdb_type
+
+        search_url = f"https://api.themoviedb.org/3/search/{tmdb_type}"
+        params = {
+            "api_key": tmdb_api_key,
+            "query": title,
+            "year": year if not is_series else None,
+            "first_air_date_year": year if is_series else None,
+        }
+
+        try:
+            response = _tmdb_breaker.get(search_url, params=params)
+        except Exception as e:
+            print("tmdb search error:", e)
+            return "", None, tmdb_type
+        if response.status_code != 200:
+            return "", None, tmdb_type
+
+        results = response.json().get("results", [])
+        if not results:
+            return "", None, tmdb_type
+
+        tmdb_id = results[0]["id"]
+
+    det = tmdb_fetch_details(tmdb_id, tmdb_type) or {}
+    imdb_id = (det.get("external_ids") or {}).get("imdb_id") or det.get("imdb_id") or ""
+    return imdb_id, tmdb_id, tmdb_type
+
+
+def get_imdb_id_from_tmdb(title, year=None, is_series=False, tmdb_id=None):
+    imdb_id, _tmdb_id, _tmdb_type = resolve_provider_ids(title, year, is_series=is_series, tmdb_id=tmdb_id)
+    return imdb_id or ""
+
+
+def resolve_ratings(imdb_id, title, year, record=None):
+    """
+    IMDb/RT puanlarını getirir: ÖNCE yerel CSV, yoksa OMDb-ID, o da yoksa Title/Year.
+    `record`: fetch_title_record çıktısı verilirse OMDb-ID adımı ağa çıkmadan ondan okunur.
+    Dönüş: (stats, source, raw_id, raw_title)
+    """
+    stats = {}
+    raw_id = {}
+    raw_title = {}
+    source = None
+
+    # a) yerel CSV
+    seed_hit = read_seed_rating(imdb_id)
+    if seed_hit and (seed_hit.get("imdb_rating") or seed_hit.get("rt")):
+        stats = {"imdb_rating": seed_hit.get("imdb_rating"), "rt": seed_hit.get("rt")}
+        source = "CSV"
+
+    # b) CSV yoksa/eksikse OMDb by ID
+    if not source:
+        if imdb_id and record is not None and record.get("imdb_id") == imdb_id:
+            raw_id = record.get("omdb_raw") or {}
+            stats = {"imdb_rating": record.get("imdb_rating"), "rt": record.get("rt")}
+            source = "CSV/OMDb-ID" if raw_id else None
+        elif imdb_id:
+            stats = get_ratings(imdb_id) or {}
+            raw_id = (stats.get("raw") or {})
+            source = "CSV/OMDb-ID" if raw_id else None  # get_ratings CSV'den dönerse raw boş kalabilir
+
+    # OMDb-ID fallback: if both ratings are 0, try fetch_ratings by title/year
+    if not stats or (float(stats.get("imdb_rating") or 0) == 0.0 and int(stats.get("rt") or 0) == 0):
+        ir, rt, raw_title = fetch_ratings(title, year)
+        stats = {"imdb_rating": ir, "rt": rt}
+        source = "OMDb-title (auto-fallback)"
+
+    return stats, source, raw_id, raw_title
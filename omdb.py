@@ -1,6 +1,12 @@
 # omdb.py
-import os, csv, requests
-from pathlib import Path
+import os
+
+from breaker import get_breaker
+from memo import TTLCache
+from singleflight import single_flight
+
+# Zaman aşımı ve devre kesici: breaker.py
+_breaker = get_breaker("omdb")
 
 # Ortam değişkenlerinden anahtar okuyan yardımcı (sabit key KULLANMA)
 def _api_key() -> str:
@@ -10,31 +16,74 @@ def _api_key() -> str:
     # yalnızca açıkça tanımlandıysa yedek anahtarı kullan
     return os.getenv("OMDB_FALLBACK", "").strip()
 
-SEED_PATH = Path(__file__).parent / "seed_ratings.csv"
-
 
 def _read_from_seed(imdb_id: str):
     """seed_ratings.csv içinden (imdb_id, imdb_rating, rt) bulmaya çalışır."""
-    if not SEED_PATH.exists():
+    # seeds, dosya değişince yenilenen ortak indeksi tutar; yeni eklenen satırlar hemen görülür
+    from seeds import read_seed_rating
+
+    hit = read_seed_rating(imdb_id)
+    if not hit:
         return None
-    with SEED_PATH.open(newline="", encoding="utf-8") as f:
-        for row in csv.DictReader(f):
-            if row.get("imdb_id") == imdb_id:
-                ir = row.get("imdb_rating")
-                rt = row.get("rt")
-                imdb_rating = float(ir) if ir and ir != "N/A" else None
-                try:
-                    rt_score = int(rt) if rt and rt != "N/A" else None
-                except:
-                    rt_score = None
-                return {"imdb_rating": imdb_rating, "rt": rt_score, "raw": {"source": "csv"}}
-    return None
+    return {"imdb_rating": hit.get("imdb_rating"), "rt": hit.get("rt"), "raw": {"source": "csv"}}
+
 
+# Aynı ID için kısa süre içinde gelen tekrar istekler (doğrulama → puan → metadata)
+# tek bir OMDb çağrısını paylaşsın diye son yanıtlar bellekte tutulur.
+_recent = TTLCache(maxsize=int(os.getenv("CINESELECT_MEMO_SIZE", "2000")), ttl=600)
+
+
+def parse_ratings(data: dict):
+    """OMDb JSON'undan (imdb_rating: float|None, rt: int|None) çıkarır."""
+    ir = data.get("imdbRating")
+    try:
+        imdb_rating = float(ir) if ir and ir != "N/A" else None
+    except ValueError:
+        imdb_rating = None
+    # RT %
+    rt_pct = None
+    for s in data.get("Ratings", []):
+        if s.get("Source") == "Rotten Tomatoes":
+            rt_pct = s.get("Value")
+            break
+    rt = int(rt_pct.strip("%")) if rt_pct and rt_pct.endswith("%") else None
+    return imdb_rating, rt
 
+
+@single_flight(key=lambda imdb_id: (imdb_id or "").strip())
+def fetch_title(imdb_id: str) -> dict:
+    """
+    IMDb ID ile TEK OMDb isteği (tomatoes=true, plot=short).
+    Aynı yanıtta hem puanlar (imdbRating, Ratings) hem künye (Director, Writer, Actors, Genre) gelir.
+    Ham JSON döner; hata durumunda {"error": "..."}.
+    """
+    if not imdb_id:
+        return {"error": "missing imdb_id"}
+    hit = _recent.get(imdb_id)
+    if hit is not None:
+        return hit
+
+    api_key = _api_key()
+    if not api_key:
+        return {"error": "missing OMDB_API_KEY"}
+    try:
+        r = _breaker.get(
+            "https://www.omdbapi.com/",
+            params={"apikey": api_key, "i": imdb_id, "tomatoes": "true", "plot": "short", "r": "json"},
+        )
+        data = r.json()
+    except Exception as e:
+        return {"error": str(e)}
+    if data.get("Response") == "True":
+        _recent.set(imdb_id, data)
+    return data
+
+
+@single_flight(key=lambda imdb_id: (imdb_id or "").strip())
 def get_ratings(imdb_id: str):
     """
     1) seed_ratings.csv içinde varsa oradan döner
-    2) Yoksa OMDb'yi IMDb ID ile çağırır (tomatoes=true)
+    2) Yoksa OMDb'yi IMDb ID ile çağırır (fetch_title, tomatoes=true)
        Dönüşe 'raw' alanında ham OMDb JSON'u iliştirir (debug için).
     """
     if not imdb_id:
@@ -46,31 +95,14 @@ def get_ratings(imdb_id: str):
         return seeded
 
     # 2) OMDb by ID
-    api_key = _api_key()
-    if not api_key:
-        return {"imdb_rating": None, "rt": None, "raw": {"error": "missing OMDB_API_KEY"}}
-
-    try:
-        r = requests.get(
-            "https://www.omdbapi.com/",
-            params={"apikey": api_key, "i": imdb_id, "tomatoes": "true"},
-            timeout=12,
-        )
-        data = r.json()
-        ir = data.get("imdbRating")
-        imdb_rating = float(ir) if ir and ir != "N/A" else None
-        # RT %
-        rt_pct = None
-        for s in data.get("Ratings", []):
-            if s.get("Source") == "Rotten Tomatoes":
-                rt_pct = s.get("Value")
-                break
-        rt = int(rt_pct.strip("%")) if rt_pct and rt_pct.endswith("%") else None
-        return {"imdb_rating": imdb_rating, "rt": rt, "raw": data}
-    except Exception as e:
-        return {"imdb_rating": None, "rt": None, "raw": {"error": str(e)}}
+    data = fetch_title(imdb_id)
+    if "error" in data:
+        return {"imdb_rating": None, "rt": None, "raw": data}
+    imdb_rating, rt = parse_ratings(data)
+    return {"imdb_rating": imdb_rating, "rt": rt, "raw": data}
 
 
+@single_flight(key=lambda title, year: ((title or "").strip().lower(), str(year or "").strip()))
 def fetch_ratings(title: str, year):
     """
     IMDb ID bulunamazsa başlık+yıl ile OMDb'den dener.
@@ -80,20 +112,14 @@ def fetch_ratings(title: str, year):
     if not api_key:
         return 0.0, 0, {"error": "missing OMDB_API_KEY"}
     try:
-        r = requests.get(
+        r = _breaker.get(
             "https://www.omdbapi.com/",
-            params={"apikey": api_key, "t": title, "y": year, "tomatoes": "true"},
-            timeout=12,
+            params={"apikey": api_key, "t": title, "y": year, "tomatoes": "true", "plot": "short"},
         )
         data = r.json()
-        ir = data.get("imdbRating")
-        imdb_rating = float(ir) if ir and ir != "N/A" else None
-        rt_pct = None
-        for s in data.get("Ratings", []):
-            if s.get("Source") == "Rotten Tomatoes":
-                rt_pct = s.get("Value")
-                break
-        rt = int(rt_pct.strip("%")) if rt_pct and rt_pct.endswith("%") else None
+        imdb_rating, rt = parse_ratings(data)
+        if data.get("Response") == "True" and data.get("imdbID"):
+            _recent.set(data["imdbID"], data)
         return imdb_rating or 0.0, rt or 0, data
     except Exception as e:
         return 0.0, 0, {"error": str(e)}
@@ -0,0 +1,502 @@
+# seeds.py
+"""
+seed_ratings.csv / seed_meta.csv / missing_metadata.csv okuma-yazma yardımcıları.
+
+Streamlit'e bağımlı değildir: arka plan işleri ve komut satırı da aynı fonksiyonları kullanır.
+Okumalar, dosya değiştikçe (mtime/boyut) yenilenen bellek içi bir indeksten yapılır.
+"""
+import calendar
+import csv
+import os
+import threading
+import time
+from pathlib import Path
+
+from titles import provider_ids_of
+
+SEED_PATH = Path(__file__).parent / "seed_ratings.csv"
+SEED_META_PATH = Path(__file__).parent / "seed_meta.csv"
+MISSING_META_PATH = Path("missing_metadata.csv")
+
+SEED_RATING_FIELDS = ["imdb_id", "title", "year", "imdb_rating", "rt", "tmdb_id", "tmdb_type"]
+SEED_META_FIELDS = ["imdb_id", "title", "year", "directors", "cast", "genres", "writers", "tmdb_id", "tmdb_type"]
+
+# Aynı süreçteki tüm yazımlar (UI, arka plan işleri) bu kilitle sıralanır
+_write_lock = threading.RLock()
+
+
+class _CsvIndex:
+    """CSV'yi imdb_id -> satır sözlüğüne çevirir; dosya değişince yeniden okur."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._rows = {}
+
+    def _current_stamp(self):
+        try:
+            st_ = self.path.stat()
+            return (st_.st_mtime_ns, st_.st_size)
+        except FileNotFoundError:
+            return None
+
+    def rows(self) -> dict:
+        stamp = self._current_stamp()
+        with self._lock:
+            if stamp != self._stamp:
+                rows = {}
+                if stamp is not None:
+                    with self.path.open(newline="", encoding="utf-8") as f:
+                        for row in csv.DictReader(f):
+                            key = (row.get("imdb_id") or row.get("imdb") or "").strip()
+                            if key and key not in rows:
+                                rows[key] = row
+                self._rows = rows
+                self._stamp = stamp
+            return self._rows
+
+    def get(self, imdb_id):
+        return self.rows().get((imdb_id or "").strip())
+
+
+_ratings_index = _CsvIndex(SEED_PATH)
+_meta_index = _CsvIndex(SEED_META_PATH)
+
+
+def warm_indexes():
+    """Seed CSV indekslerini önceden yükler (ilk okuma maliyeti isteğe yansımasın)."""
+    return {"ratings": len(_ratings_index.rows()), "meta": len(_meta_index.rows())}
+
+
+def _ensure_csv_columns(path: Path, fields: list[str]):
+    """Eski başlıklı CSV'yi (ör. tmdb_id/tmdb_type sütunları yok) yeni başlığa yükseltir."""
+    if not path.exists() or path.stat().st_size == 0:
+        return
+    with path.open(newline="", encoding="utf-8") as f:
+        r = csv.DictReader(f)
+        header = r.fieldnames or []
+        if all(c in header for c in fields):
+            return
+        rows = list(r)
+    with path.open("w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=fields + [c for c in header if c not in fields], extrasaction="ignore")
+        w.writeheader()
+        for row in rows:
+            w.writerow({k: (v if v is not None else "") for k, v in row.items() if k is not None})
+
+
+# --- seed_ratings.csv ---
+def append_seed_rating(imdb_id, title, year, imdb_rating, rt_score, tmdb_id=None, tmdb_type=None):
+    """seed_ratings.csv'ye (yoksa) yeni satır ekler; varsa dokunmaz."""
+    if not imdb_id or imdb_id == "tt0000000":
+        return
+
+    with _write_lock:
+        # Zaten var mı kontrol et
+        if _ratings_index.get(imdb_id) is not None:
+            return  # Aynı imdb_id zaten kayıtlı
+
+        # Başlık yazmak gerekir mi?
+        write_header = not SEED_PATH.exists() or SEED_PATH.stat().st_size == 0
+        _ensure_csv_columns(SEED_PATH, SEED_RATING_FIELDS)
+
+        with SEED_PATH.open("a", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            if write_header:
+                w.writerow(SEED_RATING_FIELDS)
+            w.writerow([
+                imdb_id,
+                title,
+                str(year or ""),
+                (imdb_rating if imdb_rating is not None else ""),
+                (rt_score if rt_score is not None else ""),
+                (tmdb_id or ""),
+                (tmdb_type or ""),
+            ])
+
+
+def append_seed_ratings(rows) -> int:
+    """
+    Birden çok satırı tek dosya açılışıyla ekler (append_seed_rating'in toplu hali).
+    rows: imdb_id/title/year/imdb_rating/rt/tmdb_id/tmdb_type anahtarlı sözlükler.
+    Zaten kayıtlı veya geçersiz ID'ler atlanır; eklenen satır sayısını döndürür.
+    """
+    with _write_lock:
+        known = _ratings_index.rows()
+        fresh, seen = [], set()
+        for row in rows:
+            imdb_id = row.get("imdb_id")
+            if not isinstance(imdb_id, str) or not imdb_id.strip() or imdb_id == "tt0000000":
+                continue
+            imdb_id = imdb_id.strip()
+            if imdb_id in known or imdb_id in seen:
+                continue
+            seen.add(imdb_id)
+            fresh.append([
+                imdb_id,
+                row.get("title"),
+                str(row.get("year") or ""),
+                (row.get("imdb_rating") if row.get("imdb_rating") is not None else ""),
+                (row.get("rt") if row.get("rt") is not None else ""),
+                (row.get("tmdb_id") or ""),
+                (row.get("tmdb_type") or ""),
+            ])
+        if not fresh:
+            return 0
+        write_header = not SEED_PATH.exists() or SEED_PATH.stat().st_size == 0
+        _ensure_csv_columns(SEED_PATH, SEED_RATING_FIELDS)
+        with SEED_PATH.open("a", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            if write_header:
+                w.writerow(SEED_RATING_FIELDS)
+            w.writerows(fresh)
+        return len(fresh)
+
+
+def read_seed_rating(imdb_id: str):
+    """seed_ratings.csv içinden imdb_id ile eşleşen satırı döndürür.
+    {'imdb_rating': float|None, 'rt': int|None} şeklinde veri verir; bulunamazsa None döner.
+    Hem 'imdb_id' hem de 'imdb' sütun adlarını destekler.
+    """
+    try:
+        row = _ratings_index.get(imdb_id)
+        if not row:
+            return None
+        # değerleri temizle
+        ir = row.get("imdb_rating")
+        rt = row.get("rt")
+        try:
+            ir_val = float(ir) if ir not in (None, "", "N/A") else None
+        except Exception:
+            ir_val = None
+        try:
+            rt_val = int(float(rt)) if rt not in (None, "", "N/A") else None
+        except Exception:
+            rt_val = None
+        # If both are missing/invalid/zero, return None so OMDb fallback works
+        imdb_invalid = ir_val in (None, 0, 0.0)
+        rt_invalid = rt_val in (None, 0)
+        # Special case: IMDb rating string "0.0"
+        if isinstance(ir, str) and ir.strip() in ("0", "0.0"):
+            imdb_invalid = True
+        if isinstance(rt, str) and rt.strip() == "0":
+            rt_invalid = True
+        # Also treat "N/A" as invalid (already handled above)
+        if imdb_invalid and rt_invalid:
+            return None
+        return {"imdb_rating": ir_val, "rt": rt_val}
+    except Exception:
+        pass
+    return None
+
+
+# --- seed_meta.csv ---
+def read_seed_meta(imdb_id: str):
+    """
+    seed_meta.csv içinden imdb_id ile eşleşen satırın metadata'sını döndürür.
+    {'directors': [...], 'cast': [...], 'genres': [...]} veya None.
+    """
+    try:
+        row = _meta_index.get(imdb_id)
+        if row:
+            return {
+                "directors": [d.strip() for d in (row.get("directors") or "").split(";") if d.strip()],
+                "cast": [c.strip() for c in (row.get("cast") or "").split(";") if c.strip()],
+                "genres": [g.strip() for g in (row.get("genres") or "").split(";") if g.strip()],
+                "writers": [w.strip() for w in (row.get("writers") or "").split(";") if w.strip()],
+            }
+    except Exception as e:
+        print("read_seed_meta error:", e)
+    return None
+
+
+def overwrite_seed_meta(docs):
+    """seed_meta.csv'yi Firestore'dan tamamen yeniden yazar."""
+    try:
+        with _write_lock, SEED_META_PATH.open("w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(SEED_META_FIELDS)
+            for doc in docs:
+                item = doc.to_dict()
+                imdb_id = item.get("imdb", "")
+                title = item.get("title", "")
+                year = item.get("year", "")
+                directors   = "; ".join(item.get("directors", []))
+                cast        = "; ".join(item.get("cast", []))
+                genres      = "; ".join(item.get("genres", []))
+                writers     = "; ".join(item.get("writers", []))
+                tmdb_id, tmdb_type = provider_ids_of(item)
+                w.writerow([imdb_id, title, year, directors, cast, genres, writers, tmdb_id or "", tmdb_type or ""])
+    except Exception as e:
+        print("overwrite_seed_meta error:", e)
+
+
+def append_seed_meta(imdb_id, title, year, meta, tmdb_id=None, tmdb_type=None):
+    """seed_meta.csv'ye (yoksa) yeni satır ekler; varsa dokunmaz."""
+    if not imdb_id or imdb_id == "tt0000000":
+        return
+    with _write_lock:
+        if _meta_index.get(imdb_id) is not None:
+            return
+        write_header = not SEED_META_PATH.exists() or SEED_META_PATH.stat().st_size == 0
+        _ensure_csv_columns(SEED_META_PATH, SEED_META_FIELDS)
+        with SEED_META_PATH.open("a", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            if write_header:
+                w.writerow(SEED_META_FIELDS)
+            w.writerow([
+                imdb_id,
+                title,
+                str(year or ""),
+                "; ".join(meta.get("directors", [])),
+                "; ".join(meta.get("cast", [])),
+                "; ".join(meta.get("genres", [])),
+                "; ".join(meta.get("writers", [])),
+                (tmdb_id or ""),
+                (tmdb_type or ""),
+            ])
+
+
+def rewrite_seed_csv(path: Path, fields: list[str], update_row):
+    """CSV'yi okuyup her satıra update_row(row) uygular ve geri yazar; değişen satır sayısını döndürür."""
+    with _write_lock:
+        if not path.exists() or path.stat().st_size == 0:
+            return 0
+        _ensure_csv_columns(path, fields)
+        with path.open(newline="", encoding="utf-8") as f:
+            r = csv.DictReader(f)
+            header = r.fieldnames or fields
+            rows = list(r)
+        changed = sum(1 for row in rows if update_row(row))
+        with path.open("w", newline="", encoding="utf-8") as f:
+            w = csv.DictWriter(f, fieldnames=header, extrasaction="ignore")
+            w.writeheader()
+            w.writerows(rows)
+        return changed
+
+
+# --- missing_metadata.csv ---
+MISSING_META_FIELDS = ["title", "year", "imdb_id", "note", "doc_id", "attempts", "last_attempt", "next_retry_at"]
+
+# missing_metadata.csv 'note' sütunundaki neden kodları
+REASON_NO_IMDB = "no imdb id"
+REASON_NO_META = "no meta found"
+REASON_UPDATE_FAILED = "update failed"
+REASON_STILL_MISSING = "still missing"
+REASON_RETRY_FAILED = "retry failed"
+
+# Yeniden deneme takvimi: ilk bekleme RETRY_BASE_HOURS, her başarısızlıkta iki katı
+# (en fazla RETRY_MAX_DAYS). MAX_ATTEMPTS başarısızlıktan sonra kayıt kalıcı olarak park edilir.
+RETRY_BASE_HOURS = float(os.getenv("MISSING_META_RETRY_BASE_HOURS", "6"))
+RETRY_MAX_DAYS = float(os.getenv("MISSING_META_RETRY_MAX_DAYS", "30"))
+MAX_ATTEMPTS = int(os.getenv("MISSING_META_MAX_ATTEMPTS", "6"))
+PARKED = "parked"
+
+_TIME_FMT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+def _format_ts(ts: float) -> str:
+    return time.strftime(_TIME_FMT, time.gmtime(ts))
+
+
+def _parse_ts(value):
+    try:
+        return calendar.timegm(time.strptime((value or "").strip(), _TIME_FMT))
+    except ValueError:
+        return None
+
+
+def retry_delay(attempts: int) -> float:
+    """`attempts` başarısız denemeden sonra beklenecek süre (saniye)."""
+    hours = RETRY_BASE_HOURS * (2 ** max(0, attempts - 1))
+    return min(hours * 3600, RETRY_MAX_DAYS * 24 * 3600)
+
+
+class MissingMetaTracker:
+    """
+    Bir çalıştırma boyunca eksik metadata kayıtlarını bellekte tutar; dosyaya tek seferde yazılır.
+    Yazarken dosya yeniden okunur ve yalnızca bu çalıştırmanın değiştirdiği kayıtlar işlenir,
+    böylece arada çalışan bir sync'in yazdıkları ezilmez.
+    Anahtar geçerli bir imdb_id, yoksa "doc:<doküman id>" olur; aynı başlık iki kez eklenmez.
+    Her kayıt deneme sayısını ve bir sonraki deneme zamanını taşır (üstel geri çekilme).
+    """
+
+    def __init__(self, path: Path = MISSING_META_PATH, max_attempts: int = None):
+        self.path = Path(path)
+        self.max_attempts = max_attempts or MAX_ATTEMPTS
+        self._entries = {}
+        self._touched = {}  # anahtar -> bu çalıştırmadaki son hali (None: silindi)
+
+    def _touch(self, key):
+        self._touched[key] = self._entries.get(key)
+
+    @staticmethod
+    def key_for(imdb_id=None, doc_id=None):
+        imdb_id = imdb_id.strip() if isinstance(imdb_id, str) else ""
+        if imdb_id and imdb_id != "tt0000000":
+            return imdb_id
+        return f"doc:{doc_id}" if doc_id else None
+
+    @classmethod
+    def _read(cls, path: Path) -> dict:
+        entries = {}
+        try:
+            if path.exists():
+                with path.open(newline="", encoding="utf-8") as f:
+                    for row in csv.DictReader(f):
+                        key = cls.key_for(row.get("imdb_id"), row.get("doc_id"))
+                        if key:
+                            entries[key] = {k: (row.get(k) or "").strip() for k in MISSING_META_FIELDS}
+        except Exception as e:
+            print("missing_metadata load error:", e)
+        return entries
+
+    @classmethod
+    def load(cls, path: Path = MISSING_META_PATH, max_attempts: int = None):
+        tracker = cls(path, max_attempts)
+        tracker._entries = cls._read(tracker.path)
+        return tracker
+
+    def add(self, title, year, imdb_id, reason, doc_id=None):
+        """Kaydı ekler/günceller; mevcut deneme takvimi korunur."""
+        key = self.key_for(imdb_id, doc_id)
+        if not key:
+            return None
+        prev = self._entries.get(key) or {}
+        self._entries[key] = {
+            "title": title or prev.get("title", ""),
+            "year": str(year or prev.get("year", "")),
+            "imdb_id": imdb_id.strip() if isinstance(imdb_id, str) else "",
+            "note": reason or "",
+            "doc_id": doc_id or prev.get("doc_id", ""),
+            "attempts": prev.get("attempts", ""),
+            "last_attempt": prev.get("last_attempt", ""),
+            "next_retry_at": prev.get("next_retry_at", ""),
+        }
+        self._touch(key)
+        return key
+
+    def record_failure(self, title, year, imdb_id, reason, doc_id=None, now=None):
+        """Başarısız bir denemeyi işler: sayaç artar, sonraki deneme ertelenir ya da kayıt park edilir."""
+        key = self.add(title, year, imdb_id, reason, doc_id)
+        if not key:
+            return None
+        now = now or time.time()
+        entry = self._entries[key]
+        attempts = self.attempts(entry) + 1
+        entry["attempts"] = str(attempts)
+        entry["last_attempt"] = _format_ts(now)
+        entry["next_retry_at"] = PARKED if attempts >= self.max_attempts else _format_ts(now + retry_delay(attempts))
+        return key
+
+    def discard(self, imdb_id=None, doc_id=None):
+        for key in (self.key_for(imdb_id), self.key_for(None, doc_id)):
+            if key:
+                self._entries.pop(key, None)
+                self._touch(key)
+
+    def retain(self, keys):
+        """Yalnızca verilen anahtarlardaki kayıtları tutar."""
+        keys = set(keys)
+        for key in [k for k in self._entries if k not in keys]:
+            del self._entries[key]
+            self._touch(key)
+
+    @staticmethod
+    def attempts(entry) -> int:
+        try:
+            return int(entry.get("attempts") or 0)
+        except ValueError:
+            return 0
+
+    @staticmethod
+    def is_parked(entry) -> bool:
+        return entry.get("next_retry_at") == PARKED
+
+    def is_due(self, entry, now=None) -> bool:
+        if self.is_parked(entry):
+            return False
+        next_at = _parse_ts(entry.get("next_retry_at"))
+        return next_at is None or next_at <= (now or time.time())
+
+    def waiting(self, imdb_id=None, doc_id=None, now=None) -> bool:
+        """Kayıt var ve henüz zamanı gelmemiş (veya park edilmiş) mi?"""
+        for key in (self.key_for(imdb_id), self.key_for(None, doc_id)):
+            entry = self._entries.get(key) if key else None
+            if entry is not None:
+                return not self.is_due(entry, now)
+        return False
+
+    def get(self, imdb_id=None, doc_id=None):
+        return self._entries.get(self.key_for(imdb_id, doc_id))
+
+    def entries(self):
+        return list(self._entries.values())
+
+    def retry_candidates(self, now=None):
+        """imdb_id'si olan ve yeniden deneme zamanı gelmiş kayıtlar."""
+        now = now or time.time()
+        return [e for k, e in self._entries.items() if not k.startswith("doc:") and self.is_due(e, now)]
+
+    def parked(self):
+        return [e for e in self._entries.values() if self.is_parked(e)]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def flush(self):
+        """
+        Bu çalıştırmanın değişikliklerini dosyaya tek seferde yazar: kilit altında dosyanın güncel
+        hali okunur, yalnızca eklenen / güncellenen / silinen kayıtlar onun üzerine işlenir.
+        """
+        with _write_lock:
+            merged = self._read(self.path)
+            for key, entry in self._touched.items():
+                if entry is None:
+                    merged.pop(key, None)
+                else:
+                    merged[key] = entry
+            with self.path.open("w", newline="", encoding="utf-8") as f:
+                w = csv.DictWriter(f, fieldnames=MISSING_META_FIELDS, extrasaction="ignore")
+                w.writeheader()
+                w.writerows(merged.values())
+            self._entries = merged
+            self._touched = {}
+
+
+def replace_missing_meta(entries):
+    """
+    missing_metadata.csv'yi verilen kayıtlarla değiştirir (title/year/imdb_id/doc_id/note).
+    Listede kalan kayıtların deneme takvimi korunur.
+    """
+    with _write_lock:
+        tracker = MissingMetaTracker.load()
+        keys = []
+        for e in entries:
+            prev = tracker.get(e.get("imdb_id"), e.get("doc_id")) or {}
+            keys.append(tracker.add(e.get("title", ""), e.get("year", ""), e.get("imdb_id", ""),
+                                    e.get("note", "") or prev.get("note", ""), doc_id=e.get("doc_id")))
+        tracker.retain(keys)
+        tracker.flush()
+
+
+def overwrite_missing_meta(docs):
+    """missing_metadata.csv'yi Firestore dokümanlarından tamamen yeniden yazar."""
+    try:
+        entries = []
+        for doc in docs:
+            item = doc.to_dict()
+            entries.append({
+                "title": item.get("title", ""),
+                "year": item.get("year", ""),
+                "imdb_id": item.get("imdb", "") or item.get("imdb_id", ""),
+                "doc_id": doc.id,
+                "note": item.get("note", ""),
+            })
+        replace_missing_meta(entries)
+    except Exception as e:
+        print(f"overwrite_missing_meta error: {e}")
@@ -0,0 +1,175 @@
+# similarity.py
+"""
+"Benzerlerini göster" motoru.
+
+Her favori directors / writers / cast / genres alanlarından seyrek, ağırlıklı bir
+özellik vektörüne dönüşür (ör. aynı yönetmen, aynı türden çok daha belirleyicidir).
+Bir özelliğin ağırlığı yalnızca alanına bağlı olduğu için iki başlığın iç çarpımı,
+paylaştıkları özelliklerin ağırlık karelerinin toplamıdır; bu da ters indeks
+(özellik -> satırlar) üzerinden NumPy ile vektörel hesaplanır.
+
+Komşu listeleri istendiğinde hesaplanıp saklanır ve bir doküman değiştiğinde
+yalnızca onunla özellik paylaşan başlıkların listeleri geçersiz kılınır.
+"""
+import threading
+
+import numpy as np
+
+FIELD_WEIGHTS = {"directors": 3.0, "writers": 2.0, "cast": 1.0, "genres": 0.5}
+DEFAULT_K = 8
+
+
+def _features(item) -> frozenset:
+    return frozenset(
+        (field, name)
+        for field in FIELD_WEIGHTS
+        for name in (item.get(field) or [])
+        if name and name != "Unknown"
+    )
+
+
+class SimilarityIndex:
+    def __init__(self, k: int = DEFAULT_K):
+        self.k = k
+        self._lock = threading.Lock()
+        self._items = []        # satır -> kayıt (silinmişse None)
+        self._free = []         # silinen dokümanlardan boşalan, yeniden kullanılacak satırlar
+        self._features = []     # satır -> frozenset[(alan, ad)]
+        self._row = {}          # doc id -> satır
+        self._postings = {}     # (alan, ad) -> set[satır]
+        self._arrays = {}       # (alan, ad) -> np.ndarray (postings'in önbelleği)
+        self._norms = np.zeros(0, dtype=np.float64)
+        self._neighbours = {}   # satır -> [(satır, skor)]
+
+    # ---- güncelleme ----
+    def _unlink(self, row):
+        affected = set()
+        for f in self._features[row]:
+            rows = self._postings.get(f)
+            if rows is not None:
+                rows.discard(row)
+                affected |= rows
+                self._arrays.pop(f, None)
+                if not rows:
+                    del self._postings[f]
+        return affected
+
+    def _link(self, row, features):
+        affected = set()
+        for f in features:
+            rows = self._postings.setdefault(f, set())
+            affected |= rows
+            rows.add(row)
+            self._arrays.pop(f, None)
+        return affected
+
+    def _invalidate(self, rows):
+        for r in rows:
+            self._neighbours.pop(r, None)
+
+    def _upsert(self, item):
+        doc_id = item.get("id")
+        features = _features(item)
+        row = self._row.get(doc_id)
+        if row is None and self._free:
+            # Boşalan satırı kullan: düzenleme (sil + ekle) dizini büyütmesin
+            row = self._free.pop()
+            self._row[doc_id] = row
+            self._items[row] = item
+            affected = set()
+        elif row is None:
+            row = len(self._items)
+            self._row[doc_id] = row
+            self._items.append(item)
+            self._features.append(frozenset())
+            if row >= len(self._norms):
+                # Kapasiteyi ikiye katlayarak büyüt (her eklemede kopyalamamak için)
+                grown = np.zeros(max(64, 2 * len(self._norms)), dtype=np.float64)
+                grown[: len(self._norms)] = self._norms
+                self._norms = grown
+            affected = set()
+        else:
+            self._items[row] = item
+            if self._features[row] == features:
+                return False
+            affected = self._unlink(row)
+        affected |= self._link(row, features)
+        self._features[row] = features
+        self._norms[row] = np.sqrt(sum(FIELD_WEIGHTS[f[0]] ** 2 for f in features))
+        self._invalidate(affected | {row})
+        return True
+
+    def _remove(self, doc_id):
+        row = self._row.pop(doc_id, None)
+        if row is None:
+            return False
+        affected = self._unlink(row)
+        self._items[row] = None
+        self._features[row] = frozenset()
+        self._norms[row] = 0.0
+        self._invalidate(affected | {row})
+        self._free.append(row)
+        return True
+
+    def sync(self, items) -> dict:
+        """
+        Dizini verilen kayıt listesine eşitler; yalnızca eklenen, özellikleri değişen
+        veya silinen dokümanlar işlenir. Dönüş: {"added", "updated", "removed"}.
+        """
+        with self._lock:
+            items = list(items)
+            seen = {item.get("id") for item in items}
+            # Önce silinenler: boşalan satırları aynı eşitlemede eklenenler kullanır
+            gone = [doc_id for doc_id in self._row if doc_id not in seen]
+            for doc_id in gone:
+                self._remove(doc_id)
+            added = updated = 0
+            for item in items:
+                is_new = item.get("id") not in self._row
+                if self._upsert(item):
+                    if is_new:
+                        added += 1
+                    else:
+                        updated += 1
+            return {"added": added, "updated": updated, "removed": len(gone)}
+
+    # ---- sorgu ----
+    def _posting_array(self, f):
+        arr = self._arrays.get(f)
+        if arr is None:
+            arr = self._arrays[f] = np.fromiter(self._postings[f], dtype=np.int64)
+        return arr
+
+    def _compute(self, row):
+        features = self._features[row]
+        if not features or not self._norms[row]:
+            return []
+        scores = np.zeros(len(self._items), dtype=np.float64)
+        for f in features:
+            scores[self._posting_array(f)] += FIELD_WEIGHTS[f[0]] ** 2
+        scores[row] = 0.0
+        candidates = np.flatnonzero(scores)
+        if not candidates.size:
+            return []
+        cosine = scores[candidates] / (self._norms[row] * self._norms[candidates])
+        top = np.argsort(-cosine, kind="stable")[: self.k]
+        return [(int(candidates[i]), float(cosine[i])) for i in top]
+
+    def neighbours(self, doc_id, k: int = None) -> list:
+        """En benzer favoriler: [(kayıt, kosinüs skoru)], yüksekten düşüğe."""
+        with self._lock:
+            row = self._row.get(doc_id)
+            if row is None:
+                return []
+            cached = self._neighbours.get(row)
+            if cached is None:
+                cached = self._neighbours[row] = self._compute(row)
+            return [(self._items[r], score) for r, score in cached[: k or self.k]]
+
+    def precompute(self) -> int:
+        """Tüm komşu listelerini önceden hesaplar; hesaplanan liste sayısını döndürür."""
+        with self._lock:
+            missing = [row for row in self._row.values() if row not in self._neighbours]
+            for row in missing:
+                self._neighbours[row] = self._compute(row)
+            return len(missing)
@@ -0,0 +1,83 @@
+# singleflight.py
+"""
+Aynı anda gelen özdeş sağlayıcı isteklerini tek çağrıda birleştirir (single-flight).
+
+İki oturum ya da bir backfill ile bir tıklama aynı imdb_id'yi / aynı TMDB aramasını
+aynı anda isterse yalnızca ilki ağa çıkar; diğerleri onun bitmesini bekler ve sonucunu
+(kopyası olarak) paylaşır. Çağrı bitince anahtar silinir: bu bir önbellek değildir,
+yalnızca uçuştaki istekleri birleştirir. Hata da bekleyen herkese iletilir.
+"""
+import copy
+import functools
+import threading
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            # Çağıranlar sonucu değiştirebilir; bekleyenler kendi kopyasını alır
+            return copy.deepcopy(call.result)
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"calls": self.calls, "coalesced": self.coalesced, "in_flight": len(self._calls)}
+
+
+_group = SingleFlight()
+
+
+def single_flight(key=None):
+    """
+    Fonksiyonu süreç genelindeki single-flight grubuna bağlar.
+    `key(*args, **kwargs)` verilmezse anahtar fonksiyon adı + argümanların repr'idir.
+    """
+    def decorator(fn):
+        name = f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            k = key(*args, **kwargs) if key else repr((args, sorted(kwargs.items())))
+            return _group.do((name, k), fn, *args, **kwargs)
+
+        return wrapper
+    return decorator
+
+
+def stats() -> dict:
+    return _group.stats()
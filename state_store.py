@@ -0,0 +1,71 @@
+# state_store.py
+"""
+Uygulamanın küçük kalıcı durum veritabanı (SQLite).
+
+Arka plan işleri tablosu gibi, sunucu süreci yeniden başlasa da korunması gereken
+ve birden çok thread'den yazılan kayıtlar burada tutulur. Her çağrı kendi bağlantısını açar.
+Render'da deploy'lar arasında korunması için CINESELECT_STATE_DB kalıcı bir diske işaret etmelidir.
+"""
+import os
+import sqlite3
+from pathlib import Path
+
+DB_PATH = Path(os.getenv("CINESELECT_STATE_DB") or (Path(__file__).parent / "cineselect_state.sqlite3"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id          TEXT PRIMARY KEY,
+    name        TEXT NOT NULL,
+    params      TEXT,
+    status      TEXT NOT NULL,
+    progress    REAL DEFAULT 0,
+    message     TEXT,
+    log         TEXT,
+    result      TEXT,
+    error       TEXT,
+    owner       TEXT,
+    created_at  REAL,
+    started_at  REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_name_status ON jobs(name, status);
+
+CREATE TABLE IF NOT EXISTS work_runs (
+    run_id      TEXT PRIMARY KEY,
+    task        TEXT NOT NULL,
+    status      TEXT NOT NULL,
+    started_at  REAL,
+    updated_at  REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS work_runs_task_status ON work_runs(task, status);
+
+CREATE TABLE IF NOT EXISTS work_ledger (
+    run_id      TEXT NOT NULL,
+    item_key    TEXT NOT NULL,
+    outcome     TEXT NOT NULL,
+    note        TEXT,
+    updated_at  REAL,
+    PRIMARY KEY (run_id, item_key)
+);
+
+CREATE TABLE IF NOT EXISTS data_version (
+    name        TEXT PRIMARY KEY,
+    version     INTEGER NOT NULL,
+    reason      TEXT,
+    updated_at  REAL
+);
+"""
+
+_initialized = set()
+
+
+def connect() -> sqlite3.Connection:
+    """Satırları dict gibi döndüren, şeması hazır bir bağlantı açar."""
+    conn = sqlite3.connect(DB_PATH, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    if str(DB_PATH) not in _initialized:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        _initialized.add(str(DB_PATH))
+    return conn
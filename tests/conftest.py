@@ -0,0 +1,17 @@
+# tests/conftest.py
+# Modüller depo kökünde düz dosyalar olarak durur; testler onları doğrudan içe aktarır.
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def state_db(tmp_path, monkeypatch):
+    """Her test için boş bir state_store veritabanı."""
+    import state_store
+
+    monkeypatch.setattr(state_store, "DB_PATH", tmp_path / "state.sqlite3")
+    return state_store.DB_PATH
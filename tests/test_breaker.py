@@ -0,0 +1,129 @@
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+
+import breaker
+from breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpen
+
+
+class _Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(time, "time", clock)
+    return clock
+
+
+def _trip(cb):
+    for _ in range(breaker.FAILURE_THRESHOLD):
+        cb._acquire()
+        cb.record_failure("HTTP 503")
+
+
+def test_opens_after_consecutive_failures(clock):
+    cb = CircuitBreaker("test")
+    for _ in range(breaker.FAILURE_THRESHOLD - 1):
+        cb._acquire()
+        cb.record_failure("HTTP 503")
+    assert cb.state == CLOSED
+    cb._acquire()
+    cb.record_failure("HTTP 503")
+    assert cb.state == OPEN
+
+
+def test_success_resets_the_failure_streak(clock):
+    cb = CircuitBreaker("test")
+    for _ in range(breaker.FAILURE_THRESHOLD - 1):
+        cb.record_failure("HTTP 503")
+    cb.record_success(0.1)
+    cb.record_failure("HTTP 503")
+    assert cb.state == CLOSED and cb.consecutive_failures == 1
+
+
+def test_open_circuit_fails_fast(clock, monkeypatch):
+    cb = CircuitBreaker("test")
+    _trip(cb)
+    monkeypatch.setattr(breaker.requests, "get", lambda *a, **k: pytest.fail("ağa çıkılmamalı"))
+    with pytest.raises(CircuitOpen):
+        cb.get("https://example.invalid")
+    assert cb.status()["rejected"] == 1
+
+
+def test_half_open_lets_a_single_probe_through(clock):
+    cb = CircuitBreaker("test")
+    _trip(cb)
+    clock.now += cb.cooldown
+    cb._acquire()
+    assert cb.state == HALF_OPEN
+    with pytest.raises(CircuitOpen):
+        cb._acquire()
+    cb.record_success(0.2)
+    assert cb.state == CLOSED and cb.cooldown == breaker.COOLDOWN
+
+
+def test_failed_probe_doubles_the_cooldown(clock):
+    cb = CircuitBreaker("test")
+    _trip(cb)
+    for expected in (2 * breaker.COOLDOWN, 4 * breaker.COOLDOWN):
+        clock.now += cb.cooldown
+        cb._acquire()
+        cb.record_failure("Timeout")
+        assert cb.state == OPEN and cb.cooldown == min(breaker.MAX_COOLDOWN, expected)
+
+
+def test_cooldown_is_capped():
+    cb = CircuitBreaker("test")
+    cb.state, cb.cooldown = HALF_OPEN, breaker.MAX_COOLDOWN
+    cb.record_failure("Timeout")
+    assert cb.cooldown == breaker.MAX_COOLDOWN
+
+
+def test_timeout_follows_p95_latency():
+    cb = CircuitBreaker("test")
+    assert cb.timeout() == breaker.MAX_TIMEOUT  # yeterli örnek yok
+    latencies = [0.1] * 19 + [0.9]
+    for latency in latencies:
+        cb.record_success(latency)
+    p95 = sorted(latencies)[round(0.95 * (len(latencies) - 1))]
+    expected = max(breaker.MIN_TIMEOUT, min(breaker.MAX_TIMEOUT, p95 * breaker.TIMEOUT_MULTIPLIER))
+    assert cb.timeout() == pytest.approx(expected)
+
+
+def test_timeout_is_clamped():
+    fast, slow = CircuitBreaker("fast"), CircuitBreaker("slow")
+    for _ in range(breaker.MIN_SAMPLES):
+        fast.record_success(0.001)
+        slow.record_success(60.0)
+    assert fast.timeout() == breaker.MIN_TIMEOUT
+    assert slow.timeout() == breaker.MAX_TIMEOUT
+
+
+def test_server_errors_count_as_failures(clock, monkeypatch):
+    class Response:
+        status_code = 503
+
+    cb = CircuitBreaker("test")
+    monkeypatch.setattr(breaker.requests, "get", lambda *a, **k: Response())
+    for _ in range(breaker.FAILURE_THRESHOLD):
+        cb.get("https://example.invalid")
+    assert cb.state == OPEN and cb.last_error == "HTTP 503"
+
+
+def test_not_found_counts_as_success(monkeypatch):
+    class Response:
+        status_code = 404
+
+    cb = CircuitBreaker("test")
+    cb.record_failure("HTTP 503")
+    monkeypatch.setattr(breaker.requests, "get", lambda *a, **k: Response())
+    cb.get("https://example.invalid")
+    assert cb.consecutive_failures == 0
@@ -0,0 +1,135 @@
+import json
+from pathlib import Path
+
+from catalog import (
+    ALL_GENRES, MANIFEST_NAME, build_shards, filter_genre, genre_slug, mark_published, paginate, pending_publish,
+    read_published, write_catalog,
+)
+
+SORTS = {
+    "cc": lambda items: sorted(items, key=lambda it: it.get("cineselectRating") or 0, reverse=True),
+    "year": lambda items: sorted(items, key=lambda it: it.get("year") or 0, reverse=True),
+}
+
+
+def _sections():
+    return {
+        "movies": [
+            {"id": "tt1", "title": "Heat", "year": 1995, "cineselectRating": 300, "genres": ["Crime", "Sci-Fi"]},
+            {"id": "tt2", "title": "Alien", "year": 1979, "cineselectRating": 250, "genres": ["Sci Fi"]},
+            {"id": "tt3", "title": "Ronin", "year": 1998, "cineselectRating": 200, "genres": ["Unknown"]},
+        ],
+        "series": [],
+    }
+
+
+def test_paginate():
+    assert paginate(list(range(5)), 2, 2) == ([2, 3], 3)
+    assert paginate([], 1, 2) == ([], 1)
+
+
+def test_genre_spellings_share_a_slug():
+    assert genre_slug("Sci-Fi") == genre_slug("sci fi") == "genre-sci-fi"
+    assert genre_slug("") == "genre-unknown"
+    titles = [it["title"] for it in filter_genre(_sections()["movies"], "SCI-FI")]
+    assert titles == ["Heat", "Alien"]
+
+
+def test_build_shards_merges_spellings_and_keeps_sort_order():
+    shards, catalogs = build_shards(_sections(), SORTS, page_size=1)
+    movies = catalogs["movies"]
+    assert set(movies) == {ALL_GENRES, "genre-crime", "genre-sci-fi"}
+    assert movies["genre-sci-fi"] == {"genre": "Sci-Fi", "total": 2, "pages": 2}
+    first = json.loads(shards["movies/year/genre-sci-fi/page-1.json"][0])
+    assert [it["title"] for it in first["items"]] == ["Heat"]
+    assert catalogs["series"][ALL_GENRES]["total"] == 0
+
+
+def test_unchanged_catalog_is_not_rewritten(tmp_path):
+    first = write_catalog(_sections(), SORTS, root=tmp_path)
+    assert first["written"] == first["shards"]
+    assert str(tmp_path / MANIFEST_NAME) in first["changed"]
+
+    second = write_catalog(_sections(), SORTS, root=tmp_path)
+    assert second == {"shards": first["shards"], "written": 0, "removed": 0, "changed": [], "deleted": []}
+
+
+def test_only_changed_shards_are_rewritten(tmp_path):
+    write_catalog(_sections(), SORTS, root=tmp_path)
+    sections = _sections()
+    sections["movies"][2]["cineselectRating"] = 100  # Ronin: sıralamada yerini korur, içerik değişir
+    result = write_catalog(sections, SORTS, root=tmp_path)
+    changed = {Path(p).relative_to(tmp_path).as_posix() for p in result["changed"]}
+    assert changed == {"movies/cc/all/page-1.json", "movies/year/all/page-1.json", MANIFEST_NAME}
+
+
+def test_missing_shard_is_restored(tmp_path):
+    write_catalog(_sections(), SORTS, root=tmp_path)
+    (tmp_path / "movies/cc/all/page-1.json").unlink()
+    result = write_catalog(_sections(), SORTS, root=tmp_path)
+    assert result["written"] == 1
+    assert (tmp_path / "movies/cc/all/page-1.json").exists()
+
+
+def test_stale_shards_are_removed(tmp_path):
+    write_catalog(_sections(), SORTS, root=tmp_path)
+    sections = _sections()
+    sections["movies"] = sections["movies"][1:]  # Heat gidince genre-crime parçaları kalmaz
+    result = write_catalog(sections, SORTS, root=tmp_path)
+    assert result["removed"] == 2
+    assert not (tmp_path / "movies/cc/genre-crime/page-1.json").exists()
+    manifest = json.loads((tmp_path / MANIFEST_NAME).read_text(encoding="utf-8"))
+    assert not any("genre-crime" in rel for rel in manifest["shards"])
+
+
+def _rel(paths, root):
+    return [Path(p).relative_to(root).as_posix() for p in paths]
+
+
+def test_everything_is_pending_before_the_first_publish(tmp_path):
+    result = write_catalog(_sections(), SORTS, root=tmp_path)
+    plan = pending_publish(tmp_path)
+    assert len(plan["upload"]) == result["shards"] + 1 and plan["delete"] == {}
+    assert _rel(plan["upload"], tmp_path)[-1] == MANIFEST_NAME  # manifest en sonda
+
+
+def test_local_exports_stay_pending_until_published(tmp_path):
+    write_catalog(_sections(), SORTS, root=tmp_path)
+    mark_published(pending_publish(tmp_path)["upload"], [], root=tmp_path)
+    assert pending_publish(tmp_path) == {"upload": {}, "delete": {}}
+
+    # Yayınsız iki export: ikincisi yerelde hiçbir şey yazmaz ama değişiklik yayın bekler
+    sections = _sections()
+    sections["movies"][2]["cineselectRating"] = 100
+    write_catalog(sections, SORTS, root=tmp_path)
+    assert write_catalog(sections, SORTS, root=tmp_path)["changed"] == []
+    assert sorted(_rel(pending_publish(tmp_path)["upload"], tmp_path)) == [
+        MANIFEST_NAME, "movies/cc/all/page-1.json", "movies/year/all/page-1.json"]
+
+
+def test_removed_shards_are_pending_deletion(tmp_path):
+    write_catalog(_sections(), SORTS, root=tmp_path)
+    mark_published(pending_publish(tmp_path)["upload"], [], root=tmp_path)
+    sections = _sections()
+    sections["movies"] = sections["movies"][1:]
+    result = write_catalog(sections, SORTS, root=tmp_path)
+    plan = pending_publish(tmp_path)
+    assert sorted(_rel(plan["delete"], tmp_path)) == ["movies/cc/genre-crime/page-1.json",
+                                                      "movies/year/genre-crime/page-1.json"]
+    assert sorted(plan["delete"]) == sorted(result["deleted"])
+
+    mark_published(plan["upload"], list(plan["delete"]), root=tmp_path)
+    assert pending_publish(tmp_path) == {"upload": {}, "delete": {}}
+
+
+def test_failed_uploads_stay_pending(tmp_path):
+    write_catalog(_sections(), SORTS, root=tmp_path)
+    plan = pending_publish(tmp_path)
+    manifest = str(tmp_path / MANIFEST_NAME)
+    mark_published({p: d for p, d in plan["upload"].items() if p != manifest}, [], root=tmp_path)
+    assert list(pending_publish(tmp_path)["upload"]) == [manifest]
+    assert MANIFEST_NAME not in read_published(tmp_path)
+
+
+def test_nothing_is_pending_without_a_catalog(tmp_path):
+    assert pending_publish(tmp_path) == {"upload": {}, "delete": {}}
@@ -0,0 +1,60 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("firebase_admin")  # catalog_server -> library -> firebase_setup
+
+import catalog_server
+from favorites_store import Favorite, FavoritesStore, bump_data_version
+
+
+@pytest.fixture
+def server(state_db, monkeypatch):
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return {"movie": [Favorite({"id": f"tt{len(loads)}", "title": "Heat", "type": "movie",
+                                    "year": "1995", "cineselectRating": 300})], "show": []}
+
+    monkeypatch.setattr(catalog_server, "_store", FavoritesStore(loader))
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), catalog_server.CatalogHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _get(url, etag=None):
+    req = urllib.request.Request(url, headers={"If-None-Match": etag} if etag else {})
+    try:
+        with urllib.request.urlopen(req) as r:
+            return r.status, r.headers.get("ETag"), json.loads(r.read() or b"null")
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers.get("ETag"), None
+
+
+def test_etag_names_the_version_the_body_was_built_from(server):
+    status, etag, body = _get(f"{server}/catalog/movies")
+    assert status == 200 and etag.startswith(f'"v{body["version"]}-')
+    assert [it["id"] for it in body["items"]] == ["tt1"]
+
+
+def test_if_none_match_returns_304_until_the_data_changes(server):
+    _, etag, _ = _get(f"{server}/catalog/movies")
+    assert _get(f"{server}/catalog/movies", etag)[0] == 304
+    bump_data_version("test")
+    status, new_etag, body = _get(f"{server}/catalog/movies", etag)
+    assert status == 200 and new_etag != etag
+    assert new_etag.startswith(f'"v{body["version"]}-') and body["items"][0]["id"] == "tt2"
+
+
+def test_bad_requests(server):
+    assert _get(f"{server}/catalog/books")[0] == 404
+    assert _get(f"{server}/catalog/movies?sort=rating")[0] == 400
+    assert _get(f"{server}/catalog/movies?page=x")[0] == 400
@@ -0,0 +1,68 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from columnar import SORT_COLUMNS, ColumnarView
+
+ITEMS = [
+    {"title": "A", "imdbRating": "8.1", "rt": 90, "cineselectRating": 250, "year": "1995",
+     "genres": ["Crime", "Drama"], "directors": ["Michael Mann"]},
+    {"title": "B", "imdbRating": "N/A", "rt": "", "cineselectRating": 250, "year": "1998",
+     "genres": ["Action"], "directors": ["John Frankenheimer"]},
+    {"title": "C", "imdbRating": "8.1", "rt": 95, "cineselectRating": 400, "year": "N/A",
+     "genres": ["Crime"], "directors": ["Michael Mann"]},
+    {"title": "D", "imdbRating": None, "rt": 90, "cineselectRating": None, "year": "1979",
+     "genres": None},
+    {"title": "E", "imdbRating": "7.4", "rt": 60, "cineselectRating": 120, "year": "1995",
+     "genres": ["Drama"]},
+]
+
+
+def _old_sort_key(sort_option):
+    """app.py'deki eski get_sort_key: okunamayan değerler 0 sayılır."""
+    def key(fav):
+        try:
+            if sort_option == "IMDb":
+                return float(fav.get("imdbRating", 0) or 0)
+            if sort_option == "RT":
+                return float(fav.get("rt", 0) or 0)
+            if sort_option == "CineSelect":
+                return fav.get("cineselectRating", 0) or 0
+            if sort_option == "Year":
+                return int(fav.get("year", 0))
+        except (TypeError, ValueError):
+            return 0
+    return key
+
+
+@pytest.mark.parametrize("sort_option", list(SORT_COLUMNS))
+def test_order_matches_stable_descending_sort(sort_option):
+    view = ColumnarView(ITEMS)
+    expected = sorted(ITEMS, key=_old_sort_key(sort_option), reverse=True)
+    assert [it["title"] for it in view.ordered(sort_option)] == [it["title"] for it in expected]
+
+
+def test_unknown_sort_option_falls_back_to_cineselect():
+    view = ColumnarView(ITEMS)
+    assert view.ordered("nope") == view.ordered("CineSelect")
+
+
+def test_range_mask_intersects_filters():
+    view = ColumnarView(ITEMS)
+    mask = view.range_mask(year=(1990, 1999), min_imdb=8.0)
+    assert [it["title"] for it in view.ordered("Year", mask)] == ["A"]
+    assert view.range_mask().all()
+
+
+def test_any_of_keeps_sort_order():
+    view = ColumnarView(ITEMS)
+    mask = view.any_of("genres", ["Crime", "Action"])
+    assert [it["title"] for it in view.ordered("CineSelect", mask)] == ["C", "A", "B"]
+    assert not view.any_of("directors", ["Nobody"]).any()
+
+
+def test_bounds_skip_unknown_values():
+    bounds = ColumnarView(ITEMS).bounds()
+    assert bounds["year"] == (1979, 1998)
+    assert bounds["imdb"] == (7.4, 8.1)
+    assert ColumnarView([]).bounds()["rt"] == (0.0, 100.0)
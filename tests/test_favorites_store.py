@@ -0,0 +1,166 @@
+import threading
+
+import pytest
+
+pytest.importorskip("numpy")  # favorites_store -> columnar / similarity
+
+import favorites_store
+from favorites_store import Favorite, FavoritesStore, bump_data_version, data_version
+
+DOC = {"id": "tt0113277", "title": "Heat", "year": "1995", "type": "movie",
+       "directors": ["Michael Mann"], "writers": None, "debug_log": "x"}
+
+
+def test_missing_null_and_list_fields_behave_like_a_dict():
+    fav = Favorite(DOC)
+    # liste alanı: demet olarak saklanır
+    assert fav.get("directors") == ("Michael Mann",) and fav["directors"] == ("Michael Mann",)
+    assert "directors" in fav
+    # açıkça null: None döner, default değil
+    assert fav.get("writers", "default") is None and fav["writers"] is None
+    assert "writers" in fav
+    # dokümanda yok: default / KeyError
+    assert fav.get("cast", "default") == "default" and fav.get("cast") is None
+    assert "cast" not in fav
+    with pytest.raises(KeyError):
+        fav["cast"]
+
+
+def test_to_dict_round_trips_the_document():
+    assert Favorite(DOC).to_dict() == DOC
+    assert Favorite({"id": "x", "genres": []}).to_dict() == {"id": "x", "genres": []}
+
+
+def test_extra_fields_and_read_only():
+    fav = Favorite(DOC)
+    assert fav.get("debug_log") == "x" and "missing" not in fav
+    with pytest.raises(AttributeError):
+        fav.title = "Ronin"
+
+
+def test_names_are_interned():
+    a = Favorite({"id": "a", "cast": ["".join(["Al ", "Pacino"])]})
+    b = Favorite({"id": "b", "cast": ["".join(["Al ", "Pac", "ino"])]})
+    assert a["cast"][0] is b["cast"][0]
+
+
+class _Loader:
+    """Her yüklemede yeni bir anlık görüntü döndüren sahte Firestore okuyucusu."""
+
+    def __init__(self):
+        self.loads = 0
+
+    def __call__(self):
+        self.loads += 1
+        return {"movie": [Favorite({"id": f"m{self.loads}", "type": "movie", "genres": ["Drama"]})], "show": []}
+
+
+def _bump_from_other_process():
+    """Başka bir sürecin yazımı: SQLite'taki sürüm artar, bu sürecin _local_bumps sayacı değişmez."""
+    import state_store
+
+    conn = state_store.connect()
+    try:
+        conn.execute("INSERT INTO data_version (name, version, reason, updated_at) VALUES ('favorites', 1, '', 0) "
+                     "ON CONFLICT(name) DO UPDATE SET version=version+1")
+    finally:
+        conn.close()
+
+
+def test_snapshot_is_reloaded_only_when_the_version_changes(state_db):
+    loader = _Loader()
+    store = FavoritesStore(loader)
+    first = store.snapshot()
+    assert store.snapshot() is first and loader.loads == 1
+    bump_data_version("test")
+    assert store.snapshot() is not first and loader.loads == 2
+    assert store.version == data_version()
+
+
+def test_other_process_writes_are_seen_after_the_check_interval(state_db, monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(favorites_store.time, "monotonic", lambda: now[0])
+    loader = _Loader()
+    store = FavoritesStore(loader)
+    store.snapshot()
+    _bump_from_other_process()
+    store.snapshot()
+    assert loader.loads == 1  # sürüm bu aralıkta yeniden okunmaz
+    now[0] += favorites_store.VERSION_CHECK_INTERVAL
+    store.snapshot()
+    assert loader.loads == 2
+
+
+def test_derived_values_are_cached_per_version(state_db):
+    store = FavoritesStore(_Loader())
+    builds = []
+
+    def build(snap):
+        builds.append(snap)
+        return [it["id"] for it in snap["movie"]]
+
+    assert store.derived("ids", build) == ["m1"]
+    assert store.derived("ids", build) == ["m1"] and len(builds) == 1
+    bump_data_version("test")
+    assert store.derived("ids", build) == ["m2"]
+    assert store.get("movie", "m2")["id"] == "m2" and store.get("movie", "m1") is None
+
+
+class _HookedLock:
+    """Kilit alınmadan hemen önce bir kez `hook` çalıştırır: iki çağrının araya girdiği anı taklit eder."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hook = None
+
+    def __enter__(self):
+        hook, self.hook = self.hook, None
+        if hook:
+            hook()
+        return self._lock.__enter__()
+
+    def __exit__(self, *exc):
+        return self._lock.__exit__(*exc)
+
+
+def test_reload_just_before_build_does_not_store_a_stale_value(state_db):
+    store = FavoritesStore(_Loader())
+    store.snapshot()
+    store._lock = _HookedLock()
+
+    def reload_elsewhere():
+        bump_data_version("test")
+        other = threading.Thread(target=store.snapshot)
+        other.start()
+        other.join()
+
+    store._lock.hook = reload_elsewhere
+    ids = store.derived("ids", lambda snap: [it["id"] for it in snap["movie"]])
+    assert ids == ["m2"]
+    assert store.derived("ids", lambda snap: pytest.fail("yeniden kurulmamalı")) == ["m2"]
+
+
+def test_stale_version_does_not_roll_back(state_db):
+    loader = _Loader()
+    store = FavoritesStore(loader)
+    bump_data_version("test")
+    current = store.snapshot()
+    with store._lock:
+        assert store._refresh(store.version - 1) is current
+    assert loader.loads == 1
+
+
+def test_similarity_follows_the_snapshot(state_db):
+    store = FavoritesStore(_Loader())
+    assert store.similarity().neighbours("m1") == []
+    bump_data_version("test")
+    store.similarity()
+    assert "m2" in store.similarity()._row and "m1" not in store.similarity()._row
+
+
+def test_derived_with_version_reports_the_built_version(state_db):
+    store = FavoritesStore(_Loader())
+    assert store.derived_with_version("ids", lambda snap: [it["id"] for it in snap["movie"]]) == (["m1"], 0)
+    bump_data_version("test")
+    assert store.current_version() == 1  # kontrol edildi ama henüz yüklenmedi
+    assert store.derived_with_version("ids", lambda snap: [it["id"] for it in snap["movie"]]) == (["m2"], 1)
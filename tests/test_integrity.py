@@ -0,0 +1,73 @@
+from integrity import RULES, scan
+
+FULL = {"directors": ["Michael Mann"], "cast": ["Al Pacino"], "genres": ["Crime"]}
+
+
+def _doc(doc_id, imdb="", **fields):
+    return {"id": doc_id, "title": doc_id.title(), "year": "1995", "type": "movie", "imdb": imdb, **FULL, **fields}
+
+
+def _rules(report, doc_id):
+    return [i["rule"] for i in report.for_doc(doc_id)]
+
+
+def test_clean_document_has_no_issues():
+    report = scan([_doc("heat", "tt0113277")])
+    assert report.issues == [] and report.summary() == {"scanned": 1, "issues": 0, "counts": {}}
+
+
+def test_non_string_imdb_is_not_also_missing():
+    report = scan([_doc("heat", 8.3), _doc("zero", 0)])
+    assert _rules(report, "heat") == ["non_string_imdb"]
+    assert report.for_doc("heat")[0]["detail"] == "imdb=8.3" and report.for_doc("heat")[0]["imdb"] == ""
+    assert _rules(report, "zero") == ["non_string_imdb"]
+
+
+def test_missing_and_placeholder_imdb():
+    report = scan([_doc("none", None), _doc("blank", "  "), _doc("placeholder", "tt0000000")])
+    assert _rules(report, "none") == _rules(report, "blank") == ["missing_imdb"]
+    assert _rules(report, "placeholder") == ["placeholder_imdb"]
+
+
+def test_duplicates_are_reported_on_every_doc():
+    report = scan([_doc("a", "tt1"), _doc("b", " tt1 "), _doc("c", "tt2"), _doc("d", "tt1")])
+    assert report.doc_ids("duplicate_imdb") == {"a", "b", "d"}
+    assert {i["detail"] for i in report.issues} == {"tt1: a, b, d"}
+    assert report.counts()["duplicate_imdb"] == 3
+
+
+def test_placeholders_are_not_duplicates():
+    report = scan([_doc("a", "tt0000000"), _doc("b", "tt0000000")])
+    assert report.doc_ids("duplicate_imdb") == set()
+    assert report.doc_ids("placeholder_imdb") == {"a", "b"}
+
+
+def test_unknown_genres_and_missing_metadata():
+    report = scan([
+        _doc("unknown", "tt1", genres=["Unknown"]),
+        _doc("bare", "tt2", directors=["Unknown"], cast=[], genres=None),
+        _doc("partial", "tt3", cast=None),
+    ])
+    assert _rules(report, "unknown") == ["unknown_genres"]
+    assert report.for_doc("bare")[0]["detail"] == "missing directors, cast, genres"
+    assert report.for_doc("partial")[0]["detail"] == "missing cast"
+    assert set(report.counts()) == set(RULES)
+
+
+def test_missing_metadata_entries_merge_notes_per_doc():
+    report = scan([
+        _doc("both", "tt1", genres=["Unknown"], cast=[]),
+        _doc("noid", None, directors=[]),
+        _doc("dup", "tt1"),
+    ])
+    entries = {e["doc_id"]: e for e in report.missing_metadata_entries()}
+    assert set(entries) == {"both", "noid"}  # yalnızca IMDb kuralları eksik listesine girmez
+    assert entries["both"] == {"title": "Both", "year": "1995", "imdb_id": "tt1", "doc_id": "both",
+                               "note": "genres unknown; missing cast"}
+    assert entries["noid"]["note"] == "missing directors" and entries["noid"]["imdb_id"] == ""
+
+
+def test_summary_counts_only_rules_with_issues():
+    report = scan([_doc("a", ""), _doc("b", "tt0000000", genres=["Unknown"])])
+    assert report.summary() == {"scanned": 2, "issues": 3,
+                                "counts": {"missing_imdb": 1, "placeholder_imdb": 1, "unknown_genres": 1}}
@@ -0,0 +1,149 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import jobs
+from jobs import JobRunner
+
+
+def _wait(runner, job_id, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = runner.get(job_id)
+        if job["status"] not in jobs.ACTIVE:
+            return job
+        time.sleep(0.01)
+    pytest.fail(f"iş bitmedi: {job_id}")
+
+
+def test_concurrent_reports_are_serialised_and_throttled(state_db, monkeypatch):
+    monkeypatch.setattr(jobs, "REPORT_INTERVAL", 60)
+    writes = []
+    real_connect = jobs.connect
+
+    def counting_connect():
+        writes.append(threading.current_thread().name)
+        return real_connect()
+
+    def work(report):
+        with ThreadPoolExecutor(8) as pool:
+            list(pool.map(lambda i: report(f"item {i}", i / 400), range(400)))
+        report("bitti", 1.0, "success")
+        return {"items": 400}
+
+    runner = JobRunner()
+    monkeypatch.setattr(jobs, "connect", counting_connect)
+    job = _wait(runner, runner.submit("pipeline", work))
+    monkeypatch.setattr(jobs, "connect", real_connect)
+
+    assert job["status"] == "succeeded" and job["result"] == {"items": 400}
+    assert job["message"] == "bitti" and job["progress"] == 1.0
+    assert len(job["log"]) == jobs._LOG_LIMIT and job["log"][-1]["msg"] == "bitti"
+    job_writes = [w for w in writes if w.startswith("job-") or w.startswith("ThreadPool")]
+    # running + ilk bildirim + bitiş; öğe başına yazım yok
+    assert len(job_writes) == 3
+
+
+def test_errors_are_written_immediately(state_db, monkeypatch):
+    monkeypatch.setattr(jobs, "REPORT_INTERVAL", 60)
+    seen = threading.Event()
+    release = threading.Event()
+    runner = JobRunner()
+
+    def work(report):
+        report("başladı")
+        report("GitHub token yok", None, "error")
+        seen.set()
+        release.wait(5)
+
+    job_id = runner.submit("publish", work)
+    seen.wait(5)
+    assert runner.get(job_id)["message"] == "GitHub token yok"
+    release.set()
+    _wait(runner, job_id)
+
+
+def _insert_job(job_id, name, owner, status="running"):
+    conn = jobs.connect()
+    try:
+        conn.execute(
+            "INSERT INTO jobs (id, name, params, status, progress, message, owner, created_at) "
+            "VALUES (?, ?, '{}', ?, 0.3, 'Çalışıyor', ?, ?)",
+            (job_id, name, status, owner, time.time()),
+        )
+    finally:
+        conn.close()
+
+
+def _dead_pid():
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    return proc.pid
+
+
+def test_duplicate_job_is_refused_while_the_first_runs(state_db):
+    runner = JobRunner()
+    release = threading.Event()
+    first = runner.submit("sync", lambda report: release.wait(5))
+    with pytest.raises(jobs.JobAlreadyRunning) as err:
+        runner.submit("sync", lambda report: None)
+    assert err.value.job_id == first
+    # Başka isimdeki iş engellenmez
+    _wait(runner, runner.submit("backfill", lambda report: None))
+    release.set()
+    _wait(runner, first)
+    # İlki bitince aynı isim yeniden başlatılabilir
+    assert _wait(runner, runner.submit("sync", lambda report: None))["status"] == "succeeded"
+
+
+def test_succeeded_job_row(state_db):
+    runner = JobRunner()
+
+    def work(report, limit):
+        report("yarı yolda", 0.5)
+        return {"limit": limit}
+
+    job = _wait(runner, runner.submit("backfill", work, limit=3))
+    assert job["status"] == "succeeded" and job["progress"] == 1.0
+    assert job["params"] == {"limit": 3} and job["result"] == {"limit": 3}
+    assert job["finished_at"] >= job["started_at"] and job["error"] is None
+    assert runner.recent(1)[0]["id"] == job["id"] and runner.active() == []
+
+
+def test_failed_job_row(state_db):
+    runner = JobRunner()
+
+    def work(report):
+        report("başladı", 0.2)
+        raise ValueError("kota doldu")
+
+    job = _wait(runner, runner.submit("refresh", work))
+    assert job["status"] == "failed" and job["error"] == "ValueError: kota doldu"
+    assert job["message"] == "❌ kota doldu" and job["progress"] == 0.2
+    assert job["log"][-1] == {**job["log"][-1], "level": "error", "msg": "ValueError: kota doldu"}
+
+
+def test_orphaned_jobs_from_dead_owners_are_recovered(state_db):
+    _insert_job("dead", "sync", f"{_dead_pid()}:abcd1234")
+    _insert_job("restarted", "backfill", f"{os.getpid()}:old00000")  # aynı PID, eski jeton
+    _insert_job("done", "publish", f"{_dead_pid()}:abcd1234", status="succeeded")
+    runner = JobRunner()
+    dead, restarted, done = (runner.get(i) for i in ("dead", "restarted", "done"))
+    assert dead["status"] == restarted["status"] == "interrupted"
+    assert dead["finished_at"] is not None
+    assert done["status"] == "succeeded"
+    # Sahipsiz kayıt artık yeni işi engellemez
+    assert _wait(runner, runner.submit("sync", lambda report: None))["status"] == "succeeded"
+
+
+def test_jobs_of_live_owners_are_left_alone(state_db):
+    _insert_job("other", "sync", f"{os.getppid()}:live0000")
+    runner = JobRunner()
+    assert runner.get("other")["status"] == "running"
+    with pytest.raises(jobs.JobAlreadyRunning):
+        runner.submit("sync", lambda report: None)
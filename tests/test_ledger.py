@@ -0,0 +1,50 @@
+from ledger import WorkLedger
+
+
+def test_new_run_is_opened(state_db):
+    run_id, resumed = WorkLedger("backfill").open_run()
+    assert run_id.startswith("backfill-")
+    assert resumed is False
+
+
+def test_unfinished_run_is_resumed_with_its_outcomes(state_db):
+    first = WorkLedger("backfill")
+    run_id, _ = first.open_run()
+    first.record("doc1", "updated", "seed")
+    first.record("doc2", "skipped", "no imdb id")
+
+    second = WorkLedger("backfill")
+    assert second.open_run() == (run_id, True)
+    assert second.outcomes() == {"doc1": ("updated", "seed"), "doc2": ("skipped", "no imdb id")}
+
+
+def test_recording_twice_upserts(state_db):
+    ledger = WorkLedger("backfill")
+    ledger.open_run()
+    ledger.record("doc1", "no_meta")
+    ledger.record("doc1", "updated")
+    assert ledger.summary() == {"updated": 1}
+
+
+def test_finished_run_is_not_resumed(state_db):
+    ledger = WorkLedger("backfill")
+    run_id, _ = ledger.open_run()
+    ledger.finish()
+    new_id, resumed = WorkLedger("backfill").open_run()
+    assert (new_id != run_id, resumed) == (True, False)
+
+
+def test_restart_abandons_open_run(state_db):
+    ledger = WorkLedger("backfill")
+    run_id, _ = ledger.open_run()
+    ledger.record("doc1", "updated")
+    restarted = WorkLedger("backfill")
+    new_id, resumed = restarted.open_run(restart=True)
+    assert new_id != run_id and resumed is False
+    assert restarted.outcomes() == {}
+
+
+def test_runs_are_per_task(state_db):
+    run_id, _ = WorkLedger("backfill").open_run()
+    other_id, resumed = WorkLedger("refresh").open_run()
+    assert other_id != run_id and resumed is False
@@ -0,0 +1,39 @@
+import time
+
+from memo import TTLCache
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("tt1", {"imdbRating": "8.0"})
+    now[0] += 59
+    assert cache.get("tt1") == {"imdbRating": "8.0"}
+    now[0] += 1
+    assert cache.get("tt1") is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_is_evicted():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+
+
+def test_expired_entries_are_dropped_on_write(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    now[0] += 61
+    cache.set("c", 3)
+    assert len(cache) == 1
+
+
+def test_get_default():
+    assert TTLCache().get("missing", "fallback") == "fallback"
@@ -0,0 +1,79 @@
+import pytest
+
+pytest.importorskip("requests")  # seeds -> titles -> omdb -> breaker
+
+import seeds
+from seeds import PARKED, MissingMetaTracker, retry_delay
+
+HOUR = 3600
+NOW = 1_700_000_000
+
+
+def test_retry_delay_doubles_and_is_capped():
+    base = seeds.RETRY_BASE_HOURS * HOUR
+    assert [retry_delay(n) for n in (1, 2, 3)] == [base, 2 * base, 4 * base]
+    assert retry_delay(50) == seeds.RETRY_MAX_DAYS * 24 * HOUR
+
+
+def test_failure_schedules_the_next_retry(tmp_path):
+    tracker = MissingMetaTracker.load(tmp_path / "missing.csv", max_attempts=3)
+    key = tracker.record_failure("Heat", 1995, "tt0113277", "no metadata", now=NOW)
+    entry = tracker.get("tt0113277")
+    assert key == "tt0113277" and entry["attempts"] == "1"
+    assert tracker.waiting("tt0113277", now=NOW + 1)
+    assert not tracker.waiting("tt0113277", now=NOW + retry_delay(1))
+    assert tracker.retry_candidates(now=NOW + retry_delay(1)) == [entry]
+
+
+def test_entry_is_parked_after_max_attempts(tmp_path):
+    tracker = MissingMetaTracker.load(tmp_path / "missing.csv", max_attempts=3)
+    for i in range(3):
+        tracker.record_failure("Heat", 1995, "tt0113277", "no metadata", now=NOW + i)
+    entry = tracker.get("tt0113277")
+    assert entry["next_retry_at"] == PARKED
+    assert tracker.parked() == [entry]
+    assert tracker.waiting("tt0113277", now=NOW + 10 ** 9)
+    assert tracker.retry_candidates(now=NOW + 10 ** 9) == []
+
+
+def test_add_keeps_the_retry_schedule(tmp_path):
+    tracker = MissingMetaTracker.load(tmp_path / "missing.csv")
+    tracker.record_failure("Heat", 1995, "tt0113277", "no metadata", now=NOW)
+    tracker.add("Heat", 1995, "tt0113277", "still missing")
+    assert tracker.get("tt0113277")["attempts"] == "1"
+    assert tracker.get("tt0113277")["note"] == "still missing"
+
+
+def test_entries_without_imdb_id_are_keyed_by_document(tmp_path):
+    tracker = MissingMetaTracker.load(tmp_path / "missing.csv")
+    assert tracker.add("Heat", 1995, "tt0000000", "no id", doc_id="abc") == "doc:abc"
+    assert tracker.retry_candidates(now=NOW) == []
+    tracker.discard(doc_id="abc")
+    assert len(tracker) == 0
+
+
+def test_schedule_survives_flush_and_load(tmp_path):
+    path = tmp_path / "missing.csv"
+    tracker = MissingMetaTracker.load(path)
+    tracker.record_failure("Heat", 1995, "tt0113277", "no metadata", now=NOW)
+    tracker.flush()
+    assert MissingMetaTracker.load(path).get("tt0113277") == tracker.get("tt0113277")
+
+
+def test_flush_keeps_entries_written_by_another_run(tmp_path):
+    path = tmp_path / "missing.csv"
+    seed = MissingMetaTracker.load(path)
+    seed.add("Heat", 1995, "tt0113277", "no metadata")
+    seed.add("Ronin", 1998, "tt0122690", "no metadata")
+    seed.flush()
+
+    first = MissingMetaTracker.load(path)
+    second = MissingMetaTracker.load(path)
+    first.add("Alien", 1979, "tt0078748", "no metadata")
+    first.flush()
+    second.discard("tt0113277")
+    second.flush()
+
+    merged = MissingMetaTracker.load(path)
+    assert "tt0078748" in merged and "tt0122690" in merged
+    assert "tt0113277" not in merged
@@ -0,0 +1,97 @@
+import pytest
+
+pytest.importorskip("firebase_admin")  # library -> firebase_setup
+
+import library
+from catalog import MANIFEST_NAME, mark_published, pending_publish, write_catalog
+
+
+class _Response:
+    def __init__(self, status_code, payload=None):
+        self.status_code = status_code
+        self._payload = payload or {}
+        self.text = ""
+
+    def json(self):
+        return self._payload
+
+
+class _FakeGitHub:
+    """contents API'sinin yeterli kadarı: repo yolu -> içerik; `fail` içindeki yollara PUT 500 döner."""
+
+    def __init__(self):
+        self.files = {}
+        self.fail = set()
+
+    @staticmethod
+    def _path(url):
+        return url.split("/contents/", 1)[1]
+
+    def get(self, url, headers=None):
+        path = self._path(url)
+        return _Response(200, {"sha": "x"}) if path in self.files else _Response(404)
+
+    def put(self, url, headers=None, json=None):
+        path = self._path(url)
+        if path in self.fail:
+            return _Response(500)
+        self.files[path] = json["content"]
+        return _Response(201)
+
+    def delete(self, url, headers=None, json=None):
+        self.files.pop(self._path(url), None)
+        return _Response(200)
+
+
+SORTS = {"cc": lambda items: list(items)}
+
+
+def _sections(*titles):
+    return {"movies": [{"id": t, "title": t, "genres": [t]} for t in titles], "series": []}
+
+
+@pytest.fixture
+def github(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("GITHUB_TOKEN", "token")
+    fake = _FakeGitHub()
+    monkeypatch.setattr(library.requests, "get", fake.get)
+    monkeypatch.setattr(library.requests, "put", fake.put)
+    monkeypatch.setattr(library.requests, "delete", fake.delete)
+    return fake
+
+
+def _catalog(github):
+    return sorted(p for p in github.files if p.startswith("catalog/"))
+
+
+def test_changes_exported_without_publishing_are_pushed_later(github):
+    write_catalog(_sections("Heat"), SORTS)
+    library.push_favorites_to_github(report=lambda *a: None)  # yalnızca CSV / favorites.json
+    assert _catalog(github) == []
+    result = library.push_favorites_to_github(report=lambda *a: None, publish_shards=True)
+    assert _catalog(github) == ["catalog/manifest.json", "catalog/movies/cc/all/page-1.json",
+                                "catalog/movies/cc/genre-heat/page-1.json", "catalog/series/cc/all/page-1.json"]
+    assert result["failed"] == [] and pending_publish() == {"upload": {}, "delete": {}}
+
+
+def test_removed_shards_are_deleted_from_the_addon_repo(github):
+    write_catalog(_sections("Heat"), SORTS)
+    library.push_favorites_to_github(report=lambda *a: None, publish_shards=True)
+    write_catalog(_sections("Alien"), SORTS)
+    write_catalog(_sections("Alien"), SORTS)  # ikinci export yerelde hiçbir şey değiştirmez
+    result = library.push_favorites_to_github(report=lambda *a: None, publish_shards=True)
+    assert result["deleted"] == ["catalog/movies/cc/genre-heat/page-1.json"]
+    assert _catalog(github) == ["catalog/manifest.json", "catalog/movies/cc/all/page-1.json",
+                                "catalog/movies/cc/genre-alien/page-1.json", "catalog/series/cc/all/page-1.json"]
+
+
+def test_failed_pushes_are_retried(github):
+    write_catalog(_sections("Heat"), SORTS)
+    github.fail = {f"catalog/{MANIFEST_NAME}"}
+    result = library.push_favorites_to_github(report=lambda *a: None, publish_shards=True)
+    assert result["failed"] == [f"catalog/{MANIFEST_NAME}"]
+    assert list(pending_publish()["upload"]) == [f"catalog/{MANIFEST_NAME}"]
+    github.fail = set()
+    library.push_favorites_to_github(report=lambda *a: None, publish_shards=True)
+    assert pending_publish() == {"upload": {}, "delete": {}}
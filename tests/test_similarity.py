@@ -0,0 +1,67 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from similarity import SimilarityIndex
+
+HEAT = {"id": "heat", "directors": ["Michael Mann"], "cast": ["Al Pacino", "Robert De Niro"], "genres": ["Crime"]}
+COLLATERAL = {"id": "collateral", "directors": ["Michael Mann"], "cast": ["Tom Cruise"], "genres": ["Crime"]}
+RONIN = {"id": "ronin", "directors": ["John Frankenheimer"], "cast": ["Robert De Niro"], "genres": ["Action"]}
+ALIEN = {"id": "alien", "directors": ["Ridley Scott"], "cast": ["Sigourney Weaver"], "genres": ["Horror"]}
+
+
+def _ids(neighbours):
+    return [item["id"] for item, _ in neighbours]
+
+
+def test_neighbours_are_ranked_by_shared_features():
+    index = SimilarityIndex()
+    assert index.sync([HEAT, COLLATERAL, RONIN, ALIEN]) == {"added": 4, "updated": 0, "removed": 0}
+    neighbours = index.neighbours("heat")
+    assert _ids(neighbours) == ["collateral", "ronin"]
+    assert neighbours[0][1] > neighbours[1][1]
+    assert index.neighbours("alien") == []
+    assert index.neighbours("unknown") == []
+
+
+def test_unchanged_items_are_not_reprocessed():
+    index = SimilarityIndex()
+    index.sync([HEAT, COLLATERAL])
+    assert index.sync([HEAT, dict(COLLATERAL)]) == {"added": 0, "updated": 0, "removed": 0}
+
+
+def test_update_invalidates_cached_neighbours():
+    index = SimilarityIndex()
+    index.sync([HEAT, COLLATERAL, ALIEN])
+    assert _ids(index.neighbours("alien")) == []
+    alien = dict(ALIEN, directors=["Michael Mann"])
+    assert index.sync([HEAT, COLLATERAL, alien])["updated"] == 1
+    assert "alien" in _ids(index.neighbours("heat"))
+    assert _ids(index.neighbours("alien")) == ["collateral", "heat"]
+
+
+def test_removed_items_disappear_from_neighbours():
+    index = SimilarityIndex()
+    index.sync([HEAT, COLLATERAL, RONIN])
+    index.precompute()
+    assert index.sync([HEAT, RONIN]) == {"added": 0, "updated": 0, "removed": 1}
+    assert _ids(index.neighbours("heat")) == ["ronin"]
+    assert index.neighbours("collateral") == []
+
+
+def test_freed_rows_are_reused():
+    index = SimilarityIndex()
+    index.sync([HEAT, COLLATERAL, RONIN])
+    for _ in range(5):
+        index.sync([HEAT, RONIN])
+        index.sync([HEAT, COLLATERAL, RONIN])
+    # Silinip yeniden eklenen doküman boşalan satırı kullanır; dizin büyümez
+    assert len(index._items) == 3
+    assert _ids(index.neighbours("heat")) == ["collateral", "ronin"]
+
+
+def test_k_limits_the_result():
+    index = SimilarityIndex(k=2)
+    index.sync([HEAT, COLLATERAL, RONIN])
+    assert len(index.neighbours("heat")) == 2
+    assert _ids(index.neighbours("heat", k=1)) == ["collateral"]
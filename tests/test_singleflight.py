@@ -0,0 +1,91 @@
+import threading
+
+import pytest
+
+from singleflight import SingleFlight
+
+
+def _run_concurrently(group, key, fn, n):
+    results, errors = [None] * n, [None] * n
+
+    def worker(i):
+        try:
+            results[i] = group.do(key, fn)
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    return threads, results, errors
+
+
+def test_concurrent_calls_share_one_execution():
+    group = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return {"title": "Heat"}
+
+    threads, results, errors = _run_concurrently(group, "tt0113277", fetch, 5)
+    while group.stats()["coalesced"] < 4:
+        threading.Event().wait(0.01)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert results == [{"title": "Heat"}] * 5 and errors == [None] * 5
+    assert group.stats() == {"calls": 1, "coalesced": 4, "in_flight": 0}
+
+
+def test_waiters_get_their_own_copy():
+    group = SingleFlight()
+    release = threading.Event()
+    shared = {"genres": ["Crime"]}
+
+    def fetch():
+        release.wait(5)
+        return shared
+
+    threads, results, _ = _run_concurrently(group, "k", fetch, 3)
+    while group.stats()["coalesced"] < 2:
+        threading.Event().wait(0.01)
+    release.set()
+    for t in threads:
+        t.join()
+
+    copies = [r for r in results if r is not shared]
+    assert len(copies) == 2 and all(r == shared for r in results)
+
+
+def test_error_reaches_every_waiter():
+    group = SingleFlight()
+    release = threading.Event()
+
+    def fetch():
+        release.wait(5)
+        raise ValueError("rate limited")
+
+    threads, results, errors = _run_concurrently(group, "k", fetch, 3)
+    while group.stats()["coalesced"] < 2:
+        threading.Event().wait(0.01)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert all(isinstance(e, ValueError) for e in errors)
+    assert group.stats()["in_flight"] == 0
+
+
+def test_key_is_released_after_the_call():
+    group = SingleFlight()
+    counter = iter(range(10))
+    assert group.do("k", lambda: next(counter)) == 0
+    assert group.do("k", lambda: next(counter)) == 1
+    with pytest.raises(KeyError):
+        group.do("k", lambda: {}["missing"])
+    assert group.stats() == {"calls": 3, "coalesced": 0, "in_flight": 0}
@@ -0,0 +1,51 @@
+import time
+
+import pytest
+
+from validation_cache import TTL, ValidationCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ValidationCache(tmp_path / "cache.csv")
+
+
+def test_unknown_id_has_no_status(cache):
+    assert cache.id_status("tt0111161") is None
+
+
+def test_valid_and_invalid_marks(cache):
+    cache.mark_valid("tt0111161", "omdb")
+    cache.mark_invalid("tt9999999", "Incorrect IMDb ID.")
+    assert cache.id_status("tt0111161") == "valid"
+    assert cache.id_status("tt9999999") == "invalid"
+
+
+def test_latest_mark_wins(cache):
+    cache.mark_invalid("tt0111161")
+    cache.mark_valid("tt0111161")
+    assert cache.id_status("tt0111161") == "valid"
+
+
+def test_entries_expire_after_their_ttl(cache, monkeypatch):
+    cache.mark_invalid("tt9999999")
+    cache.mark_valid("tt0111161")
+    later = time.time() + TTL["invalid"] + 1
+    monkeypatch.setattr(time, "time", lambda: later)
+    # Olumsuz kayıtlar daha kısa yaşar
+    assert cache.id_status("tt9999999") is None
+    assert cache.id_status("tt0111161") == "valid"
+
+
+def test_title_lookup_distinguishes_not_found_from_unknown(cache):
+    assert cache.title_lookup("Heat", 1995) == (False, None)
+    cache.mark_title("Heat", 1995, "tt0113277")
+    cache.mark_title("Nope", 2001, "")
+    assert cache.title_lookup("heat ", "1995") == (True, "tt0113277")
+    assert cache.title_lookup("Nope", 2001) == (True, None)
+
+
+def test_entries_survive_reload(tmp_path):
+    path = tmp_path / "cache.csv"
+    ValidationCache(path).mark_valid("tt0111161")
+    assert ValidationCache(path).id_status("tt0111161") == "valid"
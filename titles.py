@@ -0,0 +1,151 @@
+# titles.py
+"""
+Tek bir başlık için OMDb ve TMDB'den birleşik, normalize edilmiş kayıt.
+
+  - OMDb: TEK istek (omdb.fetch_title) → puanlar + künye
+  - TMDB: TMDB id biliniyorsa TEK detay isteği (credits + external_ids);
+          bilinmiyorsa önce /find ile çözülür.
+
+Puan yolu (resolve_ratings) ve metadata yolu (fetch_metadata) aynı kaydı kullanır.
+"""
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import omdb
+import tmdb
+
+_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="title-record")
+
+
+def parse_tmdb_doc_id(doc_id):
+    """'tmdb603' -> 603; uymuyorsa None."""
+    m = re.fullmatch(r"tmdb(\d+)", str(doc_id or "").strip())
+    return int(m.group(1)) if m else None
+
+
+def tmdb_media_type(is_series: bool) -> str:
+    return "tv" if is_series else "movie"
+
+
+def provider_ids_of(item: dict):
+    """
+    Favori dokümanındaki TMDB kimliği: (tmdb_id:int|None, tmdb_type:"movie"|"tv"|None).
+    Saklanmış tmdb_id/tmdb_type alanları öncelikli; yoksa 'tmdb{N}' doküman ID'si ve 'type' alanı.
+    """
+    tmdb_id = item.get("tmdb_id") or parse_tmdb_doc_id(item.get("id"))
+    try:
+        tmdb_id = int(tmdb_id) if tmdb_id else None
+    except (TypeError, ValueError):
+        tmdb_id = None
+    tmdb_type = item.get("tmdb_type")
+    if tmdb_type not in ("movie", "tv"):
+        t = (item.get("type") or "").lower()
+        tmdb_type = "tv" if t in ("show", "tv", "series", "tvshow", "tv_show") else ("movie" if t else None)
+    return tmdb_id, tmdb_type
+
+
+def parse_tmdb_details(det: dict, search_type: str) -> dict:
+    """TMDB detay JSON'undan directors/writers/cast/genres/created_by + debug_log çıkarır."""
+    genres = [g.get("name") for g in det.get("genres", []) if g.get("name")]
+    directors = [c.get("name") for c in det.get("credits", {}).get("crew", []) if c.get("job") == "Director" and c.get("name")]
+    writers = [c.get("name") for c in det.get("credits", {}).get("crew", []) if c.get("job") == "Writer" and c.get("name")]
+    creators = []
+    debug_extra = None
+    if search_type == "tv":
+        if "created_by" in det:
+            if det.get("created_by"):
+                creators = [c.get("name") for c in det.get("created_by", []) if c.get("name")]
+                if not creators:
+                    debug_extra = "created_by field present but empty"
+                else:
+                    debug_extra = f"Creators found: {', '.join(creators)}"
+            else:
+                debug_extra = "created_by field present but empty"
+        else:
+            debug_extra = "created_by field missing from TMDB response"
+    if creators:
+        writers.extend([c for c in creators if c not in writers])
+    orig_directors = list(directors)
+    orig_creators = list(creators)
+    debug_log = ""
+    if search_type == "tv":
+        if orig_directors and orig_creators:
+            debug_log = f"Directors from TMDB crew; Creators from TMDB created_by ({', '.join(orig_creators)})"
+        elif orig_directors and not orig_creators:
+            debug_log = "Directors found in TMDB crew"
+        elif orig_creators and not orig_directors:
+            debug_log = f"Creators only from TMDB created_by ({', '.join(orig_creators)})"
+        else:
+            debug_log = "No directors/creators found in TMDB"
+    else:
+        if orig_directors:
+            debug_log = "Directors found in TMDB crew"
+        else:
+            debug_log = "No directors found in TMDB"
+    if debug_extra:
+        debug_log = debug_log + " | " + debug_extra if debug_log else debug_extra
+    cast = [c for c in det.get("credits", {}).get("cast", [])][:8]
+    if not genres:
+        genres = ["Unknown"]
+    result = {
+        "directors": directors if directors else [],
+        "cast": cast,
+        "genres": genres,
+        "writers": writers,
+        "debug_log": debug_log,
+        "created_by": det.get("created_by", []),
+    }
+    if det.get("created_by"):
+        for c in det["created_by"]:
+            n = c.get("name")
+            if n and n not in result["writers"]:
+                result["writers"].append(n)
+    return result
+
+
+def fetch_title_record(imdb_id=None, tmdb_id=None, tmdb_type=None) -> dict:
+    """
+    Birleşik başlık kaydı döndürür:
+      {
+        "imdb_id", "tmdb_id", "tmdb_type",
+        "imdb_rating", "rt",          # OMDb puanları (yoksa None)
+        "omdb": dict|None,            # ham OMDb JSON (Response=True ise)
+        "omdb_raw": dict,             # ham OMDb JSON (hata dahil, teşhis için)
+        "tmdb": dict,                 # parse_tmdb_details çıktısı (yoksa {})
+      }
+    İki ID de biliniyorsa OMDb ve TMDB istekleri paralel atılır.
+    """
+    imdb_id = (imdb_id or "").strip()
+    if imdb_id == "tt0000000":
+        imdb_id = ""
+    tmdb_type = "tv" if tmdb_type in ("tv", "show", "series") else ("movie" if tmdb_type else None)
+
+    det = None
+    omdb_raw = {}
+    if tmdb_id and tmdb_type and imdb_id:
+        omdb_future = _pool.submit(omdb.fetch_title, imdb_id)
+        det = tmdb.fetch_details(tmdb_id, tmdb_type)
+        omdb_raw = omdb_future.result()
+    else:
+        if not tmdb_id and imdb_id:
+            tmdb_id, tmdb_type = tmdb.find_by_imdb(imdb_id)
+        if tmdb_id and tmdb_type:
+            det = tmdb.fetch_details(tmdb_id, tmdb_type)
+        if not imdb_id and det:
+            # IMDb ID eksikse TMDB external_ids'ten al
+            imdb_id = ((det.get("external_ids") or {}).get("imdb_id") or det.get("imdb_id") or "").strip()
+        if imdb_id:
+            omdb_raw = omdb.fetch_title(imdb_id)
+
+    omdb_data = omdb_raw if omdb_raw.get("Response") == "True" else None
+    imdb_rating, rt = omdb.parse_ratings(omdb_data) if omdb_data else (None, None)
+    return {
+        "imdb_id": imdb_id,
+        "tmdb_id": tmdb_id,
+        "tmdb_type": tmdb_type,
+        "imdb_rating": imdb_rating,
+        "rt": rt,
+        "omdb": omdb_data,
+        "omdb_raw": omdb_raw,
+        "tmdb": parse_tmdb_details(det, tmdb_type) if det else {},
+    }
@@ -1,85 +1,244 @@
 import os
 import json
-import requests
+
+from breaker import get_breaker
+from memo import TTLCache
+from singleflight import single_flight
 
 API_KEY = os.getenv("TMDB_API_KEY")  # Render ya da lokal .env'den gelir
 BASE_URL = "https://api.themoviedb.org/3"
 POSTER_BASE = "https://image.tmdb.org/t/p/w500"
 
+# Zaman aşımı ve devre kesici: breaker.py
+_breaker = get_breaker("tmdb")
+
+# Aynı başlık için ardışık detay çağrıları (ID çözümleme → metadata) tek isteği paylaşır.
+# Kişi filmografileri (combined_credits) de kişi ID'si başına aynı süreyle saklanır.
+_RECENT_TTL = 600
+_recent_details = TTLCache(maxsize=int(os.getenv("CINESELECT_MEMO_SIZE", "2000")), ttl=_RECENT_TTL)
+_recent_credits = TTLCache(maxsize=int(os.getenv("CINESELECT_MEMO_SIZE", "2000")), ttl=_RECENT_TTL)
+
 
 def _poster_url(path: str | None) -> str:
     return f"{POSTER_BASE}{path}" if path else ""
 
 
-def search_movie(query: str):
-    """TMDB'de film ara (id = tmdb{number}). IMDb/RT puanı eklemiyoruz; sonradan alınacak."""
-    if not API_KEY:
+def _card(item: dict, media_type: str | None = None) -> dict:
+    """TMDB arama / kredi sonucunu arama kartına çevirir (id = tmdb{number})."""
+    card = {
+        "id": f"tmdb{item.get('id')}",             # <- TMDB id'si
+        "title": item.get("title") or item.get("name") or "",
+        "year": (item.get("release_date") or item.get("first_air_date") or "")[:4] or "N/A",
+        "poster": _poster_url(item.get("poster_path")),
+        "description": item.get("overview", ""),
+        "imdb": "",                                 # puanlar sonradan CSV/OMDb ile
+        "rt": 0
+    }
+    if media_type:
+        card["media_type"] = media_type             # "movie" | "tv"
+    return card
+
+
+@single_flight(key=lambda kind, query, page=1: (kind, (query or "").strip().lower(), page))
+def search_page(kind: str, query: str, page: int = 1):
+    """
+    TMDB /search/{kind} isteğinin TEK sayfası. kind: "movie" | "tv" | "person".
+    Dönüş: (ham sonuçlar, toplam sayfa); hata/anahtar yoksa ([], 0).
+    """
+    if not API_KEY or not query:
+        return [], 0
+    try:
+        res = _breaker.get(f"{BASE_URL}/search/{kind}",
+                           params={"api_key": API_KEY, "query": query, "page": page}).json()
+    except Exception as e:
+        print(f"tmdb search_{kind} error:", e)
+        return [], 0
+    return res.get("results", []), int(res.get("total_pages") or 0)
+
+
+def iter_search(kind: str, query: str):
+    """
+    Arama sonuçlarını sayfa sayfa, istendikçe üretir: (kartlar, devamı var mı).
+    Sonraki sayfa yalnızca üreteç ilerletildiğinde istenir.
+    """
+    page = 1
+    while True:
+        results, total_pages = search_page(kind, query, page)
+        has_more = page < total_pages
+        yield [_card(item) for item in results], has_more
+        if not has_more:
+            return
+        page += 1
+
+
+@single_flight()
+def person_credits(person_id):
+    """
+    Kişinin oyuncu olarak tüm film/dizi kredileri (/person/{id}/combined_credits), popülerliğe göre
+    sıralı kartlar. Aynı kişi için sonuç _RECENT_TTL boyunca bellekten döner.
+    """
+    if not API_KEY or not person_id:
+        return []
+    hit = _recent_credits.get(person_id)
+    if hit is not None:
+        return hit
+    try:
+        r = _breaker.get(f"{BASE_URL}/person/{person_id}/combined_credits", params={"api_key": API_KEY})
+        if r.status_code != 200:
+            return []
+        cast = r.json().get("cast", [])
+    except Exception as e:
+        print("tmdb person_credits error:", e)
         return []
-    url = f"{BASE_URL}/search/movie"
-    res = requests.get(url, params={"api_key": API_KEY, "query": query}).json()
-
-    results = []
-    for item in res.get("results", []):
-        results.append({
-            "id": f"tmdb{item.get('id')}",             # <- TMDB id'si
-            "title": item.get("title") or "",
-            "year": (item.get("release_date") or "")[:4] or "N/A",
-            "poster": _poster_url(item.get("poster_path")),
-            "description": item.get("overview", ""),
-            "imdb": "",                                 # puanlar sonradan CSV/OMDb ile
-            "rt": 0
-        })
-    return results
+    seen = set()
+    cards = []
+    for work in sorted(cast, key=lambda w: w.get("popularity") or 0, reverse=True):
+        media_type = work.get("media_type")
+        if media_type not in ("movie", "tv") or (media_type, work.get("id")) in seen:
+            continue
+        seen.add((media_type, work.get("id")))
+        cards.append(_card(work, media_type))
+    _recent_credits.set(person_id, cards)
+    return cards
+
+
+ACTOR_PAGE_SIZE = 20
+
+
+def iter_actor_credits(actor_name: str, page_size: int = ACTOR_PAGE_SIZE):
+    """
+    Oyuncu aramasının sonuçlarını akış halinde üretir: (kartlar, devamı var mı).
+    Eşleşen kişiler sırayla gezilir; bir kişinin filmografisi yalnızca ona sıra gelince çekilir
+    ve page_size'lık parçalar halinde verilir. Aynı yapım birden çok kişide geçse de bir kez çıkar.
+    """
+    people = [p.get("id") for p in search_page("person", actor_name, 1)[0] if p.get("id")]
+    seen = set()
+    buffer = []
+    for i, person_id in enumerate(people):
+        for card in person_credits(person_id):
+            key = (card.get("media_type"), card["id"])
+            if key not in seen:
+                seen.add(key)
+                buffer.append(dict(card))  # saklanan listeyi çağıranlar değiştirmesin
+        last_person = i == len(people) - 1
+        while len(buffer) >= page_size or (last_person and buffer):
+            chunk, buffer = buffer[:page_size], buffer[page_size:]
+            yield chunk, bool(buffer) or not last_person
+    if not people:
+        yield [], False
+
+
+class SearchPager:
+    """
+    iter_search / iter_actor_credits üzerinde "daha fazla yükle" sayfalayıcısı.
+    Yüklenen sonuçlar `results` listesinde birikir; yeni sayfa yalnızca load_more() ile istenir.
+    """
+
+    def __init__(self, pages):
+        self._pages = pages
+        self._seen = set()
+        self.results = []
+        self.has_more = True
+
+    def load_more(self) -> list:
+        if not self.has_more:
+            return []
+        try:
+            batch, self.has_more = next(self._pages)
+        except StopIteration:
+            self.has_more = False
+            return []
+        # Sayfalar arasında kayan sonuçlar iki kez gösterilmesin
+        fresh = [it for it in batch if (it.get("media_type"), it["id"]) not in self._seen]
+        self._seen.update((it.get("media_type"), it["id"]) for it in fresh)
+        self.results.extend(fresh)
+        return fresh
+
+
+def movie_pager(query: str) -> SearchPager:
+    return SearchPager(iter_search("movie", query))
+
+
+def tv_pager(query: str) -> SearchPager:
+    return SearchPager(iter_search("tv", query))
+
+
+def actor_pager(actor_name: str) -> SearchPager:
+    return SearchPager(iter_actor_credits(actor_name))
+
+
+def search_movie(query: str):
+    """TMDB'de film ara, yalnızca ilk sayfa (id = tmdb{number}). IMDb/RT puanı eklemiyoruz; sonradan alınacak."""
+    return [_card(item) for item in search_page("movie", query, 1)[0]]
 
 
 def search_tv(query: str):
-    """TMDB'de dizi ara (id = tmdb{number})."""
-    if not API_KEY:
-        return []
-    url = f"{BASE_URL}/search/tv"
-    res = requests.get(url, params={"api_key": API_KEY, "query": query}).json()
-
-    results = []
-    for item in res.get("results", []):
-        results.append({
-            "id": f"tmdb{item.get('id')}",
-            "title": item.get("name") or "",
-            "year": (item.get("first_air_date") or "")[:4] or "N/A",
-            "poster": _poster_url(item.get("poster_path")),
-            "description": item.get("overview", ""),
-            "imdb": "",
-            "rt": 0
-        })
-    return results
+    """TMDB'de dizi ara, yalnızca ilk sayfa (id = tmdb{number})."""
+    return [_card(item) for item in search_page("tv", query, 1)[0]]
 
 
 def search_by_actor(actor_name: str):
     """
     Oyuncu adına göre arama yapar, TMDB 'person' sonucundaki known_for listesini
     film/dizi kartlarına dönüştürür. (id=tmdb{number}, media_type ekler.)
+    Tam filmografi için actor_pager / iter_actor_credits kullanılır.
     """
-    if not API_KEY:
-        return []
-    url = f"{BASE_URL}/search/person"
-    res = requests.get(url, params={"api_key": API_KEY, "query": actor_name}).json()
-
-    out = []
-    for person in res.get("results", []):
-        for work in person.get("known_for", []):
-            media_type = work.get("media_type")  # "movie" | "tv"
-            title = work.get("title") or work.get("name") or ""
-            year = (work.get("release_date") or work.get("first_air_date") or "")[:4] or "N/A"
-            out.append({
-                "id": f"tmdb{work.get('id')}",
-                "title": title,
-                "year": year,
-                "poster": _poster_url(work.get("poster_path")),
-                "description": work.get("overview", ""),
-                "imdb": "",
-                "rt": 0,
-                "media_type": media_type
-            })
-    return out
+    return [
+        _card(work, work.get("media_type"))
+        for person in search_page("person", actor_name, 1)[0]
+        for work in person.get("known_for", [])
+    ]
+
+
+@single_flight()
+def fetch_details(tmdb_id, media_type: str):
+    """
+    TMDB detaylarını TEK istekle getirir: append_to_response=credits,external_ids.
+    media_type: "movie" | "tv". Hata/boş durumda None döner.
+    """
+    if not API_KEY or not tmdb_id:
+        return None
+    media_type = "tv" if media_type in ("tv", "show", "series") else "movie"
+    key = (media_type, str(tmdb_id))
+    hit = _recent_details.get(key)
+    if hit is not None:
+        return hit
+    try:
+        r = _breaker.get(
+            f"{BASE_URL}/{media_type}/{tmdb_id}",
+            params={"api_key": API_KEY, "append_to_response": "credits,external_ids"},
+        )
+        if r.status_code != 200:
+            return None
+        det = r.json()
+    except Exception as e:
+        print("tmdb fetch_details error:", e)
+        return None
+    _recent_details.set(key, det)
+    return det
+
+
+@single_flight()
+def find_by_imdb(imdb_id: str):
+    """IMDb ID'den TMDB (id, "movie"|"tv") bulur; bulunamazsa (None, None)."""
+    if not API_KEY or not imdb_id:
+        return None, None
+    try:
+        r = _breaker.get(
+            f"{BASE_URL}/find/{imdb_id}",
+            params={"api_key": API_KEY, "external_source": "imdb_id"},
+        )
+        if r.status_code != 200:
+            return None, None
+        j = r.json()
+    except Exception as e:
+        print("tmdb find_by_imdb error:", e)
+        return None, None
+    if j.get("movie_results"):
+        return j["movie_results"][0].get("id"), "movie"
+    if j.get("tv_results"):
+        return j["tv_results"][0].get("id"), "tv"
+    return None, None
 
 
 def add_to_favorites(item: dict, stars: int, media_type: str):
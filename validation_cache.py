@@ -0,0 +1,190 @@
+# validation_cache.py
+"""
+validate_imdb_id sonuçları için kalıcı önbellek.
+
+Üç tür kayıt tutar (hepsi zaman damgalı):
+  - valid     : doğrulanmış IMDb ID (seed veya OMDb ile)
+  - invalid   : OMDb'nin reddettiği / puansız dönen ID
+  - title     : "başlık|yıl" -> düzeltilmiş IMDb ID (boşsa: başlıkla da bulunamadı)
+
+Kayıtlar imdb_validation_cache.csv'ye eklenerek yazılır (son satır geçerlidir),
+böylece sunucu yeniden başlasa da önbellek korunur.
+"""
+import csv
+import threading
+import time
+from pathlib import Path
+
+CACHE_PATH = Path(__file__).parent / "imdb_validation_cache.csv"
+FIELDS = ["key", "kind", "imdb_id", "note", "checked_at"]
+
+# Tazelik süreleri (saniye). Olumsuz kayıtlar daha kısa yaşar ki düzelen
+# veriler (OMDb'ye sonradan eklenen puanlar vb.) tekrar denenebilsin.
+TTL = {
+    "valid": 30 * 24 * 3600,
+    "invalid": 7 * 24 * 3600,
+    "title": 14 * 24 * 3600,
+}
+
+
+def title_key(title, year=None) -> str:
+    return f"{(title or '').strip().lower()}|{str(year or '').strip()}"
+
+
+class ValidationCache:
+    def __init__(self, path: Path = CACHE_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._entries = None  # (kind, key) -> row dict
+
+    # ---- disk ----
+    def _load(self):
+        if self._entries is not None:
+            return
+        entries = {}
+        try:
+            if self.path.exists():
+                with self.path.open(newline="", encoding="utf-8") as f:
+                    for row in csv.DictReader(f):
+                        kind = (row.get("kind") or "").strip()
+                        key = (row.get("key") or "").strip()
+                        if kind in TTL and key:
+                            try:
+                                row["checked_at"] = float(row.get("checked_at") or 0)
+                            except ValueError:
+                                row["checked_at"] = 0.0
+                            entries[(kind, key)] = row
+        except Exception as e:
+            print("validation cache load error:", e)
+        self._entries = entries
+
+    def _append(self, row):
+        try:
+            write_header = not self.path.exists() or self.path.stat().st_size == 0
+            with self.path.open("a", newline="", encoding="utf-8") as f:
+                w = csv.DictWriter(f, fieldnames=FIELDS)
+                if write_header:
+                    w.writeheader()
+                w.writerow(row)
+        except Exception as e:
+            print("validation cache write error:", e)
+
+    def _rewrite(self):
+        try:
+            with self.path.open("w", newline="", encoding="utf-8") as f:
+                w = csv.DictWriter(f, fieldnames=FIELDS)
+                w.writeheader()
+                for row in self._entries.values():
+                    w.writerow(row)
+        except Exception as e:
+            print("validation cache rewrite error:", e)
+
+    # ---- okuma ----
+    def _fresh(self, kind, key, now=None):
+        self._load()
+        row = self._entries.get((kind, key))
+        if not row:
+            return None
+        if (now or time.time()) - row["checked_at"] > TTL[kind]:
+            return None
+        return row
+
+    def id_status(self, imdb_id):
+        """'valid' | 'invalid' | None (bilinmiyor veya süresi dolmuş)."""
+        key = (imdb_id or "").strip()
+        if not key:
+            return None
+        with self._lock:
+            now = time.time()
+            valid = self._fresh("valid", key, now)
+            invalid = self._fresh("invalid", key, now)
+        if valid and invalid:
+            return "valid" if valid["checked_at"] >= invalid["checked_at"] else "invalid"
+        if valid:
+            return "valid"
+        if invalid:
+            return "invalid"
+        return None
+
+    def title_lookup(self, title, year=None):
+        """(bulundu_mu, imdb_id|None). bulundu_mu=False ise ağa gitmek gerekir."""
+        with self._lock:
+            row = self._fresh("title", title_key(title, year))
+        if not row:
+            return False, None
+        return True, (row.get("imdb_id") or None)
+
+    # ---- yazma ----
+    def _record(self, kind, key, imdb_id="", note=""):
+        row = {
+            "key": key,
+            "kind": kind,
+            "imdb_id": imdb_id or "",
+            "note": note or "",
+            "checked_at": time.time(),
+        }
+        with self._lock:
+            self._load()
+            self._entries[(kind, key)] = row
+            self._append(row)
+
+    def mark_valid(self, imdb_id, note=""):
+        if imdb_id:
+            self._record("valid", imdb_id.strip(), imdb_id.strip(), note)
+
+    def mark_invalid(self, imdb_id, note=""):
+        if imdb_id:
+            self._record("invalid", imdb_id.strip(), "", note)
+
+    def mark_title(self, title, year, imdb_id, note=""):
+        if title:
+            self._record("title", title_key(title, year), imdb_id or "", note)
+
+    # ---- UI yardımcıları ----
+    def entries(self):
+        """Tüm kayıtlar (en yeni önce), 'fresh' alanıyla birlikte."""
+        with self._lock:
+            self._load()
+            now = time.time()
+            rows = []
+            for (kind, key), row in self._entries.items():
+                r = dict(row)
+                r["fresh"] = now - row["checked_at"] <= TTL[kind]
+                rows.append(r)
+        return sorted(rows, key=lambda r: r["checked_at"], reverse=True)
+
+    def purge(self, expired_only=False):
+        """Önbelleği temizler; silinen kayıt sayısını döndürür."""
+        with self._lock:
+            self._load()
+            before = len(self._entries)
+            if expired_only:
+                now = time.time()
+                self._entries = {
+                    k: r for k, r in self._entries.items()
+                    if now - r["checked_at"] <= TTL[k[0]]
+                }
+            else:
+                self._entries = {}
+            self._rewrite()
+            return before - len(self._entries)
+
+    def forget(self, imdb_id_or_title):
+        """Tek bir ID'ye (veya başlık anahtarına) ait kayıtları siler."""
+        key = (imdb_id_or_title or "").strip()
+        with self._lock:
+            self._load()
+            drop = [k for k in self._entries if k[1] == key or k[1].startswith(key.lower() + "|")]
+            for k in drop:
+                del self._entries[k]
+            if drop:
+                self._rewrite()
+            return len(drop)
+
+
+# Süreç genelinde tek örnek (app.py her rerun'da yeniden çalışır, bu modül çalışmaz)
+_cache = ValidationCache()
+
+
+def get_validation_cache() -> ValidationCache:
+    return _cache
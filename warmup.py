@@ -0,0 +1,64 @@
+# warmup.py
+"""
+Süreç başına bir kez çalışan önbellek ısıtma.
+
+Render'da deploy sonrası ilk ziyaretçi Firebase bağlantısını, favori anlık görüntüsünü,
+facet listelerini, sütun görünümünü, benzerlik komşularını ve seed CSV indekslerini tek başına ödemesin diye bunlar ilk
+betik çalışmasında arka plan thread'inde önceden hazırlanır. Aşama süreleri loglanır.
+"""
+import threading
+import time
+
+import seeds
+from validation_cache import get_validation_cache
+
+_started = False
+_lock = threading.Lock()
+_status = {"state": "idle", "timings": {}, "error": None, "started_at": None, "finished_at": None}
+
+
+def warm_up(store) -> dict:
+    """Önbellekleri sırayla doldurur; aşama -> saniye sözlüğü döndürür."""
+    timings = {}
+
+    def stage(name, fn):
+        t0 = time.perf_counter()
+        fn()
+        timings[name] = round(time.perf_counter() - t0, 3)
+        print(f"[warmup] {name}: {timings[name]:.3f}s")
+
+    stage("favorites_snapshot", store.snapshot)
+    stage("facets", lambda: [store.facets(t) for t in ("movie", "show")])
+    stage("columns", lambda: [store.columns(t) for t in ("movie", "show")])
+    stage("similarity", lambda: store.similarity().precompute())
+    stage("seed_indexes", seeds.warm_indexes)
+    stage("validation_cache", get_validation_cache().entries)
+    timings["total"] = round(sum(timings.values()), 3)
+    print(f"[warmup] total: {timings['total']:.3f}s")
+    return timings
+
+
+def _run(store):
+    _status.update(state="running", started_at=time.time())
+    try:
+        _status["timings"] = warm_up(store)
+        _status["state"] = "done"
+    except Exception as e:
+        print("[warmup] error:", e)
+        _status.update(state="failed", error=f"{type(e).__name__}: {e}")
+    _status["finished_at"] = time.time()
+
+
+def start_warmup(store) -> bool:
+    """Isıtmayı arka planda başlatır; bu süreçte zaten başlatıldıysa hiçbir şey yapmaz."""
+    global _started
+    with _lock:
+        if _started:
+            return False
+        _started = True
+    threading.Thread(target=_run, args=(store,), name="cache-warmup", daemon=True).start()
+    return True
+
+
+def status() -> dict:
+    return dict(_status)